@@ -0,0 +1,60 @@
+import os
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+# 한 턴 안에서 서로 기다릴 필요가 없는 가지를 동시에 실행합니다. (기본 켜짐, 0이면 예전처럼 한 줄로 실행)
+#  - 오류 분류기  ||  추측 수정 (오류가 치명적이라고 가정하고 수정 코드를 미리 생성)
+#  - 셀 실행      ||  다음 단계 제안 (JUPYTER_LLM_SUGGEST_NEXT=1일 때만)
+PARALLEL_BRANCHES = os.getenv("JUPYTER_LLM_PARALLEL_BRANCHES", "1") != "0"
+SUGGEST_NEXT = os.getenv("JUPYTER_LLM_SUGGEST_NEXT", "0") == "1"
+
+# 취소 신호는 이 시간이 지나면 정리합니다. (같은 superstep의 가지들은 그 전에 모두 끝남)
+_SIGNAL_TTL_S = 600.0
+
+_lock = threading.Lock()
+_signals = {}  # 가지 묶음 키 -> (threading.Event, 만든 시각)
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="branch")
+
+
+def branch_key(state: dict, config: dict, group: str) -> str:
+    """
+    같은 superstep에서 함께 시작된 가지들이 공유하는 키. (같은 입력 상태에서 계산되므로 서로 같음)
+    그래프 스레드, 턴 시작 시각, fix-error 횟수로 구분합니다.
+    """
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    started_at = (state.get("loop_stats") or {}).get("started_at")
+    return f"{group}:{thread_id}:{started_at}:{state.get('fix_attempts', 0)}"
+
+
+def _signal(key: str) -> threading.Event:
+    with _lock:
+        now = time.monotonic()
+        for stale in [k for k, (_, created) in _signals.items() if now - created > _SIGNAL_TTL_S]:
+            del _signals[stale]
+        if key not in _signals:
+            _signals[key] = (threading.Event(), now)
+        return _signals[key][0]
+
+
+def cancel(key: str):
+    """같은 묶음의 다른 가지에게 결과가 필요 없어졌다고 알립니다."""
+    _signal(key).set()
+
+
+def run_unless_cancelled(key: str, fn, *args) -> tuple:
+    """
+    fn(*args)를 백그라운드에서 실행하고, 끝나거나 같은 키로 취소 신호가 올 때까지 기다립니다.
+    (결과, 취소 여부)를 반환합니다. 취소되면 이미 보낸 LLM 요청의 결과는 버립니다.
+    호출한 스레드의 컨텍스트(LLM 우선순위 등)를 그대로 가져갑니다.
+    """
+    signal = _signal(key)
+    if signal.is_set():
+        return None, True
+    future = _pool.submit(contextvars.copy_context().run, fn, *args)
+    while not future.done():
+        if signal.wait(0.05):
+            future.cancel()
+            return None, True
+    return future.result(), False
@@ -0,0 +1,90 @@
+# 여러 셀로 된 계획(plan)을 다루는 도우미.
+# generator는 순서가 있는 셀 목록을 만들고, executor는 state['plan_cursor']부터 한 셀씩 실행하며
+# 끝난 셀을 바로 노트북에 기록합니다. 셀에서 오류가 나면 커서는 그 셀에 멈추고, fix-error 턴에서는
+# 그 셀과 뒤의 셀만 다시 생성/실행합니다. (앞 셀들의 변수는 커널에 그대로 남아 있음)
+
+# 화면 표시와 스킬 라이브러리 저장에 쓰는 셀 구분자 (VS Code / Jupytext의 셀 표기)
+CELL_SEPARATOR = "\n\n# %%\n"
+
+
+def join_cells(cells: list) -> str:
+    """셀 목록을 하나의 스크립트로 합칩니다."""
+    return CELL_SEPARATOR.join(cells)
+
+
+def merge_fix(plan: list, cursor: int, new_cells: list) -> list:
+    """이미 성공한 plan[:cursor]는 그대로 두고, 실패한 셀부터 뒤를 새 셀로 바꿉니다."""
+    return list(plan[:cursor]) + list(new_cells)
+
+
+def failing_index(cursor: int, results: list):
+    """
+    이번 실행에서 다음 fix-error 턴이 다시 시작할 셀의 위치.
+    results는 cursor부터 실행한 셀들의 결과이며, 예외가 난 셀이 있으면 그 셀,
+    없으면 stderr에 무언가 쓴 첫 셀 (오류 분류기가 치명적이라고 판단할 경우), 둘 다 없으면 None.
+    """
+    for offset, result in enumerate(results):
+        if result.get("error"):
+            return cursor + offset
+    for offset, result in enumerate(results):
+        if result.get("stderr"):
+            return cursor + offset
+    return None
+
+
+def format_executed_cells(plan: list, cursor: int) -> str:
+    """fix-error 턴 프롬프트용: 이미 성공해서 다시 실행하지 않을 셀들."""
+    if cursor <= 0:
+        return "(none)"
+    return "\n---\n".join(f"# Cell {i + 1} (done):\n{code}" for i, code in enumerate(plan[:cursor]))
+
+
+# --- 직접 실행하여 fix-error 턴의 재실행 시간을 비교하는 경우 ---
+# 데이터 로딩(2초) -> 모델 학습(3초) -> 마지막 셀의 오류를 고치는 시나리오를
+# 하나의 블록으로 다시 실행하는 방식과 실패한 셀부터만 다시 실행하는 방식으로 각각 실행합니다.
+if __name__ == '__main__':
+    import time
+    from src.tools.jupyter_executor import JupyterExecutor
+
+    cells = [
+        "import time\ntime.sleep(2)\ndata = list(range(1_000_000))",
+        "time.sleep(3)\nmodel = sum(data) / len(data)",
+        "print(f'mean={model:.1f}', undefined_name)",
+    ]
+    fixes = ["print(f'mean={model:.1f}', 'first fix', missing)", "print(f'mean={model:.1f}')"]
+
+    def run(executor, codes):
+        started = time.perf_counter()
+        results = []
+        for code in codes:
+            results.append(executor.execute(code))
+            if results[-1]["error"]:
+                break
+        return time.perf_counter() - started, results
+
+    executor = JupyterExecutor()
+    try:
+        # 1) 단일 블록: 고칠 때마다 전체 스크립트를 다시 실행
+        block_total, block_fix = 0.0, 0.0
+        for turn, last in enumerate([cells[2], *fixes]):
+            seconds, _ = run(executor, [join_cells(cells[:2] + [last])])
+            block_total += seconds
+            block_fix += seconds if turn else 0.0
+
+        # 2) 셀 목록: 처음에는 전부, 고칠 때는 실패한 셀부터만 실행
+        seconds, results = run(executor, cells)
+        cursor = failing_index(0, results)
+        plan, cell_total, cell_fix = cells, seconds, 0.0
+        for fix in fixes:
+            plan = merge_fix(plan, cursor, [fix])
+            seconds, results = run(executor, plan[cursor:])
+            cell_total += seconds
+            cell_fix += seconds
+            cursor = failing_index(cursor, results) or cursor
+
+        print(f"single block : total {block_total:6.2f}s, fix-error turns {block_fix:6.2f}s")
+        print(f"cell plan    : total {cell_total:6.2f}s, fix-error turns {cell_fix:6.2f}s")
+        print(f"re-execution saved on fix-error turns: {block_fix - cell_fix:.2f}s "
+              f"({(block_fix - cell_fix) / block_fix:.0%})")
+    finally:
+        executor.shutdown()
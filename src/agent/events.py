@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from typing import Iterator, List, Literal, Union
+
+# 노드가 custom 스트림으로 내보내는 이벤트 종류
+PLAN = "plan"
+EXEC_START = "exec_start"
+OUTPUT = "output"
+RESOURCE = "resource"
+
+
+@dataclass
+class NodeUpdate:
+    """노드 하나가 끝났을 때 그 노드가 변경한 상태 키만 담은 델타."""
+    node: str
+    update: dict
+
+
+@dataclass
+class PlanEvent:
+    """generator가 실행할 코드를 만들었을 때."""
+    code: str
+
+
+@dataclass
+class ExecutionStarted:
+    """executor가 커널에 코드를 보내기 직전."""
+    code: str
+
+
+@dataclass
+class OutputChunk:
+    """커널 실행 중 도착한 stdout/stderr 조각."""
+    stream: Literal["stdout", "stderr"]
+    text: str
+
+
+@dataclass
+class ResourceSample:
+    """실행 중인 커널 프로세스의 주기적인 자원 측정값 (cpu_percent, rss_mb, threads 등)."""
+    sample: dict
+
+
+@dataclass
+class InterruptEvent:
+    """그래프가 'suggester' 뒤에서 멈추고 사용자의 선택을 기다릴 때."""
+    options: List[str] = field(default_factory=list)
+
+
+AgentEvent = Union[NodeUpdate, PlanEvent, ExecutionStarted, OutputChunk, ResourceSample, InterruptEvent]
+
+
+def emit(kind: str, **payload):
+    """
+    [노드용] 실행 중인 그래프의 custom 스트림으로 이벤트를 보냅니다.
+    그래프 밖에서(예: 단독 호출, 테스트) 불리면 아무것도 하지 않습니다.
+    """
+    try:
+        from langgraph.config import get_stream_writer
+        writer = get_stream_writer()
+    except Exception:
+        return
+    writer({"kind": kind, **payload})
+
+
+def _to_event(mode: str, chunk) -> Iterator[AgentEvent]:
+    if mode == "custom":
+        kind = chunk.get("kind")
+        if kind == PLAN:
+            yield PlanEvent(code=chunk["code"])
+        elif kind == EXEC_START:
+            yield ExecutionStarted(code=chunk["code"])
+        elif kind == OUTPUT:
+            yield OutputChunk(stream=chunk["stream"], text=chunk["text"])
+        elif kind == RESOURCE:
+            yield ResourceSample(sample=chunk["sample"])
+        return
+    # mode == "updates": {노드 이름: 그 노드의 반환값}
+    for node, update in chunk.items():
+        if node.startswith("__"):
+            continue  # '__interrupt__' 등 내부 키는 아래에서 상태로 판단합니다.
+        yield NodeUpdate(node=node, update=update or {})
+
+
+def iter_events(app, inputs, config) -> Iterator[AgentEvent]:
+    """
+    그래프를 실행하며 전체 상태 대신 타입이 있는 델타 이벤트를 순서대로 내보냅니다.
+    그래프가 인터럽트로 멈췄다면 마지막에 InterruptEvent를 하나 내보냅니다.
+    """
+    for mode, chunk in app.stream(inputs, config, stream_mode=["updates", "custom"]):
+        yield from _to_event(mode, chunk)
+
+    snapshot = app.get_state(config)
+    if snapshot.next:
+        yield InterruptEvent(options=list(snapshot.values.get("suggested_options") or []))
@@ -0,0 +1,109 @@
+import os
+import re
+import time
+import hashlib
+
+from .llm import strip_ansi
+
+# --- fix-error 루프 예산 (턴 단위) ---
+# 환경 변수로 조정할 수 있습니다.
+MAX_FIX_ATTEMPTS = int(os.getenv("JUPYTER_LLM_MAX_FIX_ATTEMPTS", "4"))
+MAX_FIX_SECONDS = float(os.getenv("JUPYTER_LLM_MAX_FIX_SECONDS", "300"))
+MAX_FIX_TOKENS = int(os.getenv("JUPYTER_LLM_MAX_FIX_TOKENS", "60000"))
+# 같은 지문의 오류가 이 횟수만큼 반복되면 루프를 중단합니다. (2번째부터는 전략을 바꿔 재시도)
+MAX_REPEATED_FAILURES = int(os.getenv("JUPYTER_LLM_MAX_REPEATED_FAILURES", "3"))
+# 재시도 사이의 지수 백오프 (초)
+BACKOFF_BASE = float(os.getenv("JUPYTER_LLM_FIX_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.getenv("JUPYTER_LLM_FIX_BACKOFF_CAP", "8"))
+
+# ipykernel 트레이스백의 프레임 표기
+#   File /path/to/module.py:12, in func(a, b)
+#   Cell In[3], line 5
+#   File "<ipython-input-3-...>", line 5, in <module>
+_FRAME_PATTERNS = [
+    re.compile(r'File\s+"?((?:[A-Za-z]:)?[^",:]+?)"?(?::\d+|, line \d+)(?:, in (\S+?)(?:\(|$))?', re.MULTILINE),
+    re.compile(r'(Cell) In\[\d+\], line \d+', re.MULTILINE),
+]
+_NOISE = re.compile(r"0x[0-9a-fA-F]+|\d+")
+
+
+def new_loop_stats() -> dict:
+    """새 턴의 fix-error 루프 통계를 만듭니다."""
+    return {
+        "started_at": time.time(),
+        "generator_tokens": 0,
+        "generator_calls": 0,
+        "fingerprints": {},      # 지문 -> 발생 횟수
+        "last_fingerprint": None,
+        "strategy_changes": 0,
+        "backoff_s": 0.0,
+        "stopped_reason": None,
+        # fix-error 턴에서 실제로 다시 실행한 시간과, 성공한 앞 셀을 다시 실행하지 않아 절약한 시간
+        "reexec_s": 0.0,
+        "reexec_saved_s": 0.0,
+        # 성능 린트가 자동으로 고친 곳의 수와, 힌트와 함께 generator로 되돌려 보낸 횟수
+        "lint_fixes": 0,
+        "lint_revisions": 0,
+        # 대용량 모드: 표본으로 성공한 plan을 전체 데이터로 다시 실행한 횟수와 걸린 시간
+        "full_runs": 0,
+        "full_run_s": 0.0,
+        # 오류 분류기와 동시에 만든 추측 수정 코드를 그대로 쓴 횟수 (그만큼 generator 호출을 기다리지 않음)
+        "speculative_fixes": 0,
+    }
+
+
+def error_fingerprint(error: dict = None, stderr: str = "") -> str:
+    """
+    오류의 지문을 계산합니다: 정규화된 ename + 트레이스백 프레임 시그니처.
+    줄 번호, 셀 번호, 메모리 주소처럼 실행마다 달라지는 값은 제외합니다.
+    """
+    if error:
+        ename = error.get("ename", "")
+        traceback_text = strip_ansi("\n".join(error.get("traceback", [])))
+    else:
+        text = strip_ansi(stderr or "")
+        match = re.search(r"^\s*(\w+(?:Error|Exception|Interrupt))\b", text, re.MULTILINE)
+        ename = match.group(1) if match else "stderr"
+        traceback_text = text
+
+    frames = []
+    for pattern in _FRAME_PATTERNS:
+        for match in pattern.finditer(traceback_text):
+            location = re.split(r"[\\/]", match.group(1).strip())[-1]
+            function = match.group(2) if pattern.groups > 1 and match.group(2) else ""
+            frames.append(f"{_NOISE.sub('#', location)}:{function}")
+    if not frames and not error:
+        # 트레이스백이 없는 stderr는 숫자를 지운 마지막 줄로 구분합니다.
+        lines = [line for line in traceback_text.strip().splitlines() if line.strip()]
+        frames.append(_NOISE.sub("#", lines[-1].strip()) if lines else "")
+
+    signature = f"{ename.strip()}|{'>'.join(frames)}"
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()[:12]
+
+
+def record_failure(loop_stats: dict, fingerprint: str) -> int:
+    """실패를 기록하고, 이 지문이 지금까지 몇 번 나왔는지 반환합니다."""
+    fingerprints = dict(loop_stats.get("fingerprints", {}))
+    fingerprints[fingerprint] = fingerprints.get(fingerprint, 0) + 1
+    loop_stats["fingerprints"] = fingerprints
+    loop_stats["last_fingerprint"] = fingerprint
+    return fingerprints[fingerprint]
+
+
+def budget_exceeded(loop_stats: dict, fix_attempts: int):
+    """예산을 초과했다면 중단 사유 문자열을, 아니라면 None을 반환합니다."""
+    if fix_attempts > MAX_FIX_ATTEMPTS:
+        return f"max_attempts ({MAX_FIX_ATTEMPTS})"
+    elapsed = time.time() - loop_stats.get("started_at", time.time())
+    if elapsed > MAX_FIX_SECONDS:
+        return f"wall_time ({elapsed:.0f}s > {MAX_FIX_SECONDS:.0f}s)"
+    if loop_stats.get("generator_tokens", 0) > MAX_FIX_TOKENS:
+        return f"tokens ({loop_stats['generator_tokens']} > {MAX_FIX_TOKENS})"
+    return None
+
+
+def backoff_delay(fix_attempts: int) -> float:
+    """fix-error 재시도 전 기다릴 시간 (첫 번째 수정은 바로 시도합니다)."""
+    if fix_attempts <= 1:
+        return 0.0
+    return min(BACKOFF_BASE * (2 ** (fix_attempts - 2)), BACKOFF_CAP)
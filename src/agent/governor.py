@@ -0,0 +1,252 @@
+import os
+import time
+import heapq
+import random
+import hashlib
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+# --- 우선순위 클래스 (숫자가 작을수록 먼저 처리) ---
+INTERACTIVE = 0  # 사용자가 기다리고 있는 턴
+SPECULATIVE = 1  # 옵션 메뉴를 보는 동안의 사전 생성
+BATCH = 2        # 배치 모드
+PRIORITY_NAMES = {INTERACTIVE: "interactive", SPECULATIVE: "speculative", BATCH: "batch"}
+
+# --- 한도 설정 (환경 변수로 조정 가능) ---
+REQUESTS_PER_MINUTE = float(os.getenv("JUPYTER_LLM_RPM", "500"))
+TOKENS_PER_MINUTE = float(os.getenv("JUPYTER_LLM_TPM", "200000"))
+MAX_CONCURRENCY = int(os.getenv("JUPYTER_LLM_MAX_CONCURRENCY", "8"))
+MAX_RETRIES = int(os.getenv("JUPYTER_LLM_MAX_RETRIES", "6"))
+RETRY_BASE = float(os.getenv("JUPYTER_LLM_RETRY_BASE", "0.5"))
+RETRY_CAP = float(os.getenv("JUPYTER_LLM_RETRY_CAP", "30"))
+
+# 현재 컨텍스트(스레드/태스크)에서 나가는 LLM 호출의 우선순위
+_priority = contextvars.ContextVar("jupyter_llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority_scope(priority: int):
+    """이 블록 안의 LLM 호출에 우선순위를 지정합니다. (스레드마다 따로 설정해야 합니다)"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class TokenBucket:
+    """분당 per_minute만큼 채워지는 토큰 버킷. 용량(burst)을 지정하지 않으면 1분치입니다."""
+    def __init__(self, per_minute: float, burst: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """amount만큼 꺼내려면 기다려야 하는 시간 (0이면 바로 가능)."""
+        self._refill()
+        amount = min(amount, self.capacity)  # 1분치보다 큰 요청도 언젠가는 통과하도록
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        """예상보다 적게 쓴 토큰을 돌려주거나 (양수), 더 쓴 만큼 빚을 집니다 (음수)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self, seconds: float):
+        """서버가 한도 초과(429)를 알렸다면, 그 시간 동안 아무도 보내지 못하도록 버킷을 비웁니다."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+def is_rate_limit(exc: BaseException) -> bool:
+    """OpenAI SDK의 RateLimitError, urllib HTTPError 등에서 429 응답인지 판단합니다."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    return status == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """429 응답의 Retry-After 헤더 (초). 없으면 None."""
+    headers = getattr(exc, "headers", None) or getattr(getattr(exc, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def request_key(*parts) -> str:
+    """같은 요청(모델, 스키마, 프롬프트)인지 판단하기 위한 키."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def estimate_tokens(prompt, max_output_tokens: int = 1000) -> int:
+    """요청 토큰 수의 대략적인 추정 (문자 4개 = 1토큰 + 출력 여유분)."""
+    return len(str(prompt)) // 4 + max_output_tokens
+
+
+class LLMGovernor:
+    """
+    프로세스 안의 모든 노드 LLM 호출 앞에 놓이는 공용 스케줄러.
+    - 분당 요청 수/토큰 수를 토큰 버킷으로 제한하고,
+    - 우선순위(interactive > speculative > batch) 순서로 내보내며,
+    - 429 응답은 Retry-After 또는 지터가 있는 지수 백오프로 재시도하고,
+    - 이미 진행 중인 같은 요청은 다시 보내지 않고 결과를 공유합니다.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: float = REQUESTS_PER_MINUTE, tokens_per_minute: float = TOKENS_PER_MINUTE,
+                 max_concurrency: int = MAX_CONCURRENCY, max_retries: int = MAX_RETRIES,
+                 retry_base: float = RETRY_BASE, retry_cap: float = RETRY_CAP, request_burst: float = None):
+        self.requests = TokenBucket(requests_per_minute, burst=request_burst)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self._cond = threading.Condition()
+        self._queue = []  # (우선순위, 순번) 힙
+        self._seq = itertools.count()
+        self._active = 0
+        self._in_flight = {}  # 요청 키 -> Future
+        self.stats = {"calls": 0, "coalesced": 0, "rate_limited": 0, "retries": 0, "failed": 0,
+                      "wait_s": {name: 0.0 for name in PRIORITY_NAMES.values()}}
+
+    @classmethod
+    def default(cls) -> "LLMGovernor":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    # --- 슬롯 획득/반납 ---
+    def _acquire(self, priority: int, tokens: int):
+        ticket = (priority, next(self._seq))
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            while True:
+                if self._queue[0] == ticket and self._active < self.max_concurrency:
+                    wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                    if wait <= 0:
+                        heapq.heappop(self._queue)
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        self._active += 1
+                        self.stats["calls"] += 1
+                        self.stats["wait_s"][PRIORITY_NAMES.get(priority, str(priority))] += time.monotonic() - started
+                        # 다음 차례의 요청도 바로 확인할 수 있도록 깨웁니다.
+                        self._cond.notify_all()
+                        return
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+    def _release(self, estimated_tokens: int, used_tokens: Optional[int]):
+        with self._cond:
+            self._active -= 1
+            if used_tokens is not None:
+                self.tokens.give_back(estimated_tokens - used_tokens)
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        delay = retry_after(exc)
+        if delay is None:
+            # full jitter: 0 ~ min(cap, base * 2^attempt)
+            delay = random.uniform(0, min(self.retry_cap, self.retry_base * (2 ** attempt)))
+        with self._cond:
+            # 다른 호출들도 같은 시간 동안 보내지 않도록 요청 버킷을 비웁니다.
+            self.requests.drain(delay)
+            self._cond.notify_all()
+        return delay
+
+    # --- 호출 ---
+    def call(self, fn: Callable[[], object], key: str = None, tokens: int = 1000,
+             priority: int = None, usage_of: Callable[[object], Optional[int]] = None):
+        """
+        fn()을 한도와 우선순위에 맞춰 실행하고 결과를 반환합니다.
+
+        Args:
+            fn: 실제 LLM 호출.
+            key: 같은 키의 요청이 진행 중이면 새로 보내지 않고 그 결과를 기다립니다.
+            tokens: 요청이 사용할 것으로 예상되는 토큰 수.
+            priority: 지정하지 않으면 priority_scope()로 설정된 현재 우선순위.
+            usage_of: 결과에서 실제 사용 토큰 수를 꺼내는 함수 (토큰 버킷 보정용).
+        """
+        priority = current_priority() if priority is None else priority
+        if key is not None:
+            with self._cond:
+                leader = self._in_flight.get(key)
+                if leader is None:
+                    future = self._in_flight[key] = Future()
+                else:
+                    self.stats["coalesced"] += 1
+            if leader is not None:
+                return leader.result()
+        else:
+            future = Future()
+
+        try:
+            result = self._call_with_retries(fn, tokens, priority, usage_of)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if key is not None:
+                with self._cond:
+                    self._in_flight.pop(key, None)
+
+    def _call_with_retries(self, fn, tokens, priority, usage_of):
+        attempt = 0
+        while True:
+            self._acquire(priority, tokens)
+            used = None
+            try:
+                result = fn()
+                used = usage_of(result) if usage_of else None
+                return result
+            except Exception as exc:
+                rate_limited = is_rate_limit(exc)
+                if not rate_limited or attempt >= self.max_retries:
+                    self._count("rate_limited" if rate_limited else None, "failed")
+                    raise
+                self._count("rate_limited", "retries")
+                delay = self._backoff(attempt, exc)
+            finally:
+                self._release(tokens, used)
+            attempt += 1
+            time.sleep(delay)
+
+    def _count(self, *names):
+        with self._cond:
+            for name in names:
+                if name:
+                    self.stats[name] += 1
+
+    def report(self) -> dict:
+        with self._cond:
+            return {**self.stats, "wait_s": {k: round(v, 3) for k, v in self.stats["wait_s"].items()}}
@@ -1,6 +1,10 @@
 from langgraph.graph import StateGraph, END
 from .state import AgentState
-from .nodes import code_generator_node, code_executor_node, option_suggester_node, router_node, error_classifier_node
+from .nodes import (
+    code_generator_node, code_executor_node, option_suggester_node, router_node, error_classifier_node, perf_lint_node,
+    speculative_fix_node, fix_join_node, next_step_suggester_node,
+)
+from .branches import PARALLEL_BRANCHES, SUGGEST_NEXT
 from langgraph.checkpoint.memory import MemorySaver
 from src.tools.jupyter_executor import JupyterExecutor
 from functools import partial
@@ -31,6 +35,9 @@ def after_error_classifier_router(state: AgentState) -> str:
     """
     if state.get("destination") == "fix_error":
         return "fix_error"
+    elif state.get("destination") == "give_up":
+        # 재시도 예산을 모두 썼거나 같은 오류가 반복되어 루프를 중단
+        return "give_up"
     else:
         # AI가 오류가 아니라고 판단했으므로, 3차 검사로 이동
         return "no_error"
@@ -47,10 +54,16 @@ def should_continue(state: AgentState) -> str:
     else:
         return "continue"
 
-def create_agent_workflow(executor: JupyterExecutor):
+def build_workflow(executor: JupyterExecutor, parallel: bool = None, suggest_next: bool = None) -> StateGraph:
     """
-    AI 에이전트의 전체 작업 흐름을 정의하는 StateGraph를 생성하고 컴파일.
+    AI 에이전트의 전체 작업 흐름을 정의하는 StateGraph를 만듭니다. (컴파일 전)
+    parallel이면 (기본: JUPYTER_LLM_PARALLEL_BRANCHES) 서로 독립적인 가지를 같은 superstep에서 동시에 실행합니다.
+     - stderr가 있으면 error_classifier와 speculative_fixer로 갈라졌다가 fix_join에서 합류
+     - suggest_next이면 (기본: JUPYTER_LLM_SUGGEST_NEXT) executor와 next_suggester로 갈라짐
     """
+    parallel = PARALLEL_BRANCHES if parallel is None else parallel
+    suggest_next = parallel and (SUGGEST_NEXT if suggest_next is None else suggest_next)
+
     # 1. AgentState를 기반으로 그래프 객체를 생성
     workflow = StateGraph(AgentState)
 
@@ -61,8 +74,14 @@ def create_agent_workflow(executor: JupyterExecutor):
     workflow.add_node("router", router_node)
     workflow.add_node("suggester", option_suggester_node)
     workflow.add_node("generator", code_generator_node)
+    workflow.add_node("perf_lint", perf_lint_node)
     workflow.add_node("executor", executor_with_tool)
     workflow.add_node("error_classifier", error_classifier_node)
+    if parallel:
+        workflow.add_node("speculative_fixer", speculative_fix_node)
+        workflow.add_node("fix_join", fix_join_node)
+    if suggest_next:
+        workflow.add_node("next_suggester", next_step_suggester_node)
     workflow.set_entry_point("router")
 
     # 라우터의 결정에 따라 흐름을 분기합니다.
@@ -71,33 +90,79 @@ def create_agent_workflow(executor: JupyterExecutor):
         lambda state: state.get("destination"),  # state의 'destination' 키 값을 보고 판단
         {
             "simple_task": "generator",  # 'simple_task'이면 바로 generator로
-            "complex_task": "suggester"  # 'complex_task'이면 suggester로
+            "complex_task": "suggester",  # 'complex_task'이면 suggester로
+            "prefetched": "perf_lint",  # 사전 생성된 코드가 있으면 린트만 거쳐 바로 실행
+            "skill_hit": "executor"  # 스킬 라이브러리에 확실한 기록이 있으면 바로 실행
         }
     )
 
-    # Executor 실행 후 1차 검사 (Python)
-    workflow.add_conditional_edges(
-        "executor",
-        check_for_stderr,  # 1차 검사
-        {
-            "check_error_critically": "error_classifier",  # 오류가 의심되면 AI 심판에게
-            "no_error": END
-        }
-    )
-    # AI 심판 실행 후 2차 검사 (AI의 결정)
-    workflow.add_conditional_edges(
-        "error_classifier",
-        after_error_classifier_router,  # 2차 검사
-        {
-            "fix_error": "generator",  # 치명적 오류 -> 수정하러 감
-            "no_error": END
-        }
-    )
+    if parallel:
+        # Executor 실행 후 1차 검사 (Python): 오류가 의심되면 AI 심판과 추측 수정을 동시에 시작합니다.
+        workflow.add_conditional_edges(
+            "executor",
+            lambda state: (["error_classifier", "speculative_fixer"]
+                           if check_for_stderr(state) == "check_error_critically" else END),
+            ["error_classifier", "speculative_fixer", END]
+        )
+        # 두 가지가 모두 끝나면 합류하여, AI 심판의 결정에 따라 추측 수정을 쓰거나 버립니다.
+        workflow.add_edge(["error_classifier", "speculative_fixer"], "fix_join")
+        workflow.add_conditional_edges(
+            "fix_join",
+            lambda state: state.get("destination"),
+            {
+                "lint": "perf_lint",  # 추측 수정을 그대로 사용 -> generator 호출 생략
+                "generate": "generator",  # 추측 수정이 없음 -> 지금 생성
+                "give_up": END,
+                "no_error": END
+            }
+        )
+    else:
+        # Executor 실행 후 1차 검사 (Python)
+        workflow.add_conditional_edges(
+            "executor",
+            check_for_stderr,  # 1차 검사
+            {
+                "check_error_critically": "error_classifier",  # 오류가 의심되면 AI 심판에게
+                "no_error": END
+            }
+        )
+        # AI 심판 실행 후 2차 검사 (AI의 결정)
+        workflow.add_conditional_edges(
+            "error_classifier",
+            after_error_classifier_router,  # 2차 검사
+            {
+                "fix_error": "generator",  # 치명적 오류 -> 수정하러 감
+                "give_up": END,  # 예산 초과 / 반복 실패 -> 중단
+                "no_error": END
+            }
+        )
     # suggester가 끝나면 generator로 갑니다 (사용자 입력은 main.py에서 처리).
     workflow.add_edge("suggester", "generator")
 
-    # generator가 코드를 만들면 executor가 실행합니다.
-    workflow.add_edge("generator", "executor")
+    # generator가 코드를 만들면 성능 린트를 거쳐 executor가 실행합니다.
+    # 자동으로 고칠 수 없는 느린 패턴이 있으면 힌트와 함께 generator로 한 번 되돌려 보냅니다.
+    workflow.add_edge("generator", "perf_lint")
+
+    def after_perf_lint(state: AgentState):
+        if state.get("destination") == "revise":
+            return "generator"
+        # 이번 턴의 다음 단계 제안이 아직 없으면 셀이 실행되는 동안 함께 만듭니다.
+        if suggest_next and not state.get("suggested_options"):
+            return ["executor", "next_suggester"]
+        return "executor"
+
+    workflow.add_conditional_edges("perf_lint", after_perf_lint,
+                                   ["executor", "generator"] + (["next_suggester"] if suggest_next else []))
+    if suggest_next:
+        workflow.add_edge("next_suggester", END)
+    return workflow
+
+
+def create_agent_workflow(executor: JupyterExecutor, parallel: bool = None, suggest_next: bool = None):
+    """
+    AI 에이전트의 전체 작업 흐름을 정의하는 StateGraph를 생성하고 컴파일.
+    """
+    workflow = build_workflow(executor, parallel, suggest_next)
 
     # 인메모리 체크포인터 객체를 생성
     checkpointer = MemorySaver()
@@ -0,0 +1,140 @@
+import time
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.tools.memory_watchdog import format_memory_report
+from src.tools.cell_profiler import format_profile
+
+# 기록에 남길 출력의 최대 길이 (앞/뒤를 남기고 가운데를 자릅니다)
+MAX_STDOUT_CHARS = 2000
+MAX_STDERR_CHARS = 2000
+
+# 코드 해시 -> 코드 문자열. 같은 코드는 메모리에 한 번만 존재하도록 합니다.
+# 긴 세션이나 배치 작업자에서 끝없이 커지지 않도록 최근에 쓴 코드만 남깁니다. (LRU)
+MAX_INTERNED_CODES = 4096
+_CODE_TABLE = OrderedDict()
+_code_lock = threading.Lock()
+
+
+def code_hash(code: str) -> str:
+    return hashlib.sha1(code.encode("utf-8")).hexdigest()[:16]
+
+
+def intern_code(code: str) -> tuple:
+    """코드를 해시 기준으로 인터닝하여 (해시, 공유 문자열)을 반환합니다."""
+    digest = code_hash(code)
+    with _code_lock:
+        code = _CODE_TABLE.setdefault(digest, code)
+        _CODE_TABLE.move_to_end(digest)
+        while len(_CODE_TABLE) > MAX_INTERNED_CODES:
+            _CODE_TABLE.popitem(last=False)
+    return digest, code
+
+
+def truncate(text: str, limit: int) -> str:
+    """앞부분과 뒷부분을 남기고 가운데를 잘라 limit 글자 안팎으로 줄입니다."""
+    text = text or ""
+    if len(text) <= limit:
+        return text
+    head = limit // 3
+    tail = limit - head
+    return f"{text[:head]}\n... [{len(text) - limit} chars truncated] ...\n{text[-tail:]}"
+
+
+def make_record(task: str, code: str, result: dict, duration_s: float) -> dict:
+    """
+    실행 한 번을 구조화된 기록으로 만듭니다.
+    출력은 잘라서 보관하고, 코드는 해시로 인터닝합니다.
+    """
+    digest, code = intern_code(code)
+    return {
+        "id": uuid.uuid4().hex[:12],
+        "task": task,
+        "code_hash": digest,
+        "code": code,
+        "stdout": truncate(result.get("stdout", ""), MAX_STDOUT_CHARS),
+        "stderr": truncate(result.get("stderr", ""), MAX_STDERR_CHARS),
+        # 경고나 pip 알림처럼 stderr만 있는 셀은 성공입니다. (예외가 난 셀만 실패)
+        "status": "error" if result.get("error") else "ok",
+        "duration_s": round(duration_s, 3),
+        "resources": result.get("resources"),
+        # 이 셀 뒤에 메모리 감시자가 객체를 디스크로 내보냈다면 그 기록
+        "memory": result.get("memory"),
+        # 프로파일링 모드에서 실행한 셀의 시간/메모리 프로파일
+        "profile": result.get("profile"),
+        "ended_at": time.time(),
+    }
+
+
+def append_history(left: list, right) -> list:
+    """
+    [LangGraph 리듀서] 기존 기록 뒤에 새 기록을 덧붙입니다. (append-only)
+    같은 id의 기록은 다시 추가하지 않으므로, 입력으로 기록이 되돌아와도 중복되지 않습니다.
+    """
+    left = list(left or [])
+    if not right:
+        return left
+    if isinstance(right, dict):
+        right = [right]
+    seen = {record["id"] for record in left if isinstance(record, dict)}
+    for record in right:
+        if isinstance(record, str):
+            # 이전 버전의 문자열 기록은 문자열 자체로 중복을 판단합니다.
+            if record not in left:
+                left.append(record)
+        elif record["id"] not in seen:
+            seen.add(record["id"])
+            left.append(record)
+    return left
+
+
+def format_record(record) -> str:
+    """프롬프트에 넣을 때만 기록 하나를 문자열로 만듭니다."""
+    if isinstance(record, str):
+        return record
+    text = (f"Executed Code:\n```python\n{record['code']}\n```\n\n"
+            f"STDOUT:\n{record['stdout']}\n\nSTDERR:\n{record['stderr']}")
+    if record.get("memory"):
+        text += f"\n\nMEMORY: {format_memory_report(record['memory'])}"
+    if record.get("profile"):
+        text += f"\n\nPROFILE: {format_profile(record['profile'])}"
+    return text
+
+
+def format_history(records: list) -> str:
+    """기록 목록을 프롬프트용 문자열로 만듭니다."""
+    return "\n---\n".join(format_record(record) for record in records or [])
+
+
+# --- 직접 실행하여 이전 문자열 기록과 크기를 비교하는 경우 ---
+if __name__ == '__main__':
+    import json
+    import random
+
+    rng = random.Random(0)
+    steps = 50
+    codes = [f"df.groupby('col{i % 5}').agg(['mean', 'std'])\nprint(df.shape)" for i in range(steps)]
+    results = [{"stdout": "x" * rng.randint(100, 20000), "stderr": "" if i % 4 else "Warning\n" * 50}
+               for i in range(steps)]
+
+    # 이전 방식: 노드가 포맷된 문자열을 누적하고, CLI가 마지막 항목을 다시 추가해 입력으로 돌려보냄
+    legacy_state, legacy_session = [], []
+    for code, result in zip(codes, results):
+        summary = f"Executed Code:\n```python\n{code}\n```\n\nSTDOUT:\n{result['stdout']}\n\nSTDERR:\n{result['stderr']}"
+        legacy_state.append(summary)
+        legacy_session.append(legacy_state[-1])
+        legacy_state = list(legacy_session)  # 다음 턴 입력으로 session_history가 그대로 들어감
+    legacy_prompt = "\n---\n".join(legacy_state)
+
+    history = []
+    for code, result in zip(codes, results):
+        history = append_history(history, [make_record("task", code, result, 0.1)])
+    prompt = format_history(history)
+
+    legacy_bytes = sum(len(entry.encode("utf-8")) for entry in legacy_state)
+    record_bytes = len(json.dumps(history).encode("utf-8"))
+    print(f"entries: legacy={len(legacy_state)} structured={len(history)}")
+    print(f"bytes/entry: legacy={legacy_bytes / len(legacy_state):.0f} structured={record_bytes / len(history):.0f}")
+    print(f"prompt chars: legacy={len(legacy_prompt)} structured={len(prompt)}")
@@ -0,0 +1,214 @@
+import os
+import re
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Optional
+
+from langchain_openai import ChatOpenAI
+
+from .governor import LLMGovernor, request_key, estimate_tokens
+
+# --- 모델 티어 설정 ---
+# 티어 이름 -> 모델 이름. 환경 변수로 모델을 바꿀 수 있습니다.
+MODEL_TIERS = {
+    "small": os.getenv("JUPYTER_LLM_SMALL_MODEL", "gpt-5-nano"),
+    "medium": os.getenv("JUPYTER_LLM_MEDIUM_MODEL", "gpt-5-mini"),
+    "large": os.getenv("JUPYTER_LLM_LARGE_MODEL", "gpt-5"),
+}
+TIER_ORDER = ["heuristic", "small", "medium", "large"]
+
+# 노드별 기본 티어. 'JUPYTER_LLM_TIER_<NODE>' 환경 변수로 덮어쓸 수 있습니다.
+# (예: JUPYTER_LLM_TIER_ROUTER=medium)
+NODE_TIERS = {
+    "router": "small",
+    "error_classifier": "small",
+    "suggester": "medium",
+    "generator": "medium",
+}
+
+# 라우터 결정의 확신도가 이 값보다 낮으면 한 단계 큰 모델에게 다시 묻습니다.
+ROUTE_CONFIDENCE_THRESHOLD = float(os.getenv("JUPYTER_LLM_ROUTE_CONFIDENCE", "0.7"))
+# fix-error 루프에서 이 횟수 이상 실패하면 generator와 error_classifier를 한 단계 큰 모델로 올립니다.
+ESCALATE_AFTER_FAILURES = int(os.getenv("JUPYTER_LLM_ESCALATE_AFTER", "2"))
+
+# 1M 토큰당 (입력, 출력) 달러 가격. 비용 추정용입니다.
+MODEL_PRICES = {
+    "gpt-5-nano": (0.05, 0.40),
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-5": (1.25, 10.00),
+}
+
+# 캐시된 입력 토큰의 가격 비율 (OpenAI: 일반 입력의 10%)
+CACHED_INPUT_PRICE_RATIO = 0.1
+
+# 라우터/분류기 입력과 결정을 기록할 리플레이 코퍼스 경로 (설정된 경우에만 기록)
+REPLAY_LOG_PATH = os.getenv("JUPYTER_LLM_REPLAY_LOG")
+
+
+@dataclass
+class TierStats:
+    """티어별 누적 호출 통계."""
+    calls: int = 0
+    latency_s: float = 0.0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def as_dict(self) -> dict:
+        mean_latency = self.latency_s / self.calls if self.calls else 0.0
+        return {
+            "calls": self.calls,
+            "mean_latency_s": round(mean_latency, 4),
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "cache_hit_ratio": round(self.cached_input_tokens / self.input_tokens, 4) if self.input_tokens else 0.0,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+@dataclass
+class StructuredResponse:
+    """invoke_structured()의 결과: 파싱된 객체와 호출 지표."""
+    parsed: Any
+    tier: str
+    model: Optional[str] = None
+    latency_s: float = 0.0
+    usage: dict = field(default_factory=dict)
+
+
+_stats_lock = threading.Lock()
+TIER_STATS = {tier: TierStats() for tier in TIER_ORDER}
+# 노드별 (호출 수, 누적 지연 시간) - 스킬 라이브러리 등이 '건너뛴 호출'의 절약 시간을 추정할 때 사용
+NODE_LATENCY = {}
+
+
+def tier_for(node: str) -> str:
+    """노드의 기본 티어를 반환합니다."""
+    tier = os.getenv(f"JUPYTER_LLM_TIER_{node.upper()}", NODE_TIERS.get(node, "medium"))
+    if tier not in MODEL_TIERS:
+        raise ValueError(f"Unknown model tier '{tier}' for node '{node}'")
+    return tier
+
+
+def escalate(tier: str) -> str:
+    """한 단계 큰 티어를 반환합니다. 이미 가장 큰 티어라면 그대로 반환합니다."""
+    index = TIER_ORDER.index(tier)
+    return TIER_ORDER[min(index + 1, len(TIER_ORDER) - 1)]
+
+
+@lru_cache(maxsize=None)
+def get_llm(model: str) -> ChatOpenAI:
+    """모델별 ChatOpenAI 인스턴스를 한 번만 만들어 재사용합니다."""
+    # 429 재시도는 LLMGovernor가 전체 호출을 보고 조율하므로 SDK 자체 재시도는 끕니다.
+    return ChatOpenAI(model=model, temperature=0, max_retries=0)
+
+
+def record_usage(tier: str, model: Optional[str], latency_s: float, usage: dict):
+    """티어별 지연 시간, 토큰 수, 추정 비용을 누적합니다."""
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    # 제공자 프롬프트 캐시에서 재사용된 입력 토큰 (LangChain usage_metadata의 input_token_details)
+    cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+    price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+    with _stats_lock:
+        stats = TIER_STATS[tier]
+        stats.calls += 1
+        stats.latency_s += latency_s
+        stats.input_tokens += input_tokens
+        stats.cached_input_tokens += cached_tokens
+        stats.output_tokens += output_tokens
+        uncached = input_tokens - cached_tokens
+        stats.cost_usd += (uncached * price_in + cached_tokens * price_in * CACHED_INPUT_PRICE_RATIO
+                           + output_tokens * price_out) / 1_000_000
+
+
+def node_mean_latency(node: str) -> float:
+    """노드의 LLM 호출 평균 지연 시간 (호출 기록이 없으면 0)."""
+    with _stats_lock:
+        calls, total = NODE_LATENCY.get(node, (0, 0.0))
+    return total / calls if calls else 0.0
+
+
+def tier_report() -> dict:
+    """티어별 누적 통계를 dict로 반환합니다."""
+    with _stats_lock:
+        return {tier: stats.as_dict() for tier, stats in TIER_STATS.items() if stats.calls}
+
+
+def invoke_structured(node: str, schema, prompt, tier: str = None) -> StructuredResponse:
+    """
+    노드의 티어에 맞는 모델로 구조화 출력을 요청하고, 지연 시간/토큰/비용을 기록합니다.
+
+    Args:
+        node (str): 호출하는 노드 이름 (기본 티어 결정에 사용).
+        schema: with_structured_output()에 넘길 Pydantic 모델.
+        prompt: LLM에 전달할 프롬프트 (문자열 또는 메시지 목록).
+        tier (str): 기본 티어 대신 사용할 티어.
+    """
+    tier = tier or tier_for(node)
+    model = MODEL_TIERS[tier]
+    structured_llm = get_llm(model).with_structured_output(schema, include_raw=True)
+
+    def call() -> StructuredResponse:
+        start = time.perf_counter()
+        response = structured_llm.invoke(prompt)
+        latency = time.perf_counter() - start
+
+        if response.get("parsing_error"):
+            raise response["parsing_error"]
+        usage = dict(getattr(response["raw"], "usage_metadata", None) or {})
+        record_usage(tier, model, latency, usage)
+        with _stats_lock:
+            calls, total = NODE_LATENCY.get(node, (0, 0.0))
+            NODE_LATENCY[node] = (calls + 1, total + latency)
+        return StructuredResponse(parsed=response["parsed"], tier=tier, model=model, latency_s=latency, usage=usage)
+
+    # 모든 노드 호출은 공용 governor를 거칩니다. (한도, 우선순위, 429 재시도, 같은 요청 합치기)
+    return LLMGovernor.default().call(
+        call,
+        key=request_key(model, schema.__name__, prompt),
+        tokens=estimate_tokens(prompt),
+        usage_of=lambda result: result.usage.get("total_tokens"),
+    )
+
+
+# --- 로컬 휴리스틱 오류 분류기 ---
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+_CRITICAL_PATTERNS = re.compile(
+    r"Traceback \(most recent call last\)|^\s*\w*(Error|Exception|Interrupt)\b\s*:|^\s*\w*Error\s*$",
+    re.MULTILINE,
+)
+_IGNORABLE_LINE = re.compile(r"\[notice\]|A new release of pip|Warning\b|warn\(|^\s*$", re.IGNORECASE)
+
+
+def strip_ansi(text: str) -> str:
+    return _ANSI_ESCAPE.sub("", text)
+
+
+def classify_stderr_locally(stderr: str):
+    """
+    LLM 호출 없이 stderr가 치명적인 오류인지 판단합니다.
+    확신할 수 있으면 (is_critical, 확신도)를, 애매하면 (None, 0.0)을 반환합니다.
+    """
+    text = strip_ansi(stderr or "")
+    if not text.strip():
+        return False, 1.0
+    if _CRITICAL_PATTERNS.search(text):
+        return True, 0.95
+    if all(_IGNORABLE_LINE.search(line) for line in text.splitlines()):
+        return False, 0.9
+    return None, 0.0
+
+
+def log_replay(node: str, inputs: dict, decision: dict, tier: str):
+    """REPLAY_LOG_PATH가 설정된 경우, 티어 비교용 리플레이 코퍼스에 한 줄을 추가합니다."""
+    if not REPLAY_LOG_PATH:
+        return
+    record = {"node": node, "inputs": inputs, "decision": decision, "tier": tier}
+    with _stats_lock, open(REPLAY_LOG_PATH, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -1,12 +1,33 @@
+import os
+import time
 import nbformat
 from nbformat.v4 import new_code_cell, new_output
 from .state import AgentState
 from pydantic import BaseModel, Field
+from langchain_core.runnables import RunnableConfig
 # from langchain_core.pydantic_v1 import BaseModel, Field
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from typing import List, Literal
+from .llm import (
+    invoke_structured, tier_for, escalate, record_usage, log_replay, classify_stderr_locally,
+    ROUTE_CONFIDENCE_THRESHOLD, ESCALATE_AFTER_FAILURES,
+)
+from .history import make_record
+from .prompts import layout, session_context, recent_cells
+from .cell_plan import join_cells, merge_fix, failing_index, format_executed_cells
+from .perf_lint import PERF_LINT_ENABLED, MAX_LINT_ROUNDS, lint_plan, format_hints
+from .events import emit, PLAN, OUTPUT, EXEC_START, RESOURCE
+from .governor import priority_scope, current_priority, SPECULATIVE
+from .branches import branch_key, cancel, run_unless_cancelled
+from .fix_loop import (
+    new_loop_stats, error_fingerprint, record_failure, budget_exceeded, backoff_delay, MAX_REPEATED_FAILURES,
+)
 from src.tools.jupyter_executor import JupyterExecutor
+from src.tools.output_store import OutputStore, METADATA_KEY
+from src.tools.resource_monitor import format_resources
+from src.tools.cell_profiler import format_profile
+from src.tools.large_data import LARGE_DATA_ENABLED, FULL_RUN_TIMEOUT, format_sampled
+from src.tools.skill_library import SkillLibrary
+from src.tools.lazy_notebook import LazyNotebook, RESIDENT_CELLS
 
 
 class SuggestedOptions(BaseModel):
@@ -14,13 +35,14 @@ class SuggestedOptions(BaseModel):
     options: List[str] = Field(description="A concise list of 3-5 logical next steps.")
 
 class CodePlan(BaseModel):
-    code: str = Field(description="Jupyter 커널에서 실행할 단일 Python 코드 블록.")
+    cells: List[str] = Field(description="Jupyter 커널에서 순서대로 실행할 Python 코드 셀 목록. 데이터 로딩, 모델 학습처럼 오래 걸리는 단계는 각자의 셀로 나눕니다.")
     reasoning: str = Field(description="이 코드가 주어진 작업을 어떻게 수행하는지에 대한 간략한 설명.")
 
 class Route(BaseModel):
     """The routing decision for the user's task."""
     destination: Literal["simple_task", "complex_task"] = Field(description="The destination to route to based on task complexity.")
     task_type: Literal["file_system", "data_analysis", "visualization", "ml_engineering", "general"] = Field(description="The specific expertise required for the task.")
+    confidence: float = Field(default=1.0, ge=0.0, le=1.0, description="How confident you are in this routing decision, from 0.0 to 1.0.")
 
 class ErrorDecision(BaseModel):
     """stderr 내용이 치명적인 오류인지 판단합니다."""
@@ -28,201 +50,333 @@ class ErrorDecision(BaseModel):
         description="True: Traceback, SyntaxError, NameError 등 코드를 수정해야 하는 치명적인 오류. False: [notice]나 pip 업데이트 알림처럼 무시해도 되는 경고 또는 빈 문자열."
     )
 
+# 각 노드의 system 지시문은 상수로 두어 제공자 프롬프트 캐시가 재사용할 수 있게 합니다. (src/agent/prompts.py 참고)
+ROUTER_SYSTEM = (
+    "You are an expert at classifying user requests for a Python coding agent. "
+    "First, determine if the task is 'simple_task' (can be done in one obvious step) or 'complex_task' (is vague and needs user feedback). "
+    "Second, classify the task into one of the following expertise types: "
+    "- 'file_system': For tasks involving file or directory listing, reading, writing (os, glob, pathlib). "
+    "- 'data_analysis': For tasks involving data manipulation, cleaning, and analysis (pandas, numpy). "
+    "- 'visualization': For tasks involving plotting and creating charts (matplotlib, seaborn). "
+    "- 'ml_engineering': For tasks involving machine learning model training and evaluation (scikit-learn). "
+    "- 'general': For any other general Python coding task. "
+    "Respond with the destination, the task_type and your confidence (0.0-1.0) in this decision."
+)
+
+
+def build_router_prompt(task: str) -> list:
+    return layout(ROUTER_SYSTEM, f"User's task: {task}")
+
+
+def decide_route(task: str, tier: str = None) -> tuple:
+    """
+    작은 모델로 먼저 라우팅하고, 확신도가 낮으면 한 단계씩 큰 모델로 올려 다시 묻습니다.
+    (Route, 최종 티어)를 반환합니다.
+    """
+    tier = tier or tier_for("router")
+    route = invoke_structured("router", Route, build_router_prompt(task), tier=tier).parsed
+    while route.confidence < ROUTE_CONFIDENCE_THRESHOLD and escalate(tier) != tier:
+        tier = escalate(tier)
+        route = invoke_structured("router", Route, build_router_prompt(task), tier=tier).parsed
+    return route, tier
+
+
 def router_node(state: AgentState) -> dict:
     """
     [역할: 총괄 매니저]
     사용자의 작업을 분석하여 '단순/복잡' 여부와 필요한 '전문가 유형'을 분류합니다.
     """
-    prompt = ChatPromptTemplate.from_messages([
-        ("system",
-         "You are an expert at classifying user requests for a Python coding agent. "
-         "First, determine if the task is 'simple_task' (can be done in one obvious step) or 'complex_task' (is vague and needs user feedback). "
-         "Second, classify the task into one of the following expertise types: "
-         "- 'file_system': For tasks involving file or directory listing, reading, writing (os, glob, pathlib). "
-         "- 'data_analysis': For tasks involving data manipulation, cleaning, and analysis (pandas, numpy). "
-         "- 'visualization': For tasks involving plotting and creating charts (matplotlib, seaborn). "
-         "- 'ml_engineering': For tasks involving machine learning model training and evaluation (scikit-learn). "
-         "- 'general': For any other general Python coding task. "
-         "Respond with both the destination and the task_type."),
-        ("human", "User's task: {task}")
-    ])
-    llm = ChatOpenAI(model="gpt-5-mini", temperature=0)
-    structured_llm = llm.with_structured_output(Route)
-
-    route = structured_llm.invoke(prompt.format(task=state["task"]))
+    # 사용자가 고른 옵션의 코드가 이미 사전 생성되어 있다면 LLM 호출 없이 바로 실행합니다.
+    prefetched_plan = state.get("prefetched_plan")
+    if prefetched_plan:
+        emit(PLAN, code=join_cells(prefetched_plan))
+        return {
+            "destination": "prefetched",
+            "plan": list(prefetched_plan),
+            "plan_cursor": 0,
+            "cell_seconds": [],
+            "prefetched_plan": None,
+            "fix_attempts": 0,
+            "loop_stats": new_loop_stats(),
+            "skill_id": None,
+            "skill_hint": None,
+            "lint_rounds": 0,
+            "perf_hints": None,
+        }
+
+    # 이전에 성공한 비슷한 작업이 있으면, 확실한 경우 router/generator 호출 없이 그 코드를 바로 실행합니다.
+    skill_hint = None
+    library = SkillLibrary.default()
+    match = library.lookup(state["task"]) if library else None
+    if library and library.is_confident(match):
+        library.stats["hits"] += 1
+        print(f"📚 스킬 라이브러리 적중 (유사도 {match.score:.2f}): '{match.skill['task']}'")
+        emit(PLAN, code=match.code)
+        return {
+            "destination": "skill_hit",
+            "task_type": match.skill["task_type"],
+            "plan": [match.code],
+            "plan_cursor": 0,
+            "cell_seconds": [],
+            "prefetched_plan": None,
+            "fix_attempts": 0,
+            "loop_stats": new_loop_stats(),
+            "skill_id": match.skill["id"],
+            "skill_hint": None,
+            "lint_rounds": 0,
+            "perf_hints": None,
+        }
+    if match:
+        library.stats["offers"] += 1
+        skill_hint = match.code
+
+    route, tier = decide_route(state["task"])
+    log_replay("router", {"task": state["task"]}, {"destination": route.destination, "task_type": route.task_type}, tier)
 
     # 다음 경로를 반환합니다. LangGraph는 이 값을 사용하여 분기합니다.
-    return {"destination": route.destination, "task_type": route.task_type}
+    # 새 턴이 시작되므로 fix-error 루프 카운터와 통계도 초기화합니다.
+    return {
+        "destination": route.destination,
+        "task_type": route.task_type,
+        "plan_cursor": 0,
+        "cell_seconds": [],
+        "fix_attempts": 0,
+        "loop_stats": new_loop_stats(),
+        "prefetched_plan": None,
+        "skill_id": None,
+        # 복잡한 작업은 사용자가 고른 옵션이 실제 작업이 되므로 참고 코드를 넘기지 않습니다.
+        "skill_hint": skill_hint if route.destination == "simple_task" else None,
+        "lint_rounds": 0,
+        "perf_hints": None,
+    }
+
+SUGGESTER_SYSTEM = (
+    "You are a helpful data analysis assistant. Your job is to look at the current state of the analysis "
+    "and suggest a list of logical next steps for the user to choose from. "
+    "Review the user's request, the recent notebook cells, and the history to make relevant suggestions. "
+    "Provide a concise list of 3-5 actionable options."
+)
+
 
 def option_suggester_node(state: AgentState) -> dict:
     """
     현재 상태(노트북 내용, 과거 기록 포함)를 종합적으로 분석하여
     사용자에게 다음에 수행할 작업 선택지를 제안합니다.
     """
-    # ✨ --- 여기가 핵심 수정 부분 ---
     # planner처럼, 제안을 위해서도 충분한 맥락 정보를 수집합니다.
-
-    # 최근 셀 내용 추출
-    notebook_data = state.get("notebook")
-    if isinstance(notebook_data, dict):
-        notebook = nbformat.from_dict(notebook_data)
-    else:
-        notebook = notebook_data # 이미 객체인 경우 그대로 사용
-    recent_cells_source = []
-    if notebook and notebook.cells:
-        num_recent_cells = 5
-        for cell in notebook.cells[-num_recent_cells:]:
-            if cell.cell_type == 'code':
-                recent_cells_source.append(f"# Previous Code Cell:\n{cell.source}")
-    formatted_recent_cells = "\n---\n".join(recent_cells_source)
-
-    # 과거 작업 내역 요약
-    formatted_history = "\n---\n".join(state.get("history", []))
-
-    # 프롬프트에 수집한 모든 맥락 정보를 포함시킵니다.
-    prompt = ChatPromptTemplate.from_messages([
-        ("system",
-         "You are a helpful data analysis assistant. Your job is to look at the current state of the analysis "
-         "and suggest a list of logical next steps for the user to choose from. "
-         "Review the user's request, the recent notebook cells, and the history to make relevant suggestions. "
-         "Provide a concise list of 3-5 actionable options."),
-        ("human",
-         "--- User's Overall Task ---\n"
-         "{task}\n\n"
-         "--- Recent Notebook Cells ---\n"
-         "{recent_cells}\n\n"
-         "--- Analysis History ---\n"
-         "{history}\n\n"
-         "Based on all the information above, what are the best next steps for the user to choose from? Respond with a list of options.")
-    ])
-
-    llm = ChatOpenAI(model="gpt-5-mini", temperature=0)
-    structured_llm = llm.with_structured_output(SuggestedOptions)
-
-    response = structured_llm.invoke(prompt.format(
-        task=state['task'],
-        recent_cells=formatted_recent_cells,
-        history=formatted_history
-    ))
+    # 세션 기록은 앞쪽(캐시 재사용)에, 이번 턴의 작업과 최근 셀은 마지막에 둡니다.
+    prompt = layout(
+        SUGGESTER_SYSTEM,
+        "--- Recent Notebook Cells (not in history) ---\n"
+        f"{recent_cells(state)}\n\n"
+        "--- User's Overall Task ---\n"
+        f"{state['task']}\n\n"
+        "Based on all the information above, what are the best next steps for the user to choose from? Respond with a list of options.",
+        session=session_context(state),
+    )
+    response = invoke_structured("suggester", SuggestedOptions, prompt).parsed
 
     return {"suggested_options": response.options}
 
 
-def code_generator_node(state: AgentState) -> dict:
+# 모든 전문가 모드가 공유하는 규칙을 앞에 두고, 전문가 설명은 그 뒤에 붙입니다.
+GENERATOR_RULES = (
+    "You are a Python code generation tool that writes code for a live Jupyter kernel."
+    "\n\n--- YOUR WORKFLOW & RULES ---\n"
+    "1. **Analyze & Plan:** Review all context and the `Task To Execute Now`."
+    "2. **Code Generation:** Write the Python code to accomplish the task as an ordered list of notebook cells. "
+    "Put expensive steps (loading data, fitting models) in their own early cells, so a failure in a later cell does not re-run them. "
+    "A small task can be a single cell."
+    "3. **Self-Testing (CRITICAL):** After writing the main logic (like a function or a complex transformation), you MUST add a few lines of simple test code (`assert` or `print` checks) to verify that your code works as expected. This helps catch errors early."
+    "   - *Example:* If you create a function `def add(a, b): ...`, you should add `assert add(3, 5) == 8` afterwards."
+    "4. **Error Handling:** If the previous step had an error (`STDERR` is not empty), your only goal is to fix that error. "
+    "Return only the replacement for the failing cell and the cells after it - the cells already done have run and their variables are live in the kernel."
+    "\n\n--- OTHER RULES ---\n"
+    " - If a library is needed, `!pip install` it."
+    " - If you need to plot, execute `%matplotlib inline` first."
+    " - If RESOURCES shows the last step used a lot of memory or time, prefer chunked, vectorized or sampled approaches."
+    " - If PROFILE names where the last cell spent its time and you are asked to make it faster, optimize that call first."
+    "\n\n--- YOUR EXPERTISE ---\n"
+)
+
+# 각 전문가 모드에 맞는 시스템 프롬프트를 정의합니다.
+EXPERT_PROMPTS = {
+    "file_system": "You are a Python expert specializing in file system operations. Use `os`, `glob`, and `pathlib` to handle file and directory tasks efficiently and safely. To process many independent files in parallel, use the preloaded `scatter(fn, items)` helper: it runs a top-level `def fn(item)` on helper kernels and returns the results in order.",
+    "data_analysis": "You are a senior data analyst. Your expertise is in using `pandas` and `numpy` for data manipulation, cleaning, aggregation, and analysis. Always aim for idiomatic pandas code. To read CSV/Parquet files, prefer the preloaded `load_dataset(path, columns=None)` helper over `pd.read_csv`: it returns a DataFrame served from a shared memory-mapped cache. For very large files it returns a representative sample while you develop (stdout says so; pass `stratify='col'` to keep group proportions), and the agent re-runs your cells on the full file once they succeed - so write code that is correct for any number of rows and never hard-code counts seen on the sample. For aggregations over files that may not fit in memory, iterate `for chunk in read_chunks(path, columns=[...])` and combine partial results (e.g. per-chunk groupby sums and counts).",
+    "visualization": "You are a data visualization specialist. Use `matplotlib` and `seaborn` to create clear and insightful charts. **CRITICAL: You MUST execute `%matplotlib inline` before any plotting commands.**",
+    "ml_engineering": "You are a machine learning engineer. Your specialty is using `scikit-learn` to build preprocessing pipelines, train models, and evaluate their performance. Use standard variable names like `X_train`, `y_train`. For hyperparameter sweeps or cross-validation folds, prefer the preloaded `scatter(fn, items)` helper over serial loops: define a top-level `def evaluate(params)` that returns the score, then `results = scatter(evaluate, param_list)` runs it on helper kernels (globals it uses, such as `X_train`, are shipped automatically) and returns results in input order.",
+    "general": "You are a general-purpose, highly skilled Python code generation tool. Write clean, efficient, and correct Python code to accomplish the given task."
+}
+
+
+def build_generator_prompt(state: AgentState, task: str) -> list:
     """
-    사용자가 선택한 명확하고 구체적인 단일 작업을 Python 코드로 변환합니다.
+    generator 프롬프트를 만듭니다. (노드와 옵션 사전 생성(speculation)이 함께 사용)
+    고정 지시문 -> 세션 기록 -> 이번 턴의 내용 순서로 배치합니다.
     """
-    # 1. 상태에서 필요한 모든 맥락 정보를 가져옵니다.
-    #    이제 'task'는 "결측치 확인"과 같이 매우 구체적인 명령입니다.
-    task = state["task"]
-    notebook_data = state.get("notebook")
-
+    # 'task'는 "결측치 확인"과 같이 매우 구체적인 명령입니다.
     stdout = state.get("stdout", "")
     stderr = state.get("stderr", "")
 
-    # 체크포인터가 객체를 dict로 변환했을 수 있으므로, 다시 NotebookNode 객체로 복원합니다.
-    if isinstance(notebook_data, dict):
-        notebook = nbformat.from_dict(notebook_data)
+    # 직전 실행의 자원 사용량 (예: 메모리를 9 GB 썼다면 청크 처리 등으로 바꾸도록)
+    history = state.get("history") or []
+    last_record = history[-1] if history and isinstance(history[-1], dict) else {}
+    resources = format_resources(last_record.get("resources")) or "(not measured)"
+    # 프로파일링 모드일 때만: 직전 셀이 시간을 어디에 썼는지 (예: 95%를 DataFrame.apply에서)
+    profile = format_profile(last_record.get("profile"))
+    profile_context = f"PROFILE (where that cell spent its time):\n{profile}\n\n" if profile else ""
+
+    # 스킬 라이브러리의 비슷한 성공 코드 (오류 수정 중에는 방해가 되므로 넣지 않음)
+    skill_hint = state.get("skill_hint") if not stderr else None
+    formatted_skill = f"```python\n{skill_hint}\n```" if skill_hint else "(none)"
+
+    # fix-error 턴: 성공한 앞 셀은 다시 만들지 않고, 실패한 셀부터의 나머지만 새로 만듭니다.
+    plan = state.get("plan") or []
+    cursor = (state.get("plan_cursor") or 0) if state.get("fix_attempts") else 0
+    if cursor < len(plan):
+        remaining = join_cells(plan[cursor:])
+        plan_context = (f"--- Context: Cells Of This Plan Already Done (do NOT repeat) ---\n{format_executed_cells(plan, cursor)}\n\n"
+                        f"--- Context: Failing Cell (cell {cursor + 1}) And The Cells After It ---\n```python\n{remaining}\n```\n\n")
     else:
-        notebook = notebook_data # 이미 객체인 경우 그대로 사용
-
-    # 최근 셀 내용 추출
-    recent_cells_source = []
-    if notebook and notebook.cells:
-        num_recent_cells = 5
-        for cell in notebook.cells[-num_recent_cells:]:
-            if cell.cell_type == 'code':
-                recent_cells_source.append(f"# Previous Code Cell:\n{cell.source}")
-    formatted_recent_cells = "\n---\n".join(recent_cells_source)
+        plan_context = ""
 
-    # 과거 작업 내역 요약
-    formatted_history = "\n---\n".join(state.get("history", []))
-
-    # 전문가 모드 결정
-    task_type = state.get("task_type", "general")
-
-    # 각 전문가 모드에 맞는 시스템 프롬프트를 정의합니다.
-    expert_prompts = {
-        "file_system": "You are a Python expert specializing in file system operations. Use `os`, `glob`, and `pathlib` to handle file and directory tasks efficiently and safely.",
-        "data_analysis": "You are a senior data analyst. Your expertise is in using `pandas` and `numpy` for data manipulation, cleaning, aggregation, and analysis. Always aim for idiomatic pandas code.",
-        "visualization": "You are a data visualization specialist. Use `matplotlib` and `seaborn` to create clear and insightful charts. **CRITICAL: You MUST execute `%matplotlib inline` before any plotting commands.**",
-        "ml_engineering": "You are a machine learning engineer. Your specialty is using `scikit-learn` to build preprocessing pipelines, train models, and evaluate their performance. Use standard variable names like `X_train`, `y_train`.",
-        "general": "You are a general-purpose, highly skilled Python code generation tool. Write clean, efficient, and correct Python code to accomplish the given task."
-    }
+    # 성능 린트가 되돌려 보낸 경우: 느린 패턴의 위치와 고치는 방법
+    perf_hints = state.get("perf_hints")
+    perf_context = (f"--- Context: Your Previous Code For This Task ---\n```python\n{join_cells(plan)}\n```\n\n"
+                    f"--- Context: Performance Review Of Your Previous Code (rewrite these parts) ---\n{perf_hints}\n\n"
+                    if perf_hints else "")
 
     # 선택된 전문가 모드에 맞는 시스템 프롬프트를 가져옵니다.
-    system_prompt = expert_prompts.get(task_type, expert_prompts["general"])
-    # 역할이 단순화된 만큼, 프롬프트도 훨씬 더 명확하고 간결해집니다.
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system",
-             f"{system_prompt}"
-             "\n\n--- YOUR WORKFLOW & RULES ---\n"
-             "1. **Analyze & Plan:** Review all context and the `Task To Execute Now`."
-             "2. **Code Generation:** Write the Python code to accomplish the task."
-             "3. **Self-Testing (CRITICAL):** After writing the main logic (like a function or a complex transformation), you MUST add a few lines of simple test code (`assert` or `print` checks) to verify that your code works as expected. This helps catch errors early."
-             "   - *Example:* If you create a function `def add(a, b): ...`, you should add `assert add(3, 5) == 8` afterwards."
-             "4. **Error Handling:** If the previous step had an error (`STDERR` is not empty), your only goal is to fix that error."
-             "\n\n--- OTHER RULES ---\n"
-             " - If a library is needed, `!pip install` it."
-             " - If you need to plot, execute `%matplotlib inline` first."),
-            ("human",
-             "--- Context: Recent Notebook Cells ---\n"
-             "{recent_cells}\n\n"
-             "--- Context: History of Past Actions ---\n"
-             "{history}\n\n"
-             # ✨ 수정된 부분: 직전 실행 결과를 전달하는 섹션 추가
-             "--- Context: Result of Last Execution ---\n"
-             "STDOUT:\n{stdout}\n\n"
-             "STDERR:\n{stderr}\n\n"
-             "--- **Task To Execute Now** ---\n"
-             "**{task}**\n\n"
-             "Please write the single block of Python code to perform your task based on your workflow.")
-        ]
+    task_type = state.get("task_type", "general")
+    system_prompt = GENERATOR_RULES + EXPERT_PROMPTS.get(task_type, EXPERT_PROMPTS["general"])
+
+    tail = (
+        "--- Context: Recent Notebook Cells (not in history) ---\n"
+        f"{recent_cells(state)}\n\n"
+        "--- Context: Result of Last Execution ---\n"
+        f"STDOUT:\n{stdout}\n\n"
+        f"STDERR:\n{stderr}\n\n"
+        f"RESOURCES (kernel process during that execution):\n{resources}\n\n"
+        f"{profile_context}"
+        "--- Context: Previously Successful Code For A Similar Task (adapt if useful) ---\n"
+        f"{formatted_skill}\n\n"
+        f"{plan_context}"
+        f"{perf_context}"
+        "--- **Task To Execute Now** ---\n"
+        f"**{task}**\n\n"
+        "Please write the ordered list of code cells to perform your task based on your workflow."
     )
+    return layout(system_prompt, tail, session=session_context(state))
 
-    # 3. LLM을 호출하여 코드를 생성합니다.
-    llm = ChatOpenAI(model="gpt-5-mini", temperature=0)
-    structured_llm = llm.with_structured_output(CodePlan)
 
-    response = structured_llm.invoke(prompt.format(
-        task=task,
-        recent_cells=formatted_recent_cells,
-        history=formatted_history,
-        stdout=stdout,
-        stderr=stderr
-    ))
-
-    # 4. 생성된 코드를 'plan'으로 반환하여 executor에게 전달합니다.
-    return {"plan": [response.code]}
-
-
-def code_executor_node(state: AgentState, executor: JupyterExecutor):
+def code_generator_node(state: AgentState) -> dict:
     """
-    코드를 실행하고, 실행 내역을 노트북에 기록한 뒤 저장합니다.
+    사용자가 선택한 명확하고 구체적인 단일 작업을 Python 코드로 변환합니다.
     """
-    code_to_run = state['plan'][-1]
-
-    if code_to_run == "FINISH":
-        return {"executed_code": "FINISH", "stdout": "Task completed."}
+    update, cells = generate_plan(state)
+    emit(PLAN, code=join_cells(cells))
+    return update
 
-    # 1. 상태에서 노트북 객체와 경로를 가져옵니다.
-    notebook_data = state['notebook']
-
-    if isinstance(notebook_data, dict):
-        notebook = nbformat.from_dict(notebook_data)
-    else:
-        notebook = notebook_data
 
-    notebook_path = state['notebook_path']
+def generate_plan(state: AgentState) -> tuple:
+    """
+    generator의 본체. (상태 업데이트, 새로 만든 셀 목록)을 반환합니다.
+    추측 수정 가지도 같은 함수로 만들므로, 그 결과는 generator가 만들었을 코드와 같은 프롬프트에서 나옵니다.
+    """
+    task = state["task"]
 
-    # 2. 노트북에 새로운 코드 셀을 추가합니다. (기록)
+    # 1. LLM을 호출하여 코드를 생성합니다.
+    #    fix-error 루프에서 같은 작업이 반복해서 실패하면 한 단계 큰 모델로 올립니다.
+    fix_attempts = state.get("fix_attempts", 0)
+    loop_stats = dict(state.get("loop_stats") or new_loop_stats())
+    tier = tier_for("generator")
+    if fix_attempts >= ESCALATE_AFTER_FAILURES or loop_stats["strategy_changes"]:
+        tier = escalate(tier)
+
+    # 같은 오류 지문이 다시 나왔다면, 같은 방식의 수정을 반복하지 않도록 전략 변경을 지시합니다.
+    if fix_attempts and loop_stats["fingerprints"].get(loop_stats["last_fingerprint"], 0) > 1:
+        task = (f"{task}\n\n(NOTE: Your previous fix failed with the SAME error again. "
+                "Do not repeat it - take a fundamentally different approach, "
+                "e.g. different library/API, simpler logic, or inspect the data first.)")
+
+    # 재시도 사이에는 지수 백오프를 둡니다.
+    delay = backoff_delay(fix_attempts)
+    if delay:
+        time.sleep(delay)
+        loop_stats["backoff_s"] += delay
+
+    response = invoke_structured("generator", CodePlan, build_generator_prompt(state, task), tier=tier)
+    loop_stats["generator_calls"] += 1
+    loop_stats["generator_tokens"] += response.usage.get("total_tokens", 0)
+
+    # 2. 생성된 셀 목록을 'plan'으로 반환하여 executor에게 전달합니다.
+    #    fix-error 턴이면 이미 성공한 앞 셀은 두고 실패한 셀부터 바꿉니다. (executor는 커서부터 실행)
+    cells = [cell for cell in response.parsed.cells if cell.strip()] or [""]
+    cursor = (state.get("plan_cursor") or 0) if fix_attempts else 0
+    plan = merge_fix(state.get("plan") or [], cursor, cells)
+    # 새로 만든 코드이므로 스킬 라이브러리 기록과의 연결을 끊습니다.
+    return {"plan": plan, "plan_cursor": cursor, "loop_stats": loop_stats, "skill_id": None, "perf_hints": None}, cells
+
+
+def perf_lint_node(state: AgentState) -> dict:
+    """
+    [로컬 검사] 생성된 셀을 실행하기 전에 AST로 느린 pandas/numpy 패턴을 찾습니다.
+    단순한 apply(lambda)는 벡터 연산으로 바로 고치고, 자동으로 고칠 수 없는 심각한 패턴(iterrows,
+    반복문 안의 concat 등)이 있으면 작업당 MAX_LINT_ROUNDS번까지 힌트와 함께 generator로 되돌려 보냅니다.
+    오류 수정 중에는 되돌려 보내지 않습니다. (오류를 고치는 것이 먼저)
+    """
+    if not PERF_LINT_ENABLED:
+        return {"destination": "execute"}
+    plan = list(state.get("plan") or [])
+    cursor = (state.get("plan_cursor") or 0) if state.get("fix_attempts") else 0
+    fixed_cells, findings = lint_plan(plan[cursor:])
+    if not findings:
+        return {"destination": "execute"}
+
+    loop_stats = dict(state.get("loop_stats") or new_loop_stats())
+    plan = plan[:cursor] + fixed_cells
+    fixed = [finding for _, finding in findings if finding.fixed]
+    if fixed:
+        loop_stats["lint_fixes"] += len(fixed)
+        print(f"⚡ 성능 린트: {len(fixed)}곳을 벡터 연산으로 바꿨습니다.")
+        emit(PLAN, code=join_cells(fixed_cells))
+
+    severe = [(i + cursor, finding) for i, finding in findings if finding.severe and not finding.fixed]
+    rounds = state.get("lint_rounds") or 0
+    update = {"plan": plan, "loop_stats": loop_stats}
+    if severe and rounds < MAX_LINT_ROUNDS and not state.get("fix_attempts"):
+        loop_stats["lint_revisions"] += 1
+        print(f"⚡ 성능 린트: 느린 패턴 {len(severe)}곳 - 힌트와 함께 코드를 다시 생성합니다.")
+        return {**update, "destination": "revise", "lint_rounds": rounds + 1, "perf_hints": format_hints(severe)}
+    return {**update, "destination": "execute"}
+
+
+def _execute_cell(executor: JupyterExecutor, code_to_run: str, notebook_path: str, timeout: int = 30,
+                  full_data: list = None) -> tuple:
+    """
+    셀 하나를 실행하고 출력을 담은 노트북 셀을 만듭니다. (cell, result, 걸린 시간)을 반환합니다.
+    full_data: 대용량 모드에서 표본 대신 전체 데이터로 다시 실행하는 경우, 표본으로 읽었던 파일 목록 (메타데이터에 기록)
+    """
+    # 1. 새로운 코드 셀을 만듭니다. (상태의 노트북은 최근 셀만 담은 뷰입니다)
     cell = new_code_cell(code_to_run)
-    notebook.cells.append(cell)
 
-    # 3. 코드를 실행합니다.
-    # executor = state['kernel_executor']
-    result = executor.execute(code_to_run)
+    # 2. 코드를 실행합니다.
+    # 출력은 도착하는 대로 custom 스트림으로 프론트엔드에 전달합니다.
+    emit(EXEC_START, code=code_to_run)
+    started = time.perf_counter()
+    # 실행 중 커널의 자원 측정값도 주기적으로 함께 전달합니다.
+    result = executor.execute(code_to_run, timeout=timeout,
+                              on_output=lambda stream, text: emit(OUTPUT, stream=stream, text=text),
+                              on_resources=lambda sample: emit(RESOURCE, sample=sample))
+    elapsed = time.perf_counter() - started
+    if result.get("resources"):
+        cell.metadata.setdefault(METADATA_KEY, {})["resources"] = result["resources"]
+    if result.get("memory"):
+        cell.metadata.setdefault(METADATA_KEY, {})["memory"] = result["memory"]
+    if result.get("profile"):
+        cell.metadata.setdefault(METADATA_KEY, {})["profile"] = result["profile"]
+    if full_data:
+        cell.metadata.setdefault(METADATA_KEY, {})["full_data"] = full_data
 
     # stdout 결과가 잇다면, name='stdout'인 stream 객체를 만들어 추가
     if result['stdout']:
@@ -235,13 +389,22 @@ def code_executor_node(state: AgentState, executor: JupyterExecutor):
 
     # 리치 출력(이미지 등)을 추가
     if result['outputs']:
+        # 큰 이미지는 내용 해시로 중복 제거하여 노트북 밖의 파일로 분리합니다.
+        output_store = OutputStore.for_notebook(notebook_path)
+        notebook_dir = os.path.dirname(os.path.abspath(notebook_path))
 
         for output_content in result['outputs']:
+            output_content = output_store.compact_output(output_content, notebook_dir)
+            output_type = output_content.get('output_type', 'display_data')
+            extra = {}
+            if output_type == 'execute_result':
+                extra['execution_count'] = output_content.get('execution_count')
             # nbformat이 요구하는 'data', 'metadata' 형식을 그대로 전달
             cell.outputs.append(new_output(
-                output_type=output_content.get('header', {}).get('msg_type', 'display_data'),
+                output_type=output_type,
                 data=output_content.get('data', {}),
-                metadata=output_content.get('metadata', {})
+                metadata=output_content.get('metadata', {}),
+                **extra
             ))
 
     # stderr 결과가 있다면, name='stderr'인 stream 객체를 만들어 추가
@@ -253,69 +416,307 @@ def code_executor_node(state: AgentState, executor: JupyterExecutor):
         )
         cell.outputs.append(stderr_output)
 
-    # 추가 실행 결과를 'Output' 객체로 만듭니다.
-    # 가장 일반적인 'stream' 타입의 출력으로 만듭니다.
-    # output = new_output(
-    #     output_type="stream",
-    #     name="stdout", # 표준 출력
-    #     text=observation, # executor가 반환한 결과 문자열
-    # )
-    # cell.outputs.append(output)
-    # 4. 변경된 노트북 객체를 파일에 다시 씁니다. (저장)
+    # 3. 파일 전체를 다시 쓰지 않고 새 셀만 노트북 파일 끝에 추가합니다. (저장)
     try:
-        with open(notebook_path, 'w', encoding='utf-8') as f:
-            nbformat.write(notebook, f)
+        LazyNotebook.open(notebook_path).append_cell(cell)
     except Exception as e:
         result["stderr"] += f"\n\n경고: 노트북 파일 저장 실패 - {e}"
+    return cell, result, elapsed
+
+
+def _run_cells(executor: JupyterExecutor, state: AgentState, plan: list, start: int, notebook, notebook_path: str,
+               timeout: int = 30, full_data: list = None) -> tuple:
+    """
+    plan의 셀을 start부터 순서대로 실행합니다. 예외가 난 셀에서 멈춥니다. (results, records, 셀별 걸린 시간)
+    """
+    results, records, seconds = [], [], []
+    for code_to_run in plan[start:]:
+        cell, result, elapsed = _execute_cell(executor, code_to_run, notebook_path, timeout, full_data)
+        results.append(result)
+        seconds.append(elapsed)
+
+        # 상태에는 출력을 뺀 셀만 최근 RESIDENT_CELLS개까지 남깁니다. (출력은 파일에서 필요할 때 읽음)
+        notebook.cells = notebook.cells[-(RESIDENT_CELLS - 1):] + [nbformat.from_dict(dict(cell, outputs=[]))]
+
+        # 상태의 history를 직접 수정하지 않고, 새 기록만 반환합니다. (리듀서가 뒤에 덧붙임)
+        records.append(make_record(state.get("task", ""), code_to_run, result, elapsed))
+        if result.get("error"):
+            break  # 뒤의 셀은 실패한 셀에 의존하므로 실행하지 않습니다.
+    return results, records, seconds
 
-    history = state.get("history", [])
-    summary = f"Executed Code:\n```python\n{code_to_run}\n```\n\nSTDOUT:\n{result['stdout']}\n\nSTDERR:\n{result['stderr']}"
-    history.append(summary)
 
-    # 5, 상태를 업데이트하여 반환합니다.
+def code_executor_node(state: AgentState, executor: JupyterExecutor, config: RunnableConfig = None):
+    """
+    plan의 셀들을 커서부터 순서대로 실행하고, 끝난 셀마다 바로 노트북에 기록합니다.
+    셀에서 예외가 나면 거기서 멈추고 커서를 그 셀에 둡니다. (fix-error 턴은 그 셀부터 다시 생성/실행)
+    """
+    plan = state['plan']
+
+    if plan[-1] == "FINISH":
+        return {"executed_code": "FINISH", "stdout": "Task completed."}
+
+    # 1. 상태에서 노트북 객체와 경로를 가져옵니다.
+    notebook_data = state['notebook']
+
+    if isinstance(notebook_data, dict):
+        notebook = nbformat.from_dict(notebook_data)
+    else:
+        notebook = notebook_data
+
+    notebook_path = state['notebook_path']
+    cursor = state.get('plan_cursor') or 0
+    cell_seconds = list(state.get('cell_seconds') or [])[:cursor]
+
+    # fix-error 턴이라면, 하나의 블록으로 다시 실행했을 때 들었을 앞 셀들의 시간을 절약한 것입니다.
+    loop_stats = dict(state.get("loop_stats") or new_loop_stats())
+    fixing = state.get("fix_attempts", 0) > 0
+    if fixing:
+        loop_stats["reexec_saved_s"] = loop_stats.get("reexec_saved_s", 0.0) + sum(cell_seconds)
+
+    # 2. 셀을 하나씩 실행합니다.
+    results, records, seconds = _run_cells(executor, state, plan, cursor, notebook, notebook_path)
+    cell_seconds += seconds
+    if fixing:
+        loop_stats["reexec_s"] = loop_stats.get("reexec_s", 0.0) + sum(seconds)
+
+    # 3. 대용량 모드: 큰 파일 대신 표본으로 끝까지 성공했다면, plan 전체를 전체 데이터로 한 번 다시 실행합니다.
+    #    (커서 앞의 셀도 앞선 턴에서 표본으로 실행되었으므로 처음부터) 실패하면 그 셀부터 다시 표본으로 고칩니다.
+    sampled = executor.sampled_sources() if LARGE_DATA_ENABLED and failing_index(cursor, results) is None else []
+    if sampled:
+        print(f"📦 대용량 모드: 표본에서 성공했습니다. 전체 데이터로 다시 실행합니다. ({format_sampled(sampled)})")
+        executor.set_data_mode("full")
+        try:
+            results, full_records, cell_seconds = _run_cells(executor, state, plan, 0, notebook, notebook_path,
+                                                             timeout=FULL_RUN_TIMEOUT, full_data=sampled)
+        finally:
+            executor.set_data_mode("sample")
+        records += full_records
+        cursor = 0
+        loop_stats["full_runs"] += 1
+        loop_stats["full_run_s"] += sum(cell_seconds)
+        if failing_index(0, results) is None:
+            executor.sampled_sources(clear=True)
+        elif results[-1].get("error"):
+            results[-1]["stderr"] += ("\n\nNote: this error happened while re-running the plan on the FULL dataset; "
+                                      "the same cells succeeded on a sample of it.")
+
+    # 4. 다음 fix-error 턴이 시작할 셀: 예외가 난 셀, 없으면 stderr를 쓴 첫 셀
+    failed_at = failing_index(cursor, results)
+    if results[-1].get("error"):
+        # 코드가 바뀔 것이므로 함께 실행 중인 다음 단계 제안은 필요 없습니다.
+        cancel(branch_key(state, config, "execute"))
+        # 오류 분류기와 generator가 실패한 셀만 보도록 합니다.
+        executed_code, stdout, stderr = plan[failed_at], results[-1]["stdout"], results[-1]["stderr"]
+    else:
+        executed_code = plan[failed_at] if failed_at is not None else join_cells(plan[cursor:])
+        stdout = "\n".join(result["stdout"] for result in results if result["stdout"])
+        stderr = "\n".join(result["stderr"] for result in results if result["stderr"])
+
+    # 성공한 실행은 스킬 라이브러리에 쌓고, 라이브러리에서 꺼낸 코드라면 결과만 기록합니다.
+    succeeded = failed_at is None
+    library = SkillLibrary.default()
+    if library:
+        if state.get("skill_id"):
+            library.record_outcome(state["skill_id"], succeeded)
+        elif succeeded:
+            library.add(state.get("task", ""), state.get("task_type", "general"), join_cells(plan))
+
+    # 5. 상태를 업데이트하여 반환합니다.
     return {
-        "executed_code": code_to_run,
-        "stdout": result["stdout"],
-        "stderr": result["stderr"],
+        "executed_code": executed_code,
+        "stdout": stdout,
+        "stderr": stderr,
+        "last_error": results[-1].get("error"),
+        "plan_cursor": len(plan) if failed_at is None else failed_at,
+        "cell_seconds": cell_seconds,
+        "loop_stats": loop_stats,
         "notebook": notebook,
-        "history": history
+        "history": records
     }
 
-def error_classifier_node(state: AgentState) -> dict:
+ERROR_CLASSIFIER_SYSTEM = (
+    "You are an expert error classifier. Your job is to analyze an error log (STDERR) *and* the code that produced it. "
+    "You must decide if the error is a CRITICAL, code-breaking error that requires fixing the code, or an IGNORABLE warning."
+    "\n\nCRITICAL errors include: Traceback, SyntaxError, NameError, TypeError, FileNotFoundError, etc."
+    "\nIGNORABLE warnings include: '[notice]', 'A new release of pip is available', deprecation warnings, etc."
+    "\nIf STDERR is empty, it is not a critical error."
+    "\nRespond with boolean 'is_critical_error' only."
+)
+
+
+def build_error_classifier_prompt(code: str, stderr: str) -> list:
+    # 프롬프트를 통해 LLM에게 명확한 판단 기준을 제시합니다.
+    return layout(
+        ERROR_CLASSIFIER_SYSTEM,
+        "--- EXECUTED CODE ---\n"
+        f"```python\n{code}\n```\n\n"
+        f"--- STDERR ---\n{stderr}\n\n"
+        "Is this a critical error that requires fixing the code?",
+    )
+
+
+def decide_error(code: str, stderr: str, fix_attempts: int = 0, tier: str = None) -> tuple:
+    """
+    먼저 로컬 휴리스틱으로 판단하고, 애매한 경우에만 LLM을 호출합니다.
+    fix-error 루프가 반복되면 한 단계 큰 모델을 사용합니다. (is_critical, 티어)를 반환합니다.
+    """
+    if tier is None:
+        start = time.perf_counter()
+        is_critical, _ = classify_stderr_locally(stderr)
+        if is_critical is not None:
+            record_usage("heuristic", None, time.perf_counter() - start, {})
+            return is_critical, "heuristic"
+        tier = tier_for("error_classifier")
+        if fix_attempts >= ESCALATE_AFTER_FAILURES:
+            tier = escalate(tier)
+    decision = invoke_structured("error_classifier", ErrorDecision, build_error_classifier_prompt(code, stderr), tier=tier).parsed
+    return decision.is_critical_error, tier
+
+
+def record_critical_error(state: AgentState) -> tuple:
+    """
+    치명적인 오류 하나를 fix-error 루프에 기록합니다. (LLM 호출 없음)
+    오류 지문으로 같은 실패의 반복을 감지하고, 턴 단위 예산을 확인합니다.
+    (fix_attempts, loop_stats, 반복 횟수, 중단 사유 - 계속하면 None)를 반환합니다.
+    """
+    loop_stats = dict(state.get("loop_stats") or new_loop_stats())
+    fix_attempts = state.get("fix_attempts", 0) + 1
+    repeats = record_failure(loop_stats, error_fingerprint(state.get("last_error"), state.get("stderr", "")))
+    if repeats >= MAX_REPEATED_FAILURES:
+        stop_reason = f"repeated_failure ({loop_stats['last_fingerprint']} x{repeats})"
+    else:
+        stop_reason = budget_exceeded(loop_stats, fix_attempts)
+    if not stop_reason and repeats > 1:
+        loop_stats["strategy_changes"] += 1
+    return fix_attempts, loop_stats, repeats, stop_reason
+
+
+def error_classifier_node(state: AgentState, config: RunnableConfig = None) -> dict:
     """
     [Node] AI 기반의 오류 분류기 (AI 심판)
     'stderr'와 '실행된 코드'를 함께 분석하여,
     이것이 코드를 수정해야 하는 '치명적인 오류'인지 판단합니다.
+    동시에 실행 중인 추측 수정 가지가 있다면, 수정이 필요 없다고 판단한 즉시 그 가지를 취소합니다.
     """
     stderr = state.get("stderr", "")
     executed_code = state.get("executed_code", "")  # 실행된 코드를 가져옵니다.
+    fix_attempts = state.get("fix_attempts", 0)
 
-    # 프롬프트를 통해 LLM에게 명확한 판단 기준을 제시합니다.
-    prompt = ChatPromptTemplate.from_messages([
-        ("system",
-         "You are an expert error classifier. Your job is to analyze an error log (STDERR) *and* the code that produced it. "
-         "You must decide if the error is a CRITICAL, code-breaking error that requires fixing the code, or an IGNORABLE warning."
-         "\n\nCRITICAL errors include: Traceback, SyntaxError, NameError, TypeError, FileNotFoundError, etc."
-         "\nIGNORABLE warnings include: '[notice]', 'A new release of pip is available', deprecation warnings, etc."
-         "\nIf STDERR is empty, it is not a critical error."),
-        ("human",
-         "--- EXECUTED CODE ---\n"
-         "```python\n{code}\n```\n\n"
-         "--- STDERR ---\n{stderr}\n\n"
-         "Is this a critical error that requires fixing the code? Respond with boolean 'is_critical_error' only.")
-    ])
-
-    llm = ChatOpenAI(model="gpt-5-mini", temperature=0)  # 사용 가능한 모델로 설정
-    structured_llm = llm.with_structured_output(ErrorDecision)
-
-    # ✨ invoke 호출 시 executed_code를 함께 전달
-    decision = structured_llm.invoke(prompt.format(
-        code=executed_code,
-        stderr=stderr
-    ))
-
-    if decision.is_critical_error:
-        print("🔥 AI가 심각한 오류를 감지했습니다. 수정을 위해 generator로 돌아갑니다.")
-        return {"destination": "fix_error"}
-    else:
-        return {"destination": "no_error"}
\ No newline at end of file
+    is_critical_error, tier = decide_error(executed_code, stderr, fix_attempts)
+    log_replay("error_classifier", {"code": executed_code, "stderr": stderr}, {"is_critical_error": is_critical_error}, tier)
+
+    if not is_critical_error:
+        cancel(branch_key(state, config, "fix"))
+        return {"destination": "no_error"}
+
+    fix_attempts, loop_stats, repeats, stop_reason = record_critical_error(state)
+    if stop_reason:
+        cancel(branch_key(state, config, "fix"))
+        loop_stats["stopped_reason"] = stop_reason
+        print(f"🛑 fix-error 루프를 중단합니다: {stop_reason}")
+        return {"destination": "give_up", "fix_attempts": fix_attempts, "loop_stats": loop_stats}
+
+    if repeats > 1:
+        print(f"🔁 같은 오류가 {repeats}번째 반복되었습니다. 다른 전략으로 수정을 시도합니다.")
+    print("🔥 AI가 심각한 오류를 감지했습니다. 수정을 위해 generator로 돌아갑니다.")
+    return {"destination": "fix_error", "fix_attempts": fix_attempts, "loop_stats": loop_stats}
+
+
+def speculative_fix_node(state: AgentState, config: RunnableConfig = None) -> dict:
+    """
+    [가지] 오류 분류기와 동시에 실행됩니다. 오류가 치명적이라고 가정하고, 분류기가 기록할 fix-error 상태를
+    미리 계산해 generator와 같은 프롬프트로 수정 코드를 만들어 둡니다. 결과는 'speculative_fix'에만 쓰고,
+    쓸지 버릴지는 fix_join이 분류기의 결정을 보고 정합니다. 분류기가 먼저 '수정 불필요'로 끝나면 취소됩니다.
+    """
+    stderr = state.get("stderr", "")
+    is_critical, _ = classify_stderr_locally(stderr)
+    if is_critical is False:
+        return {"speculative_fix": None}  # 분류기도 LLM 없이 곧바로 '오류 아님'으로 끝냅니다.
+    fix_attempts, loop_stats, _, stop_reason = record_critical_error(state)
+    if stop_reason:
+        return {"speculative_fix": None}
+
+    def generate():
+        # 분류기의 판단이 애매할 때만 진짜 추측이므로 대화형 호출보다 뒤로 밀리게 합니다.
+        priority = max(current_priority(), SPECULATIVE) if is_critical is None else current_priority()
+        with priority_scope(priority):
+            return generate_plan({**state, "fix_attempts": fix_attempts, "loop_stats": loop_stats})
+
+    try:
+        generated, cancelled = run_unless_cancelled(branch_key(state, config, "fix"), generate)
+    except Exception as e:
+        print(f"⚠️ 추측 수정 생성 실패 (generator가 다시 만듭니다): {e}")
+        return {"speculative_fix": None}
+    if cancelled:
+        return {"speculative_fix": None}
+    update, cells = generated
+    # 분류기가 loop_stats를 따로 돌려주므로, generator가 더한 값만 차이로 넘깁니다.
+    delta = {name: update["loop_stats"][name] - loop_stats[name]
+             for name in ("generator_calls", "generator_tokens", "backoff_s")}
+    return {"speculative_fix": {"plan": update["plan"], "plan_cursor": update["plan_cursor"], "cells": cells,
+                                "loop_stats_delta": delta}}
+
+
+def fix_join_node(state: AgentState) -> dict:
+    """
+    [합류] 오류 분류기와 추측 수정 가지가 모두 끝난 뒤 실행됩니다.
+    분류기가 수정을 결정했고 추측 수정이 있으면 그 코드를 plan으로 쓰고 (generator 호출 생략),
+    없으면 generator로 보냅니다. 수정이 필요 없거나 루프를 중단했다면 추측 수정은 버립니다.
+    """
+    speculative = state.get("speculative_fix")
+    destination = state.get("destination")
+    if destination != "fix_error":
+        return {"speculative_fix": None}
+    loop_stats = dict(state.get("loop_stats") or new_loop_stats())
+    if not speculative:
+        return {"destination": "generate", "speculative_fix": None}
+
+    for name, value in speculative["loop_stats_delta"].items():
+        loop_stats[name] += value
+    loop_stats["speculative_fixes"] += 1
+    emit(PLAN, code=join_cells(speculative["cells"]))
+    return {
+        "destination": "lint",
+        "plan": speculative["plan"],
+        "plan_cursor": speculative["plan_cursor"],
+        "loop_stats": loop_stats,
+        "skill_id": None,
+        "perf_hints": None,
+        "speculative_fix": None,
+    }
+
+
+NEXT_STEP_SUGGESTER_SYSTEM = (
+    "You are a helpful data analysis assistant. The user's current task is being executed right now. "
+    "Suggest a list of logical follow-up steps the user may want to run after it finishes. "
+    "Provide a concise list of 3-5 actionable options."
+)
+
+
+def next_step_suggester_node(state: AgentState, config: RunnableConfig = None) -> dict:
+    """
+    [가지] 셀이 커널에서 실행되는 동안 다음 단계 선택지를 미리 만듭니다. (JUPYTER_LLM_SUGGEST_NEXT=1)
+    실행이 예외로 끝나면 executor가 취소하므로, 다음 executor 실행 때 다시 시도합니다.
+    """
+    prompt = layout(
+        NEXT_STEP_SUGGESTER_SYSTEM,
+        "--- Recent Notebook Cells (not in history) ---\n"
+        f"{recent_cells(state)}\n\n"
+        "--- Current Task ---\n"
+        f"{state['task']}\n\n"
+        "--- Code Now Running ---\n"
+        f"```python\n{join_cells(state.get('plan') or [])}\n```\n\n"
+        "What are the best next steps once this code has run? Respond with a list of options.",
+        session=session_context(state),
+    )
+
+    def suggest():
+        with priority_scope(max(current_priority(), SPECULATIVE)):
+            return invoke_structured("suggester", SuggestedOptions, prompt).parsed.options
+
+    try:
+        options, cancelled = run_unless_cancelled(branch_key(state, config, "execute"), suggest)
+    except Exception as e:
+        print(f"⚠️ 다음 단계 제안 실패: {e}")
+        return {}
+    return {} if cancelled else {"suggested_options": options}
@@ -0,0 +1,328 @@
+import os
+import re
+import ast
+import copy
+from dataclasses import dataclass
+from typing import List, Optional
+
+# 성능 린트 단계 (기본 켜짐). 0이면 생성된 코드를 그대로 실행합니다.
+PERF_LINT_ENABLED = os.getenv("JUPYTER_LLM_PERF_LINT", "1") != "0"
+# 자동으로 고칠 수 없는 심각한 패턴이 있을 때 generator에게 힌트와 함께 되돌려 보내는 최대 횟수 (작업당)
+MAX_LINT_ROUNDS = int(os.getenv("JUPYTER_LLM_PERF_LINT_ROUNDS", "1"))
+
+# 셀 매직(%matplotlib)과 셸 명령(!pip)은 파싱 전에 같은 길이의 주석으로 가립니다. (줄/열 위치 유지)
+_MAGIC_LINE = re.compile(r"^(\s*)([%!].*)$", re.MULTILINE)
+
+_VECTOR_BINOPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_VECTOR_CMPOPS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+# 이 메서드의 결과에 대한 apply(lambda)는 그룹/창 단위 호출이라 산술식으로 바꿀 수 없습니다.
+_GROUPING_METHODS = {"groupby", "rolling", "expanding", "ewm", "resample", "pipe"}
+
+
+@dataclass
+class LintFinding:
+    rule: str
+    line: int
+    message: str
+    severe: bool = False   # True이면 자동 수정이 안 될 때 generator에게 되돌려 보냅니다.
+    fixed: bool = False
+
+
+def _mask_magics(code: str) -> str:
+    return _MAGIC_LINE.sub(lambda m: m.group(1) + "#" + " " * (len(m.group(2)) - 1), code)
+
+
+def _vectorizable(node, param: str, row_form: bool) -> bool:
+    """
+    람다 본문이 열/시리즈 전체에 그대로 적용해도 같은 결과인 산술/비교식인지 확인합니다.
+    (숫자 상수, 매개변수 자신 또는 row['col'], 사칙연산, 단항 부호, 비교 하나)
+    """
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, (int, float)) and not isinstance(node.value, bool)
+    if isinstance(node, ast.Name):
+        return not row_form and node.id == param
+    if isinstance(node, ast.Subscript):
+        return (row_form and isinstance(node.value, ast.Name) and node.value.id == param
+                and isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str))
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, (ast.USub, ast.UAdd)) and _vectorizable(node.operand, param, row_form)
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Pow):
+            # 원소의 dtype을 알 수 없으므로 결과가 항상 실수인 실수 상수 지수만 허용합니다.
+            # (정수 지수는 파이썬 int의 정확한 큰 수가 int64에서 조용히 넘치고, 음수 지수는 numpy에서 오류)
+            exponent = node.right
+            if not (isinstance(exponent, ast.Constant) and type(exponent.value) is float):
+                return False
+        return (isinstance(node.op, _VECTOR_BINOPS) and _vectorizable(node.left, param, row_form)
+                and _vectorizable(node.right, param, row_form))
+    if isinstance(node, ast.Compare):
+        return (len(node.ops) == 1 and isinstance(node.ops[0], _VECTOR_CMPOPS)
+                and _vectorizable(node.left, param, row_form) and _vectorizable(node.comparators[0], param, row_form))
+    return False
+
+
+def _uses_param(node, param: str) -> bool:
+    """람다 본문이 매개변수(원소 또는 행)를 쓰는지. 상수만 돌려주는 람다는 바꾸면 결과가 스칼라가 됩니다."""
+    return any(isinstance(n, ast.Name) and n.id == param for n in ast.walk(node))
+
+
+def _column_receiver(node) -> bool:
+    """pandas 열로 보이는 수신 객체인지 (df['col'], self.df['col'] 등). 다른 객체의 apply/map은 바꾸지 않습니다."""
+    return (isinstance(node, ast.Subscript) and _simple_receiver(node.value)
+            and isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str))
+
+
+def _simple_receiver(node) -> bool:
+    """두 번 써도 부작용이 없는 수신 객체인지 (df, self.df, frames['a'] 등; 함수 호출 없음)."""
+    if isinstance(node, ast.Name):
+        return True
+    if isinstance(node, ast.Attribute):
+        return _simple_receiver(node.value)
+    if isinstance(node, ast.Subscript):
+        return _simple_receiver(node.value) and isinstance(node.slice, ast.Constant)
+    return False
+
+
+class _Rewriter(ast.NodeTransformer):
+    """람다 본문 안의 매개변수(row['col'] 또는 v)를 수신 객체로 바꿉니다."""
+    def __init__(self, param: str, receiver: ast.AST):
+        self.param = param
+        self.receiver = receiver
+
+    def visit_Name(self, node):
+        return self.receiver if node.id == self.param else node
+
+    def visit_Subscript(self, node):
+        if isinstance(node.value, ast.Name) and node.value.id == self.param:
+            return ast.Subscript(value=self.receiver, slice=node.slice, ctx=ast.Load())
+        return self.generic_visit(node)
+
+
+def _grouped(receiver) -> bool:
+    return any(isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+               and node.func.attr in _GROUPING_METHODS for node in ast.walk(receiver))
+
+
+def _axis(call: ast.Call) -> Optional[object]:
+    for keyword in call.keywords:
+        if keyword.arg == "axis":
+            return keyword.value.value if isinstance(keyword.value, ast.Constant) else "?"
+    return None
+
+
+def _loop_names(loop) -> set:
+    return {node.id for node in ast.walk(loop.target) if isinstance(node, ast.Name)} if isinstance(loop, ast.For) else set()
+
+
+class _Visitor(ast.NodeVisitor):
+    def __init__(self, source: str):
+        self.source = source
+        self.findings: List[LintFinding] = []
+        self.edits = []  # (시작 오프셋, 끝 오프셋, 바꿀 텍스트)
+        self.loops = []
+        # ast의 col_offset은 UTF-8 바이트 단위이므로 위치와 수정은 바이트 기준으로 계산합니다.
+        self._offsets = [0]
+        for line in source.encode("utf-8").splitlines(keepends=True):
+            self._offsets.append(self._offsets[-1] + len(line))
+
+    def _span(self, node) -> tuple:
+        return (self._offsets[node.lineno - 1] + node.col_offset, self._offsets[node.end_lineno - 1] + node.end_col_offset)
+
+    def _add(self, rule, node, message, severe=False, fixed=False):
+        self.findings.append(LintFinding(rule, node.lineno, message, severe, fixed))
+
+    # --- 반복문 안의 패턴 ---
+    def _visit_loop(self, node):
+        if isinstance(node, ast.For):
+            iterator = node.iter
+            if isinstance(iterator, ast.Call) and isinstance(iterator.func, ast.Attribute) \
+                    and iterator.func.attr in ("iterrows", "itertuples"):
+                self._add("iterrows", node, f"`for ... in .{iterator.func.attr}()` loops row by row in Python; "
+                          "use column operations (df['a'] * df['b'], np.where, groupby/merge) instead.", severe=True)
+        self.loops.append(node)
+        self.generic_visit(node)
+        self.loops.pop()
+
+    visit_For = _visit_loop
+    visit_While = _visit_loop
+
+    def visit_Assign(self, node):
+        if self.loops:
+            self._check_accumulate(node)
+            self._check_cell_write(node)
+        self.generic_visit(node)
+
+    def _check_accumulate(self, node):
+        """반복문 안에서 같은 변수에 concat/append/np.append 결과를 다시 넣는 패턴 (반복마다 전체 복사)."""
+        if len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name) or not isinstance(node.value, ast.Call):
+            return
+        target, call = node.targets[0].id, node.value
+        func = call.func
+        if not isinstance(func, ast.Attribute):
+            return
+        uses_target = any(isinstance(n, ast.Name) and n.id == target for arg in call.args for n in ast.walk(arg))
+        if func.attr == "concat" and uses_target:
+            self._add("concat-in-loop", node, f"`{target} = pd.concat([{target}, ...])` inside a loop copies all rows "
+                      "every iteration; append the pieces to a list and call pd.concat once after the loop.", severe=True)
+        elif func.attr in ("append", "_append") and isinstance(func.value, ast.Name) and func.value.id == target:
+            self._add("concat-in-loop", node, f"`{target} = {target}.{func.attr}(...)` inside a loop copies the frame "
+                      "every iteration; collect rows/frames in a list and build the DataFrame once.", severe=True)
+        elif func.attr in ("append", "concatenate", "vstack", "hstack") and isinstance(func.value, ast.Name) \
+                and func.value.id in ("np", "numpy") and uses_target:
+            self._add("np-append-in-loop", node, f"`np.{func.attr}` on `{target}` inside a loop reallocates the array "
+                      "every iteration; preallocate (np.empty) or collect in a list and stack once.", severe=True)
+
+    def _check_cell_write(self, node):
+        """반복 변수로 인덱싱하는 df.loc/at/iloc/iat 쓰기 (셀 하나씩 쓰는 루프)."""
+        loop_vars = set().union(*(_loop_names(loop) for loop in self.loops))
+        for target in node.targets:
+            if isinstance(target, ast.Subscript) and isinstance(target.value, ast.Attribute) \
+                    and target.value.attr in ("loc", "at", "iloc", "iat") \
+                    and any(isinstance(n, ast.Name) and n.id in loop_vars for n in ast.walk(target.slice)):
+                self._add("cell-write-in-loop", node, f"writing `.{target.value.attr}[...]` one row at a time in a loop; "
+                          "compute the whole column with a vectorized expression (or np.where/np.select).", severe=True)
+
+    # --- apply / map ---
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr in ("apply", "map") and node.args:
+            self._check_apply(node, func)
+        self.generic_visit(node)
+
+    def _check_apply(self, node, func):
+        fn = node.args[0]
+        axis = _axis(node)
+        row_form = axis in (1, "columns")
+        extra_args = len(node.args) > 1 or any(k.arg not in ("axis",) for k in node.keywords)
+        if _grouped(func.value):
+            return
+        if isinstance(fn, ast.Lambda) and len(fn.args.args) == 1 and not extra_args \
+                and not fn.args.vararg and not fn.args.kwarg and (axis is None or row_form):
+            param = fn.args.args[0].arg
+            # axis=1은 DataFrame.apply에만 있으므로 수신 객체가 DataFrame이고, 그 밖에는 df['col'] 형태만 바꿉니다.
+            receiver_ok = _simple_receiver(func.value) if row_form else _column_receiver(func.value)
+            if _vectorizable(fn.body, param, row_form) and _uses_param(fn.body, param) and receiver_ok:
+                receiver = func.value
+                # 수신 객체는 원래 소스 텍스트를 그대로 쓰고, 람다 본문만 다시 씁니다.
+                placeholder = ast.Name(id="__receiver__", ctx=ast.Load())
+                body = _Rewriter(param, placeholder).visit(copy.deepcopy(fn.body))
+                receiver_text = ast.get_source_segment(self.source, receiver)
+                if not isinstance(receiver, (ast.Name, ast.Attribute, ast.Subscript, ast.Call)):
+                    receiver_text = f"({receiver_text})"
+                replacement = "(" + ast.unparse(body).replace("__receiver__", receiver_text) + ")"
+                start, end = self._span(node)
+                self.edits.append((start, end, replacement))
+                self._add("apply-lambda", node, f"vectorized `.{func.attr}(lambda ...)` -> `{replacement}`", fixed=True)
+                return
+        if row_form:
+            self._add("apply-axis1", node, "`.apply(..., axis=1)` calls Python once per row; rewrite it with column "
+                      "arithmetic, np.where/np.select, or .str/.dt accessors.", severe=True)
+        elif isinstance(fn, ast.Lambda):
+            hint = ""
+            if isinstance(fn.body, ast.Call) and isinstance(fn.body.func, ast.Attribute):
+                hint = f" (e.g. `.str.{fn.body.func.attr}(...)` / `.dt` accessors)"
+            self._add("apply-lambda", node, f"`.{func.attr}(lambda ...)` runs Python per element; prefer a "
+                      f"vectorized expression{hint}.")
+
+
+def lint_cell(code: str) -> tuple:
+    """
+    셀 하나를 검사합니다. 자동으로 고칠 수 있는 패턴은 고친 코드를, 나머지는 찾은 항목으로 돌려줍니다.
+    (고친 코드, [LintFinding]) - 파싱할 수 없는 코드는 그대로 둡니다.
+    """
+    try:
+        tree = ast.parse(_mask_magics(code))
+    except SyntaxError:
+        return code, []
+    visitor = _Visitor(code)
+    visitor.visit(tree)
+    # 겹치는 수정(중첩된 apply)은 바깥 것 하나만 적용하고, 뒤에서부터 적용해 앞의 위치가 바뀌지 않게 합니다.
+    applied = []
+    for start, end, text in sorted(visitor.edits, key=lambda edit: (edit[0], -edit[1])):
+        if applied and start < applied[-1][1]:
+            continue
+        applied.append((start, end, text))
+    raw = code.encode("utf-8")
+    for start, end, text in reversed(applied):
+        raw = raw[:start] + text.encode("utf-8") + raw[end:]
+    return raw.decode("utf-8"), visitor.findings
+
+
+def lint_plan(cells: List[str]) -> tuple:
+    """셀 목록 전체를 검사합니다. (고친 셀 목록, [(셀 번호, LintFinding)])"""
+    fixed_cells, findings = [], []
+    for i, cell in enumerate(cells):
+        fixed, cell_findings = lint_cell(cell)
+        fixed_cells.append(fixed)
+        findings.extend((i, finding) for finding in cell_findings)
+    return fixed_cells, findings
+
+
+def format_hints(findings: list) -> str:
+    """generator에게 되돌려 보낼 때 프롬프트에 넣을 힌트 목록."""
+    return "\n".join(f"- cell {i + 1}, line {finding.line} [{finding.rule}]: {finding.message}"
+                     for i, finding in findings if not finding.fixed)
+
+
+
+if __name__ == '__main__':
+    # 벤치마크 코퍼스: 생성기가 자주 만드는 느린 코드와, 린트가 고친 코드(또는 힌트대로 다시 쓴 코드)의 실행 시간
+    import sys
+    import time
+    import numpy as np
+    import pandas as pd
+
+    ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    rng = np.random.default_rng(0)
+
+    def make_frame(rows):
+        return pd.DataFrame({"price": rng.uniform(1, 100, rows), "qty": rng.integers(1, 20, rows),
+                             "disc": rng.uniform(0, 5, rows), "city": rng.choice(["Seoul", "Busan", "Daegu"], rows)})
+
+    def timed(code, env):
+        started = time.perf_counter()
+        exec(code, env)
+        return time.perf_counter() - started
+
+    # (이름, 느린 코드, 힌트대로 다시 쓴 코드 - None이면 린트의 자동 수정 결과를 씀, 행 수, 비교할 변수)
+    corpus = [
+        ("apply-lambda (Series)", "df['total'] = df['price'].apply(lambda p: p * 1.1 + 2)", None, ROWS, "df"),
+        ("apply-axis1 (row arithmetic)",
+         "df['total'] = df.apply(lambda r: r['price'] * r['qty'] - r['disc'], axis=1)", None, ROWS // 10, "df"),
+        ("apply-lambda (comparison)", "df['big'] = df['qty'].apply(lambda q: q > 10)", None, ROWS, "df"),
+        ("iterrows",
+         "totals = []\nfor _, row in df.iterrows():\n    totals.append(row['price'] * row['qty'])\n"
+         "df['total'] = totals",
+         "df['total'] = df['price'] * df['qty']", ROWS // 40, "df"),
+        ("concat-in-loop",
+         "out = pd.DataFrame()\nfor start in range(0, len(df), 1000):\n"
+         "    out = pd.concat([out, df.iloc[start:start + 1000]])",
+         "out = pd.concat([df.iloc[start:start + 1000] for start in range(0, len(df), 1000)])", ROWS // 10, "out"),
+        ("np-append-in-loop",
+         "acc = np.array([])\nfor value in df['price'].to_numpy():\n    acc = np.append(acc, value * 2)",
+         "acc = df['price'].to_numpy() * 2", ROWS // 200, "acc"),
+    ]
+
+    print(f"{'pattern':<30} {'rows':>10} {'before s':>9} {'after s':>9} {'speedup':>8}  how")
+    total_before = total_after = 0.0
+    for name, slow, reference, rows, var in corpus:
+        fixed, findings = lint_cell(slow)
+        assert findings, f"{name}: not detected"
+        after_code = fixed if reference is None else reference
+        if reference is None:
+            assert all(f.fixed for f in findings), f"{name}: expected an automatic rewrite, got {findings}"
+        frame = make_frame(rows)
+        env_before = {"pd": pd, "np": np, "df": frame.copy()}
+        env_after = {"pd": pd, "np": np, "df": frame.copy()}
+        before_s, after_s = timed(slow, env_before), timed(after_code, env_after)
+        expected, got = env_before[var], env_after[var]
+        if isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(expected.reset_index(drop=True), got.reset_index(drop=True),
+                                          check_dtype=False)
+        else:
+            np.testing.assert_allclose(expected, got)
+        total_before += before_s
+        total_after += after_s
+        how = "auto-fix" if reference is None else "hint -> rewrite"
+        print(f"{name:<30} {rows:>10,} {before_s:>9.3f} {after_s:>9.4f} {before_s / max(after_s, 1e-6):>7.0f}x  {how}")
+    print(f"{'total':<30} {'':>10} {total_before:>9.3f} {total_after:>9.4f}  saved {total_before - total_after:.1f}s")
@@ -0,0 +1,110 @@
+from .history import code_hash, format_history
+
+# 프롬프트는 항상 아래 순서의 메시지 목록으로 만듭니다. (제공자 측 프롬프트 캐시는 '앞부분이 같은' 요청끼리만 재사용됩니다)
+#   1. system  : 노드별로 고정된 지시문 (세션 내내, 세션 간에도 바이트 단위로 동일)
+#   2. session : 세션 기록처럼 뒤에만 덧붙는 맥락 (이전 턴의 내용이 그대로 앞부분으로 남음)
+#   3. tail    : 이번 턴에만 해당하는 내용 (작업, 직전 실행 결과 등)
+
+# 세션 기록은 고정 크기 블록 단위로 창을 밉니다. 창이 블록 하나만큼 밀릴 때만 캐시가 깨지고,
+# 그 사이에는 새 기록이 끝에 덧붙기만 하므로 앞부분이 계속 재사용됩니다.
+HISTORY_BLOCK = 8
+HISTORY_MAX_RECORDS = 24
+
+# 제공자 캐시의 최소 단위 (OpenAI: 1024 토큰부터 128 토큰 단위)
+CACHE_MIN_TOKENS = 1024
+CACHE_INCREMENT_TOKENS = 128
+
+
+def history_window(records: list) -> list:
+    """최근 HISTORY_MAX_RECORDS개 안팎의 기록을, 블록 경계에서 시작하도록 잘라 반환합니다."""
+    records = list(records or [])
+    overflow = len(records) - HISTORY_MAX_RECORDS
+    if overflow <= 0:
+        return records
+    start = -(-overflow // HISTORY_BLOCK) * HISTORY_BLOCK  # 블록 단위 올림
+    return records[start:]
+
+
+def session_context(state: dict) -> str:
+    """뒤에만 덧붙는 세션 맥락 (블록 단위로 창을 미는 실행 기록)."""
+    window = history_window(state.get("history"))
+    if not window:
+        return "--- Context: History of Past Actions ---\n(none yet)"
+    return "--- Context: History of Past Actions ---\n" + format_history(window)
+
+
+def recent_cells(state: dict, limit: int = 5) -> str:
+    """
+    노트북의 최근 코드 셀 중, 세션 기록에 이미 들어 있지 않은 셀만 (예: 이전 세션에서 실행된 셀).
+    세션이 길어지면 대부분 기록과 겹치므로 턴마다 달라지는 부분이 작아집니다.
+    """
+    notebook = state.get("notebook")
+    cells = notebook.get("cells", []) if isinstance(notebook, dict) else getattr(notebook, "cells", None) or []
+    seen = {record.get("code_hash") for record in state.get("history") or [] if isinstance(record, dict)}
+    sources = []
+    for cell in cells[-limit:]:
+        if cell.get("cell_type") == "code" and code_hash(cell.get("source", "")) not in seen:
+            sources.append(f"# Previous Code Cell:\n{cell.get('source', '')}")
+    return "\n---\n".join(sources) or "(none)"
+
+
+def layout(system: str, tail: str, session: str = None) -> list:
+    """
+    (역할, 내용) 메시지 목록을 만듭니다. LangChain 채팅 모델은 이 목록을 그대로 받습니다.
+    system은 반드시 상수여야 하며, 요청마다 달라지는 값을 넣으면 캐시가 재사용되지 않습니다.
+    """
+    messages = [("system", system)]
+    if session:
+        messages.append(("human", session))
+    messages.append(("human", tail))
+    return messages
+
+
+def render(messages: list) -> str:
+    """측정/로그용으로 메시지 목록을 하나의 문자열로 만듭니다."""
+    return "\n".join(f"{role}: {content}" for role, content in messages)
+
+
+def cacheable_prefix_tokens(previous: str, current: str, chars_per_token: int = 4) -> int:
+    """직전 요청과 공유하는 앞부분 중 제공자 캐시가 재사용할 수 있는 토큰 수의 추정치."""
+    shared = 0
+    for a, b in zip(previous, current):
+        if a != b:
+            break
+        shared += 1
+    tokens = shared // chars_per_token
+    if tokens < CACHE_MIN_TOKENS:
+        return 0
+    return tokens // CACHE_INCREMENT_TOKENS * CACHE_INCREMENT_TOKENS
+
+
+# --- 직접 실행하여 이전 레이아웃과 캐시 가능한 앞부분을 비교하는 경우 ---
+if __name__ == '__main__':
+    from .history import make_record
+
+    system = "You are a senior data analyst. " + "Follow the workflow rules carefully. " * 60
+    turns = 40
+    state = {"history": [], "notebook": {"cells": []}}
+    previous_old = previous_new = ""
+    totals = {"old": [0, 0], "new": [0, 0]}
+    for turn in range(turns):
+        task = f"step {turn}: aggregate column col{turn % 7} by group"
+        code = f"df.groupby('group')['col{turn % 7}'].agg(['mean', 'std'])\nprint('turn {turn}')"
+        stdout = f"turn {turn}\n" + "mean std\n" * 20
+
+        # 이전 레이아웃: 하나의 문자열에 (바뀌는) 최근 셀 -> 전체 기록 -> 직전 결과 -> 작업
+        cells = "\n---\n".join(f"# Previous Code Cell:\n{c['source']}" for c in state["notebook"]["cells"][-5:])
+        old = (f"System: {system}\nHuman: --- Recent Notebook Cells ---\n{cells}\n\n"
+               f"--- History ---\n{format_history(state['history'])}\n\n--- Last ---\n{stdout}\n\n--- Task ---\n{task}")
+        new = render(layout(system, f"--- Recent cells ---\n{recent_cells(state)}\n\n--- Last ---\n{stdout}\n\n"
+                                    f"--- Task ---\n{task}", session_context(state)))
+        for name, prompt, previous in (("old", old, previous_old), ("new", new, previous_new)):
+            totals[name][0] += cacheable_prefix_tokens(previous, prompt)
+            totals[name][1] += len(prompt) // 4
+        previous_old, previous_new = old, new
+
+        state["history"].append(make_record(task, code, {"stdout": stdout}, 0.1))
+        state["notebook"]["cells"].append({"cell_type": "code", "source": code})
+
+    for name, (cached, total) in totals.items():
+        print(f"{name}: cacheable {cached} / {total} input tokens ({cached / total:.0%})")
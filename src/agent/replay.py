@@ -0,0 +1,140 @@
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+
+from dotenv import load_dotenv
+
+from .llm import tier_report
+from .nodes import decide_route, decide_error
+from .fix_loop import new_loop_stats
+
+# 각 노드의 '기준' 결정은 가장 큰 모델로 만듭니다.
+REFERENCE_TIER = "large"
+
+
+def replay(corpus_path: str, limit: int = None) -> dict:
+    """
+    리플레이 코퍼스(JUPYTER_LLM_REPLAY_LOG로 기록한 JSONL)의 각 입력을
+    기본 티어 정책과 가장 큰 모델로 각각 판단하여 결정 일치율을 계산합니다.
+    """
+    agreement = defaultdict(lambda: {"total": 0, "agree": 0, "by_tier": defaultdict(int)})
+    with open(corpus_path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if limit:
+        records = records[:limit]
+
+    for record in records:
+        node, inputs = record["node"], record["inputs"]
+        if node == "router":
+            route, tier = decide_route(inputs["task"])
+            reference, _ = decide_route(inputs["task"], tier=REFERENCE_TIER)
+            agree = (route.destination, route.task_type) == (reference.destination, reference.task_type)
+        elif node == "error_classifier":
+            decision, tier = decide_error(inputs["code"], inputs["stderr"])
+            reference, _ = decide_error(inputs["code"], inputs["stderr"], tier=REFERENCE_TIER)
+            agree = decision == reference
+        else:
+            continue
+        stats = agreement[node]
+        stats["total"] += 1
+        stats["agree"] += int(agree)
+        stats["by_tier"][tier] += 1
+
+    return {
+        "agreement": {
+            node: {**stats, "rate": round(stats["agree"] / stats["total"], 4), "by_tier": dict(stats["by_tier"])}
+            for node, stats in agreement.items()
+        },
+        "tiers": tier_report(),
+    }
+
+
+def _failed_execution_state(inputs: dict) -> dict:
+    """코퍼스의 오류 분류기 입력을, executor가 그 코드를 실행하고 실패한 직후의 그래프 상태로 만듭니다."""
+    import nbformat
+    return {
+        "task": "Fix the failing code.",
+        "task_type": "general",
+        "plan": [inputs["code"]],
+        "plan_cursor": 0,
+        "cell_seconds": [0.0],
+        "executed_code": inputs["code"],
+        "stdout": "",
+        "stderr": inputs["stderr"],
+        "last_error": None,
+        "fix_attempts": 0,
+        "loop_stats": new_loop_stats(),
+        "notebook": nbformat.v4.new_notebook(),
+        "notebook_path": "replay.ipynb",
+        "suggested_options": [],
+        "skill_hint": None,
+        "lint_rounds": 0,
+        "perf_hints": None,
+    }
+
+
+def wall_time(corpus_path: str, limit: int = None) -> dict:
+    """
+    리플레이 코퍼스의 오류 분류기 입력마다, 실행이 실패한 직후부터 다음 실행할 코드가 준비될 때까지
+    (오류 분류 -> 수정 코드 생성)의 벽시계 시간을 순차 그래프와 병렬 가지 그래프에서 각각 잽니다.
+    """
+    from langgraph.checkpoint.memory import MemorySaver
+    from .graph import build_workflow
+
+    with open(corpus_path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records = [record for record in records if record["node"] == "error_classifier"][:limit]
+
+    apps = {mode: build_workflow(None, parallel=mode == "parallel", suggest_next=False)
+            .compile(checkpointer=MemorySaver(), interrupt_before=["perf_lint"])
+            for mode in ("sequential", "parallel")}
+    turns = []
+    for i, record in enumerate(records):
+        turn = {}
+        for mode, app in apps.items():
+            config = {"configurable": {"thread_id": f"replay-{mode}-{i}"}}
+            app.update_state(config, _failed_execution_state(record["inputs"]), as_node="executor")
+            started = time.perf_counter()
+            app.invoke(None, config)
+            turn[mode] = round(time.perf_counter() - started, 3)
+            values = app.get_state(config).values
+            # 다음 코드가 준비되어 perf_lint 앞에서 멈췄다면 수정 턴, 아니면 (오류 아님/중단) 턴 종료
+            turn[f"{mode}_fixed"] = bool(app.get_state(config).next)
+            if mode == "parallel":
+                turn["speculative_used"] = bool(values["loop_stats"].get("speculative_fixes"))
+        turns.append(turn)
+        print(f"{i:>4} sequential {turn['sequential']:>7.2f}s   parallel {turn['parallel']:>7.2f}s"
+              f"   speculative fix {'used' if turn['speculative_used'] else '-'}", file=sys.stderr)
+
+    def total(mode):
+        return round(sum(turn[mode] for turn in turns), 3)
+    return {
+        "turns": len(turns),
+        "sequential_s": total("sequential"),
+        "parallel_s": total("parallel"),
+        "speedup": round(total("sequential") / total("parallel"), 2) if turns and total("parallel") else None,
+        "same_outcome": sum(turn["sequential_fixed"] == turn["parallel_fixed"] for turn in turns),
+        "speculative_used": sum(turn["speculative_used"] for turn in turns),
+        "per_turn": turns,
+        "tiers": tier_report(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="티어 정책의 결정을 가장 큰 모델과 비교합니다.")
+    parser.add_argument("corpus", help="리플레이 코퍼스 JSONL")
+    parser.add_argument("--limit", type=int, default=None, help="처음 N개 레코드만 사용")
+    parser.add_argument("--wall-time", action="store_true",
+                        help="대신 fix-error 턴의 벽시계 시간을 순차 그래프와 병렬 가지 그래프로 비교")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    report = wall_time(args.corpus, args.limit) if args.wall_time else replay(args.corpus, args.limit)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .llm import invoke_structured
+from .governor import priority_scope, SPECULATIVE
+from .nodes import CodePlan, build_generator_prompt
+
+# 사용자가 메뉴를 보는 동안 미리 코드를 만들어 둘 상위 옵션 수
+DEFAULT_TOP_K = 3
+
+
+class PlanSpeculator:
+    """
+    'suggester' 인터럽트로 그래프가 멈춰 있는 동안, 제안된 상위 옵션들의 CodePlan을
+    백그라운드에서 동시에 미리 생성합니다. 선택된 옵션의 코드는 바로 실행되고,
+    나머지는 턴이 끝날 때 버려집니다.
+    """
+    def __init__(self, top_k: int = DEFAULT_TOP_K):
+        self.top_k = top_k
+        self._pool = ThreadPoolExecutor(max_workers=top_k, thread_name_prefix="speculate")
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.stats = {"started": 0, "used": 0, "discarded": 0, "failed": 0,
+                      "latency_with": [], "latency_without": []}
+
+    def start(self, state: dict, options: list):
+        """현재 그래프 상태를 기준으로 상위 옵션들의 코드 생성을 시작합니다."""
+        self.discard()
+        state = dict(state)
+        with self._lock:
+            for option in options[:self.top_k]:
+                self._futures[option] = self._pool.submit(self._generate, state, option)
+                self.stats["started"] += 1
+
+    @staticmethod
+    def _generate(state: dict, option: str) -> list:
+        prompt = build_generator_prompt({**state, "task": option, "stdout": "", "stderr": "", "skill_hint": None,
+                                         "fix_attempts": 0}, option)
+        # 사용자가 기다리는 대화형 호출보다 뒤로 밀리도록 낮은 우선순위로 요청합니다.
+        with priority_scope(SPECULATIVE):
+            return invoke_structured("generator", CodePlan, prompt).parsed.cells
+
+    def take(self, option: str) -> Optional[list]:
+        """
+        선택된 옵션의 사전 생성 코드(셀 목록)를 반환합니다. 아직 생성 중이라면 끝날 때까지 기다립니다.
+        (처음부터 새로 생성하는 것보다 항상 빠릅니다.) 없거나 실패했다면 None을 반환합니다.
+        """
+        with self._lock:
+            future = self._futures.pop(option, None)
+        if future is None:
+            return None
+        try:
+            code = future.result()
+        except Exception:
+            self.stats["failed"] += 1
+            return None
+        self.stats["used"] += 1
+        return code
+
+    def discard(self):
+        """사용되지 않은 사전 생성 작업을 모두 버립니다."""
+        with self._lock:
+            futures, self._futures = self._futures, {}
+        for future in futures.values():
+            future.cancel()
+            self.stats["discarded"] += 1
+
+    def record_latency(self, seconds: Optional[float], prefetched: bool):
+        """선택부터 첫 실행까지의 지연 시간을 사전 생성 사용 여부별로 기록합니다."""
+        if seconds is not None:
+            self.stats["latency_with" if prefetched else "latency_without"].append(seconds)
+
+    def report(self) -> dict:
+        def mean(values):
+            return round(sum(values) / len(values), 3) if values else None
+        return {
+            **{k: v for k, v in self.stats.items() if not k.startswith("latency")},
+            "mean_choice_to_execution_s": {
+                "with_pregeneration": mean(self.stats["latency_with"]),
+                "without_pregeneration": mean(self.stats["latency_without"]),
+            },
+        }
+
+    def shutdown(self):
+        self.discard()
+        self._pool.shutdown(wait=False)
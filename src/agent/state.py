@@ -1,7 +1,8 @@
 from typing import TypedDict, List
 from nbformat import NotebookNode
 from src.tools.jupyter_executor import JupyterExecutor
-from typing import TypedDict, List, Literal
+from typing import TypedDict, List, Literal, Optional, Annotated
+from .history import append_history
 
 class AgentState(TypedDict):
     """
@@ -9,7 +10,11 @@ class AgentState(TypedDict):
     """
     # 기본 작업 정보
     task: str
+    # 순서대로 실행할 코드 셀 목록과, 아직 성공하지 못한 첫 셀의 위치 (fix-error 턴은 여기서부터 다시 생성/실행)
     plan: List[str]
+    plan_cursor: int
+    # plan의 각 셀이 실행에 걸린 시간 (fix-error 턴에서 다시 실행하지 않아 절약한 시간을 잴 때 사용)
+    cell_seconds: List[float]
     executed_code: str
 
     # 실행 결과
@@ -21,11 +26,33 @@ class AgentState(TypedDict):
     notebook_path: str
     notebook: NotebookNode
 
-    # 에이전트의 장기 기억
-    history: List[str]
+    # 에이전트의 장기 기억: 구조화된 실행 기록 (append-only 리듀서로 누적)
+    history: Annotated[List[dict], append_history]
 
     suggested_options: List[str]
 
     # 라우터가 결정한 작업 종류와 전무가 모드를 저장
     destination: str
-    task_type: Literal["file_system", "data_analysis", "visualization", "ml_engineering", "general"]
\ No newline at end of file
+    task_type: Literal["file_system", "data_analysis", "visualization", "ml_engineering", "general"]
+
+    # 현재 턴에서 fix-error 루프를 돈 횟수 (모델 티어 승격에 사용)
+    fix_attempts: int
+
+    # 직전 실행의 구조화된 오류 (ename, evalue, traceback) - 없으면 None
+    last_error: Optional[dict]
+    # fix-error 루프 통계 (시작 시각, 토큰 사용량, 오류 지문별 횟수, 중단 사유 등)
+    loop_stats: dict
+
+    # 옵션 선택 시 함께 전달되는 사전 생성된 코드 (있으면 router/generator를 건너뜀)
+    prefetched_plan: Optional[List[str]]
+
+    # 스킬 라이브러리: 바로 실행한 기록의 id (성공/실패 기록용)와, generator에 참고로 줄 비슷한 코드
+    skill_id: Optional[str]
+    skill_hint: Optional[str]
+
+    # 성능 린트: 이번 작업에서 generator로 되돌려 보낸 횟수와, 그때 넘길 느린 패턴 힌트
+    lint_rounds: int
+    perf_hints: Optional[str]
+
+    # 오류 분류기와 동시에 실행된 추측 수정 가지의 결과 (fix_join이 쓰거나 버림)
+    speculative_fix: Optional[dict]
@@ -0,0 +1,336 @@
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import argparse
+import threading
+import contextvars
+import traceback
+from collections import Counter, defaultdict
+
+from dotenv import load_dotenv
+
+from src.tools.jupyter_executor import JupyterExecutor
+from src.tools.backends import KernelScheduler
+from src.agent.graph import create_agent_workflow
+from src.agent.llm import tier_report, node_mean_latency
+from src.agent.governor import LLMGovernor, priority_scope, BATCH
+from src.tools.skill_library import SkillLibrary
+from src.tools.lazy_notebook import load_notebook_view
+from src.agent.events import iter_events, NodeUpdate, InterruptEvent
+
+# 'suggester' 인터럽트를 사람 없이 해결하는 정책
+#  - first: 첫 번째 제안 옵션을 선택
+#  - task:  제안을 고르지 않고 원래 작업을 단순 작업(simple_task)으로 이어서 실행
+#  - skip:  실행하지 않고 'needs_human' 상태로 종료
+COMPLEX_POLICIES = ("first", "task", "skip")
+
+
+# 제한 시간이 지난 뒤 실행 중이던 노드가 끝나기를 기다리는 시간(초). 그동안 노트북 잠금을 쥐고 있습니다.
+STOP_GRACE_S = 10
+
+
+class TaskTimeout(Exception):
+    """작업이 제한 시간을 넘겼을 때 발생합니다."""
+
+
+class BatchWorker(threading.Thread):
+    """
+    전용 JupyterExecutor와 그래프를 가진 워커 스레드.
+    큐에서 작업을 하나씩 꺼내 비대화형으로 실행하고 결과를 콜백으로 넘깁니다.
+    """
+    def __init__(self, name: str, tasks: queue.Queue, on_result, options: argparse.Namespace, notebook_locks):
+        super().__init__(name=name, daemon=True)
+        self.tasks = tasks
+        self.on_result = on_result
+        self.options = options
+        self.notebook_locks = notebook_locks
+        self.executor = None
+        self.app = None
+
+    def _start_agent(self):
+        self.executor = JupyterExecutor(timeout=self.options.kernel_timeout)
+        self.app = create_agent_workflow(executor=self.executor)
+
+    def _stop_agent(self):
+        if self.executor:
+            self.executor.shutdown()
+        self.executor, self.app = None, None
+
+    def run(self):
+        # 배치 작업의 LLM 호출은 대화형 세션보다 낮은 우선순위로 처리됩니다.
+        with priority_scope(BATCH):
+            try:
+                while True:
+                    task = self.tasks.get()
+                    if task is None:
+                        break
+                    try:
+                        self.on_result(self.run_task(task))
+                    finally:
+                        self.tasks.task_done()
+            finally:
+                self._stop_agent()
+
+    def run_task(self, task: dict) -> dict:
+        """작업 하나를 재시도 정책에 따라 실행하고, 작업별 지표가 담긴 결과 dict를 반환합니다."""
+        retries = task.get("retries", self.options.retries)
+        base = {"id": task["id"], "task": task["task"], "notebook": task["notebook"], "worker": self.name}
+        attempt_errors = []
+        started = time.perf_counter()
+        for attempt in range(1, retries + 2):
+            # 시도마다 결과를 새로 만들어, 재시도가 성공해도 앞선 시도의 error/traceback이 남지 않게 합니다.
+            result = {**base, "attempts": attempt}
+            if attempt_errors:
+                result["attempt_errors"] = list(attempt_errors)
+            try:
+                if self.app is None:
+                    self._start_agent()
+                with self.notebook_locks[os.path.abspath(task["notebook"])]:
+                    result.update(self._run_once(task))
+                break
+            except Exception as e:
+                status = "timeout" if isinstance(e, TaskTimeout) else "error"
+                result.update(status=status, error=repr(e))
+                if not isinstance(e, TaskTimeout):
+                    result["traceback"] = traceback.format_exc()
+                attempt_errors.append({"attempt": attempt, "status": status, "error": repr(e)})
+                # 커널이 어떤 상태인지 알 수 없으므로 다음 시도는 새 커널에서 시작합니다.
+                self._stop_agent()
+        result["wall_time"] = round(time.perf_counter() - started, 3)
+        return result
+
+    def _run_once(self, task: dict) -> dict:
+        timeout = task.get("timeout", self.options.timeout)
+        policy = task.get("complex_policy", self.options.complex_policy)
+        deadline = time.monotonic() + timeout
+
+        # 제한 시간이 지나면 실행 중인 셀을 중단시켜 스트림이 다음 이벤트로 넘어가도록 합니다.
+        timer = threading.Timer(timeout, self.executor.interrupt)
+        timer.daemon = True
+        timer.start()
+        try:
+            notebook_path = task["notebook"]
+            notebook, _ = load_notebook_view(notebook_path)
+
+            config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+            self.app.update_state(config, {"notebook": notebook, "notebook_path": notebook_path, "history": []})
+
+            metrics = {"node_visits": Counter(), "executed_cells": 0, "auto_resolved": [], "resources": []}
+            inputs = {"task": task["task"], "suggested_options": []}
+            for _ in range(self.options.max_interrupts + 1):
+                options = self._stream(inputs, config, deadline, metrics)
+                if options is None:
+                    break
+                # 'suggester'에서 멈췄으므로 정책에 따라 사람 대신 선택합니다.
+                if policy == "skip" or not options:
+                    return {"status": "needs_human", "suggested_options": options, **self._finalize(config, metrics)}
+                if policy == "first":
+                    inputs = {"task": options[0], "suggested_options": []}
+                else:
+                    # 같은 작업을 다시 넣으면 router가 또 complex_task로 보내므로, 멈춘 지점(suggester 다음의
+                    # generator)부터 원래 작업을 단순 작업으로 이어서 실행합니다.
+                    self.app.update_state(config, {"destination": "simple_task"})
+                    inputs = None
+                metrics["auto_resolved"].append(options[0] if policy == "first" else task["task"])
+            else:
+                return {"status": "needs_human", "error": "too many interrupts", **self._finalize(config, metrics)}
+
+            values = self.app.get_state(config).values
+            if (values.get("loop_stats") or {}).get("stopped_reason"):
+                status = "gave_up"
+            else:
+                # 경고나 pip 알림처럼 stderr만 있는 실행은 성공입니다. (마지막 셀에서 예외가 났을 때만 실패)
+                status = "error" if values.get("last_error") else "ok"
+            return {"status": status, **self._finalize(config, metrics)}
+        finally:
+            timer.cancel()
+
+    def _events(self, inputs, config: dict, deadline: float):
+        """
+        그래프 이벤트를 별도 스레드에서 받아 넘겨줍니다. 노드 하나(LLM 호출 등)가 오래 걸려도 제한 시간이 되면
+        기다리지 않고 TaskTimeout을 냅니다. inputs가 None이면 멈춘 지점부터 이어서 실행합니다.
+        """
+        events, stop, done = queue.Queue(), threading.Event(), object()
+
+        def pump():
+            stream = iter_events(self.app, inputs, config)
+            try:
+                # 노드 사이마다 멈춤 신호를 확인하고, 멈추면 다음 노드를 시작하지 않고 스트림을 닫습니다.
+                for event in stream:
+                    if stop.is_set():
+                        return
+                    events.put(event)
+                events.put(done)
+            except BaseException as e:
+                events.put(e)
+            finally:
+                stream.close()
+
+        # LLM 우선순위(BATCH) 등 현재 스레드의 컨텍스트를 그대로 가져갑니다.
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(pump,),
+                                  name=f"{self.name}-graph", daemon=True)
+        thread.start()
+        try:
+            while True:
+                try:
+                    item = events.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise TaskTimeout("task exceeded its timeout") from None
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            self._join_graph(thread)
+
+    def _join_graph(self, thread: threading.Thread):
+        """
+        실행 중이던 노드(예: 셀을 실행하고 노트북에 기록하는 executor)가 끝날 때까지 기다립니다.
+        호출한 쪽이 노트북 잠금을 쥐고 있으므로, 같은 노트북의 재시도나 다른 작업과 기록이 섞이지 않습니다.
+        실행 중인 셀은 제한 시간에 타이머가 이미 중단시켰고, 그래도 끝나지 않으면 커널을 종료해 노드가 바로 실패하게 합니다.
+        """
+        thread.join(STOP_GRACE_S)
+        if thread.is_alive():
+            self._stop_agent()
+            thread.join(STOP_GRACE_S)
+        if thread.is_alive():
+            print(f"⚠️ {self.name}: 그래프 스레드가 {STOP_GRACE_S * 2}초 안에 멈추지 않았습니다. (노트북 기록이 늦게 끝날 수 있음)")
+
+    def _stream(self, inputs, config: dict, deadline: float, metrics: dict):
+        """그래프를 한 번 실행합니다. 'suggester'에서 멈추면 제안 옵션 목록을, 끝까지 실행되면 None을 반환합니다."""
+        # 전체 상태 대신 델타 이벤트만 받아 노드 방문 횟수를 셉니다.
+        for event in self._events(inputs, config, deadline):
+            if isinstance(event, NodeUpdate):
+                metrics["node_visits"][event.node] += 1
+                if event.node == "executor":
+                    # executor 한 번에 plan의 여러 셀이 실행될 수 있습니다. (셀마다 기록 하나)
+                    records = event.update.get("history") or []
+                    metrics["executed_cells"] += len(records)
+                    metrics["resources"].extend(record["resources"] for record in records if record.get("resources"))
+            elif isinstance(event, InterruptEvent):
+                return event.options
+        return None
+
+    def _finalize(self, config: dict, metrics: dict) -> dict:
+        values = self.app.get_state(config).values
+        return {
+            "task_type": values.get("task_type"),
+            "executed_cells": metrics["executed_cells"],
+            "node_visits": dict(metrics["node_visits"]),
+            "auto_resolved": metrics["auto_resolved"],
+            "fix_attempts": values.get("fix_attempts", 0),
+            # 셀별 자원 사용량 중 작업 전체의 최댓값
+            "peak_rss_mb": max((r.get("rss_mb_peak", 0) for r in metrics["resources"]), default=None),
+            "kernel_cpu_s": round(sum(r.get("cpu_s", 0) for r in metrics["resources"]), 3),
+            "loop_stats": {k: v for k, v in (values.get("loop_stats") or {}).items() if k != "started_at"},
+            "stdout_tail": (values.get("stdout") or "")[-500:],
+            "stderr_tail": (values.get("stderr") or "")[-500:],
+        }
+
+
+def load_tasks(path: str, default_notebook_dir: str) -> list:
+    """
+    작업 JSONL을 읽습니다. 각 줄은 최소한 'task'를 포함해야 하며,
+    'notebook'이 없으면 작업 id 이름의 노트북을 사용합니다.
+    """
+    tasks = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            task = json.loads(line)
+            if "task" not in task:
+                raise ValueError(f"{path}:{line_no}: 'task' 필드가 없습니다.")
+            task.setdefault("id", f"task-{line_no}")
+            task.setdefault("notebook", os.path.join(default_notebook_dir, f"{task['id']}.ipynb"))
+            if task.get("complex_policy", "first") not in COMPLEX_POLICIES:
+                raise ValueError(f"{path}:{line_no}: 알 수 없는 complex_policy '{task['complex_policy']}'")
+            tasks.append(task)
+    return tasks
+
+
+def run_batch(tasks: list, options: argparse.Namespace) -> list:
+    """
+    작업 목록을 최대 options.workers개의 워커로 병렬 실행하고, 끝나는 순서대로 결과를 JSONL에 기록합니다.
+    """
+    task_queue = queue.Queue()
+    for task in tasks:
+        task_queue.put(task)
+
+    results = []
+    write_lock = threading.Lock()
+    notebook_locks = defaultdict(threading.Lock)  # 같은 노트북을 대상으로 한 작업은 순서대로 실행
+    out = open(options.results, 'a', encoding='utf-8')
+
+    def on_result(result: dict):
+        with write_lock:
+            results.append(result)
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            print(f"[{len(results)}/{len(tasks)}] {result['id']}: {result['status']} "
+                  f"({result['wall_time']}s, attempts={result['attempts']})", flush=True)
+
+    num_workers = max(1, min(options.workers, len(tasks)))
+    workers = [BatchWorker(f"worker-{i}", task_queue, on_result, options, notebook_locks) for i in range(num_workers)]
+    for _ in workers:
+        task_queue.put(None)  # 워커 종료 신호
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        out.close()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="JSONL 작업 목록을 비대화형으로 병렬 실행합니다.")
+    parser.add_argument("tasks", help="작업 JSONL 파일 (한 줄에 하나: {\"id\", \"task\", \"notebook\", ...})")
+    parser.add_argument("--results", default="batch_results.jsonl", help="결과를 추가할 JSONL 파일")
+    parser.add_argument("--workers", type=int, default=2, help="동시에 실행할 워커(커널) 수")
+    parser.add_argument("--timeout", type=float, default=600, help="작업별 제한 시간(초)")
+    parser.add_argument("--retries", type=int, default=1, help="실패/시간 초과 시 재시도 횟수")
+    parser.add_argument("--complex-policy", choices=COMPLEX_POLICIES, default="first",
+                        help="'suggester' 인터럽트를 자동으로 해결하는 정책")
+    parser.add_argument("--max-interrupts", type=int, default=3, help="작업당 자동 해결할 최대 인터럽트 수")
+    parser.add_argument("--kernel-timeout", type=int, default=30, help="커널 준비 대기 시간(초)")
+    parser.add_argument("--notebook-dir", default="batch_notebooks", help="'notebook'이 없는 작업의 노트북 디렉터리")
+    parser.add_argument("--kernel-hosts", default=None,
+                        help="워커 커널을 나눠 둘 호스트 목록 (예: 'local,gateway:http://gpu-box:8888?token=...&capacity=8')")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    load_dotenv()
+    if not os.getenv("OPENAI_API_KEY"):
+        print("🛑 OPENAI_API_KEY가 설정되지 않았습니다.")
+        return 1
+
+    options = parse_args(argv)
+    os.makedirs(options.notebook_dir, exist_ok=True)
+    if options.kernel_hosts:
+        KernelScheduler.configure(options.kernel_hosts)
+    tasks = load_tasks(options.tasks, options.notebook_dir)
+    print(f"🚀 {len(tasks)}개 작업을 워커 {options.workers}개로 실행합니다.")
+
+    results = run_batch(tasks, options)
+    summary = Counter(result["status"] for result in results)
+    print(f"\n--- 🎉 배치 완료: {dict(summary)} → {options.results} ---")
+    print(f"📊 모델 티어별 호출 통계: {json.dumps(tier_report(), ensure_ascii=False)}")
+    print(f"🚦 LLM governor 통계: {json.dumps(LLMGovernor.default().report(), ensure_ascii=False)}")
+    library = SkillLibrary.default()
+    if library:
+        saved_per_hit = node_mean_latency("router") + node_mean_latency("generator")
+        print(f"📚 스킬 라이브러리 통계: {json.dumps(library.report(saved_per_hit), ensure_ascii=False)}")
+    return 0 if summary.get("ok", 0) == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
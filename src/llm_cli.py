@@ -1,29 +1,213 @@
 import os
 import sys
-import traceback
-import nbformat
-from dotenv import load_dotenv
+import time
 import uuid
+import argparse
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+# 무거운 모듈(langchain_openai, langgraph, nbformat, InquirerPy, rich, pyfiglet)은
+# 필요한 시점에 _timed_import()로 지연 로딩합니다. 타입 힌트용 임포트만 여기에 둡니다.
+if TYPE_CHECKING:
+    from rich.console import Console
+
+PROCESS_START = time.perf_counter()
+
+# --- 지연 임포트 및 시작 시간 측정 ---
+IMPORT_TIMES = {}  # 모듈 이름 -> (소요 시간(초), 임포트한 스레드 이름)
+_import_lock = threading.Lock()
+
+
+def _timed_import(name: str):
+    """
+    모듈을 임포트하고 처음 임포트될 때 걸린 시간을 기록합니다. (--profile-startup 용)
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    with _import_lock:
+        IMPORT_TIMES.setdefault(name, (time.perf_counter() - start, threading.current_thread().name))
+    return module
+
+
+def _inquirer():
+    """InquirerPy의 inquirer, Choice, InvalidArgument를 지연 로딩하여 반환합니다."""
+    inquirer = _timed_import("InquirerPy").inquirer
+    Choice = _timed_import("InquirerPy.base.control").Choice
+    InvalidArgument = _timed_import("InquirerPy.exceptions").InvalidArgument
+    return inquirer, Choice, InvalidArgument
+
+
+def _panel(*args, **kwargs):
+    return _timed_import("rich.panel").Panel(*args, **kwargs)
+
+
+def _boot_agent(notebook_filename: str, resume: bool = False) -> dict:
+    """
+    [백그라운드 스레드] 노트북을 불러오고, 커널을 시작하고, 그래프를 컴파일합니다.
+    사용자가 첫 명령을 입력하는 동안 병렬로 실행됩니다.
+    resume이면 세션 아카이브에서 마지막 상태와 실행 기록을 불러오고 커널 상태를 되살립니다.
+    """
+    timings = {}
+    start = time.perf_counter()
+    # 노트북 전체를 파싱하지 않고 최근 셀만 불러옵니다. (출력은 필요할 때 파일에서 읽음)
+    notebook, created = _timed_import("src.tools.lazy_notebook").load_notebook_view(notebook_filename)
+    if created:
+        message = (f"📄 새 노트북 '{notebook_filename}'을 생성했습니다.", "yellow")
+    else:
+        message = (f"📖 기존 노트북 '{notebook_filename}'을 불러왔습니다.", "green")
+    timings["notebook_load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    JupyterExecutor = _timed_import("src.tools.jupyter_executor").JupyterExecutor
+    executor = JupyterExecutor()
+    timings["kernel_boot"] = time.perf_counter() - start
+
+    boot = {"executor": executor, "message": message, "timings": timings}
+    try:
+        start = time.perf_counter()
+        create_agent_workflow = _timed_import("src.agent.graph").create_agent_workflow
+        app = create_agent_workflow(executor=executor)
+        timings["graph_compile"] = time.perf_counter() - start
 
-# --- CLI UI 라이브러리 임포트 ---
-import pyfiglet
-from rich.console import Console
-from rich.panel import Panel
-from InquirerPy import inquirer
-from InquirerPy.base.control import Choice
-from InquirerPy.exceptions import InvalidArgument
-# --- -------------------------- ---
+        thread_id = str(uuid.uuid4())
+        config = {"configurable": {"thread_id": thread_id}}
+        initial_state = {"notebook": notebook, "notebook_path": notebook_filename, "history": []}
 
-from src.tools.jupyter_executor import JupyterExecutor
-from src.agent.graph import create_agent_workflow
-from src.agent.state import AgentState
+        archive, resumed = None, {}
+        session_archive = _timed_import("src.tools.session_archive")
+        if session_archive.ARCHIVE_ENABLED:
+            start = time.perf_counter()
+            archive = session_archive.SessionArchive.for_notebook(notebook_filename)
+            if resume:
+                resumed = archive.resume_state()
+                if resumed:
+                    initial_state.update(resumed)
+                    report = archive.restore_kernel(executor)
+                    boot["resume_message"] = (
+                        f"⏪ 세션을 재개했습니다: 기록 {len(resumed['history'])}개, "
+                        f"커널 {session_archive.format_restore(report)}", "green")
+                else:
+                    boot["resume_message"] = (f"⚠️ '{archive.path}'에 재개할 턴이 없습니다.", "yellow")
+            archive.start_session(notebook_filename, resume=bool(resumed))
+            timings["session_resume" if resume else "session_archive"] = time.perf_counter() - start
+        app.update_state(config, initial_state)
+    except Exception:
+        executor.shutdown()
+        raise
+
+    boot.update(app=app, config=config, archive=archive, resumed=resumed)
+    return boot
+
+
+class _DeferredOutput:
+    """
+    부팅 스레드(와 그 스레드가 띄운 커널의 stderr 전달 스레드)가 sys.stdout/sys.stderr에 쓰는 내용을 모아 두었다가
+    release()할 때 순서대로 출력합니다. 부팅은 InquirerPy 프롬프트와 동시에 진행되므로, 그대로 출력하면
+    "🚀 Jupyter Kernel process started." 같은 줄이 프롬프트 화면에 끼어듭니다. 다른 스레드의 출력은 그대로 통과합니다.
+    """
+    class _Stream:
+        def __init__(self, owner, stream):
+            self._owner, self._stream = owner, stream
+
+        def write(self, text):
+            return self._owner.write(self._stream, text)
+
+        def __getattr__(self, name):  # flush, fileno, isatty, encoding 등은 원래 스트림으로
+            return getattr(self._stream, name)
+
+    def __init__(self, thread_prefix: str):
+        self._prefix = thread_prefix
+        self._lock = threading.Lock()
+        self._pending = []  # (원래 스트림, 텍스트)
+        self._released = False
+        self._originals = (sys.stdout, sys.stderr)
+        sys.stdout, sys.stderr = self._Stream(self, sys.stdout), self._Stream(self, sys.stderr)
+
+    def write(self, stream, text):
+        if threading.current_thread().name.startswith(self._prefix):
+            with self._lock:
+                if not self._released:
+                    self._pending.append((stream, text))
+                    return len(text)
+        return stream.write(text)
+
+    def release(self):
+        """모아 둔 출력을 내보내고 원래 스트림을 되돌립니다. (이후 출력은 바로 나감)"""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+            pending, self._pending = self._pending, []
+        sys.stdout, sys.stderr = self._originals
+        for stream, text in pending:
+            stream.write(text)
+        for stream in self._originals:
+            stream.flush()
+
+
+class AgentBoot:
+    """
+    백그라운드에서 시작 중인 에이전트(커널 + 그래프)에 대한 핸들.
+    처음 실제로 필요할 때(wait) 준비가 끝날 때까지 기다립니다.
+    부팅 중 출력(커널 시작 메시지, 커널 경고)은 모아 두었다가 wait()에서 부팅 결과와 함께 보여줍니다.
+    """
+    def __init__(self, notebook_filename: str, resume: bool = False):
+        self._output = _DeferredOutput(thread_prefix="agent-boot")
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-boot")
+        self._future = self._pool.submit(_boot_agent, notebook_filename, resume)
+        self._reported = False
+
+    def wait(self, console: "Console") -> dict:
+        try:
+            if not self._future.done():
+                with console.status("⏳ 커널과 에이전트를 준비하는 중입니다...", spinner="dots"):
+                    boot = self._future.result()
+            else:
+                boot = self._future.result()
+        finally:
+            self._output.release()
+        if not self._reported:
+            text, style = boot["message"]
+            console.print(text, style=style)
+            if boot.get("resume_message"):
+                text, style = boot["resume_message"]
+                console.print(text, style=style)
+            self._reported = True
+        return boot
+
+    def shutdown(self):
+        """부팅이 끝날 때까지 기다린 뒤 커널을 정리합니다. (부팅 실패 시에는 정리할 것이 없습니다.)"""
+        self._pool.shutdown(wait=True)
+        self._output.release()
+        if self._future.exception() is None:
+            self._future.result()["executor"].shutdown()
+
+
+def print_startup_profile(console: "Console", prompt_ready: float, boot: dict):
+    """--profile-startup: 임포트 시간과 시작 단계별 소요 시간을 출력합니다."""
+    Table = _timed_import("rich.table").Table
+    table = Table(title="⏱️ Startup profile", title_justify="left")
+    table.add_column("stage / module")
+    table.add_column("thread")
+    table.add_column("ms", justify="right")
+    for name, (seconds, thread_name) in sorted(IMPORT_TIMES.items(), key=lambda item: -item[1][0]):
+        table.add_row(f"import {name}", thread_name, f"{seconds * 1000:.1f}")
+    for stage, seconds in boot["timings"].items():
+        table.add_row(stage, "agent-boot", f"{seconds * 1000:.1f}")
+    table.add_row("[bold]first prompt ready[/bold]", "main", f"[bold]{prompt_ready * 1000:.1f}[/bold]")
+    console.print(table)
 
 
 # --- 헬퍼 함수 (show_option_menu) ---
-def show_option_menu(options: list, console: Console) -> str | None:
+def show_option_menu(options: list, console: "Console") -> str | None:
     if not options:
         console.print("😅 제안할 수 있는 이전 옵션이 없습니다.", style="yellow")
         return None
+    inquirer, Choice, InvalidArgument = _inquirer()
     console.print("\n🤔 다음 중 어떤 작업을 수행할까요?")
     choices = [Choice(opt, name=opt) for opt in options]
     choices.append(Choice("direct_input", name="[ 직접 입력 ]"))
@@ -46,77 +230,108 @@ def show_option_menu(options: list, console: Console) -> str | None:
 
 
 # --- 헬퍼 함수 (run_execution_graph) ---
-def run_execution_graph(app, config, task_to_run, session_history, previous_event, printed_plan=""):
-    console = Console()
-    console.print(f"\n--- 🚀 '{task_to_run}' 작업 시작 ---", style="bold yellow")
-
-    execution_events = app.stream({"task": task_to_run, "history": session_history}, config, stream_mode="values")
-
-    plan_just_printed = False
-
-    for event in execution_events:
-        if event.get("plan") and not plan_just_printed and printed_plan != event['plan'][-1]:
-            printed_plan = event.get("plan")[-1]
-            console.print(f"\n✅ 다음 단계: [ [bold magenta]generator[/bold magenta] ]")
-            console.print(Panel(event['plan'][-1], title="🤔 계획", border_style="magenta", title_align="left"))
-            plan_just_printed = True
-
-        elif event.get("executed_code") and event.get("executed_code") != previous_event.get("executed_code"):
-            console.print(f"\n✅ 다음 단계: [ [bold magenta]executor[/bold magenta] ]")
-            if event.get("stdout"):
-                console.print(Panel(event['stdout'], title="👀 STDOUT", border_style="green", title_align="left"))
-            if event.get("stderr"):
-                console.print(Panel(event['stderr'], title="🔥 STDERR", border_style="red", title_align="left"))
-
-            if event.get("history"):
-                session_history.append(event["history"][-1])
-            plan_just_printed = False
-
-        previous_event = event.copy()  # ✨ copy()로 수정
-
-    console.print("\n--- 🎉 작업 완료 ---", style="bold green")
-
-    return printed_plan, previous_event, plan_just_printed
+def run_execution_graph(app, config, task_to_run, renderer, title=None, prefetched_plan=None):
+    """
+    그래프를 한 번 실행하고 델타 이벤트를 렌더러로 출력한 뒤, 턴 요약(TurnResult)을 반환합니다.
+    실행 기록(history)은 그래프 상태에 리듀서로 누적되므로 여기서 다시 넘기지 않습니다.
+    prefetched_plan이 있으면 router/generator를 건너뛰고 그 코드를 바로 실행합니다.
+    """
+    run_turn = _timed_import("src.renderer").run_turn
+    inputs = {"task": task_to_run, "suggested_options": [], "prefetched_plan": prefetched_plan}
+    return run_turn(app, inputs, config, renderer, title=title)
+
+
+def archive_turn(boot: dict, task: str, turn):
+    """턴이 끝날 때마다 세션 아카이브에 기록합니다. (실패해도 세션은 계속됩니다)"""
+    if boot.get("archive") is None:
+        return
+    try:
+        state = boot["app"].get_state(boot["config"]).values
+        boot["archive"].record_turn(task, state, turn.routing, turn.interrupted, executor=boot["executor"])
+    except Exception as e:
+        print(f"⚠️ 세션 아카이브 기록 실패: {e}")
+
+
+def print_skill_report(console):
+    """스킬 라이브러리 적중률과, 건너뛴 router/generator 호출로 절약한 시간을 출력합니다."""
+    from src.agent.llm import node_mean_latency
+    from src.tools.skill_library import SkillLibrary
+    library = SkillLibrary.default()
+    if library and library.stats["lookups"]:
+        saved_per_hit = node_mean_latency("router") + node_mean_latency("generator")
+        console.print(f"📚 스킬 라이브러리 통계: {library.report(saved_per_hit)}", style="dim")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Interactive AI Code Agent for Jupyter")
+    parser.add_argument("--notebook", default="persistent_agent_notebook.ipynb", help="기록할 노트북 파일 경로")
+    parser.add_argument("--no-speculate", action="store_true",
+                        help="옵션 메뉴를 보는 동안 상위 옵션의 코드를 미리 생성하지 않습니다.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="첫 프롬프트까지의 시작 시간과 모듈별 임포트 시간을 출력하고 종료합니다.")
+    parser.add_argument("--kernel-host", default=None,
+                        help="커널을 실행할 곳 (local, attach:<연결 파일>, gateway:<URL>?token=...)")
+    parser.add_argument("--profile-cells", action="store_true",
+                        help="셀마다 cProfile/tracemalloc 프로파일을 노트북 메타데이터에 기록합니다. (셀이 느려질 수 있음)")
+    parser.add_argument("--hotspots", action="store_true",
+                        help="--notebook에 기록된 셀 프로파일로 노트북 전체의 핫스팟 보고서를 출력하고 종료합니다.")
+    parser.add_argument("--sequential", action="store_true",
+                        help="오류 분류와 추측 수정 등 독립적인 가지를 동시에 실행하지 않고 한 줄로 실행합니다.")
+    parser.add_argument("--suggest-next", action="store_true",
+                        help="셀이 실행되는 동안 다음 단계 제안을 함께 만듭니다. ([2] 메뉴에서 선택)")
+    parser.add_argument("--resume", action="store_true",
+                        help="노트북 옆의 세션 아카이브(<노트북 이름>.session)에서 마지막 세션을 이어서 진행합니다.")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="성공한 턴마다 커널 네임스페이스를 세션 아카이브에 저장합니다. (재개 시 셀을 다시 실행하지 않음)")
+    return parser.parse_args(argv)
 
 
 # --- 메인 함수 ---
-def main():
-    load_dotenv()
+def main(argv=None):
+    args = parse_args(argv)
+    if args.hotspots:
+        from src.tools.cell_profiler import hotspot_report
+        print("\n".join(hotspot_report(args.notebook)))
+        return
+    _timed_import("dotenv").load_dotenv()
     if not os.getenv("OPENAI_API_KEY"):
         print("🛑 OPENAI_API_KEY가 설정되지 않았습니다.")
         return
-
-    console = Console()
-    notebook_filename = "persistent_agent_notebook.ipynb"
+    if args.kernel_host:
+        # backends 모듈은 부팅 스레드에서 처음 임포트되므로 환경 변수로 넘깁니다.
+        os.environ["JUPYTER_LLM_KERNEL_HOSTS"] = args.kernel_host
+    if args.profile_cells:
+        os.environ["JUPYTER_LLM_PROFILE_CELLS"] = "1"
+    if args.sequential:
+        os.environ["JUPYTER_LLM_PARALLEL_BRANCHES"] = "0"
+    if args.suggest_next:
+        os.environ["JUPYTER_LLM_SUGGEST_NEXT"] = "1"
+    if args.snapshot:
+        os.environ["JUPYTER_LLM_ARCHIVE_SNAPSHOT"] = "1"
+
+    # 1. 커널 부팅과 그래프 컴파일을 백그라운드에서 먼저 시작합니다.
+    notebook_filename = args.notebook
+    agent_boot = AgentBoot(notebook_filename, resume=args.resume)
+
+    # 2. 그동안 메인 스레드는 로고와 첫 프롬프트를 바로 보여줍니다.
+    console = _timed_import("rich.console").Console()
+    speculator = None
     try:
-        with open(notebook_filename, 'r', encoding='utf-8') as f:
-            notebook = nbformat.read(f, as_version=4)
-            console.print(f"📖 기존 노트북 '{notebook_filename}'을 불러왔습니다.", style="green")
-    except FileNotFoundError:
-        notebook = nbformat.v4.new_notebook()
-        with open(notebook_filename, 'w', encoding='utf-8') as f:
-            nbformat.write(notebook, f)
-        console.print(f"📄 새 노트북 '{notebook_filename}'을 생성했습니다.", style="yellow")
-
-    executor = None
-    try:
-        executor = JupyterExecutor()
-        app = create_agent_workflow(executor=executor)
-
-        thread_id = str(uuid.uuid4())
-        config = {"configurable": {"thread_id": thread_id}}
-
-        initial_state = {"notebook": notebook, "notebook_path": notebook_filename, "history": []}
-        app.update_state(config, initial_state)
-
-        logo_text = pyfiglet.figlet_format("AI Code Agent", font="slant")
-        console.print(Panel(logo_text, title="🚀 Interactive AI Code Agent for Jupyter 🚀", border_style="bold blue"))
+        logo_text = _timed_import("pyfiglet").figlet_format("AI Code Agent", font="slant")
+        console.print(_panel(logo_text, title="🚀 Interactive AI Code Agent for Jupyter 🚀", border_style="bold blue"))
         console.print("\n🤖 AI 에이전트와의 대화를 시작합니다.", style="bold")
+        inquirer, Choice, InvalidArgument = _inquirer()
+
+        if args.profile_startup:
+            prompt_ready = time.perf_counter() - PROCESS_START
+            print_startup_profile(console, prompt_ready, agent_boot.wait(console))
+            return
 
-        session_history = []
+        renderer = _timed_import("src.renderer").RichRenderer(console)
         last_suggested_options = []
-        printed_plan = ""
-        previous_event = {}
+        if args.resume:
+            # 재개한 세션의 마지막 제안 목록을 [2] 메뉴에서 바로 고를 수 있도록 부팅을 기다립니다.
+            last_suggested_options = agent_boot.wait(console)["resumed"].get("suggested_options") or []
         while True:
             console.print("\n" + "=" * 50, style="bold dim")
             try:
@@ -138,75 +353,72 @@ def main():
                 console.print("👋 세션을 종료합니다.", style="bold yellow")
                 break
 
-            selected_task_for_execution = None
-
             if main_choice == "new":
                 task = console.input("\n▶ [bold cyan]당신의 명령[/bold cyan]: ")
                 if not task:
                     console.print("작업이 취소되었습니다.", style="yellow")
                     continue
 
-                # ✨ 수정: 새 작업 시, 'session_history'를 전달하고 'suggested_options'만 초기화합니다.
-                input_data = {"task": task, "history": session_history, "suggested_options": []}
-                events = app.stream(input_data, config, stream_mode="values")
-
-                is_complex_task = False
-                plan_just_printed = False
-
-                console.print("\n--- 🚀 AI 에이전트 작업 시작 ---", style="bold yellow")
-                for event in events:
-                    if event.get("plan") and not plan_just_printed and printed_plan != event['plan'][-1]:
-                        printed_plan = event['plan'][-1]
-                        console.print(f"\n✅ 다음 단계: [ [bold magenta]generator[/bold magenta] ]")
-                        console.print(
-                            Panel(event['plan'][-1], title="🤔 계획", border_style="magenta", title_align="left"))
-                        plan_just_printed = True
-
-                    elif event.get("executed_code") and event.get("executed_code") != previous_event.get(
-                            "executed_code"):
-                        console.print(f"\n✅ 다음 단계: [ [bold magenta]executor[/bold magenta] ]")
-                        if event.get("stdout"):
-                            console.print(
-                                Panel(event['stdout'], title="👀 STDOUT", border_style="green", title_align="left"))
-                        if event.get("stderr"):
-                            console.print(
-                                Panel(event['stderr'], title="🔥 STDERR", border_style="red", title_align="left"))
-
-                        # ✨ 수정: (단순 작업도) history를 바로 누적
-                        if event.get("history"):
-                            session_history.append(event["history"][-1])
-                        plan_just_printed = False
-
-                    if event.get("suggested_options"):
-                        is_complex_task = True
-                        last_suggested_options = event.get("suggested_options", [])
-                        break
-
-                    previous_event = event.copy()  # ✨ copy()로 수정
-
-                if not is_complex_task:
-                    console.print("\n--- 🎉 작업 완료 ---", style="bold green")
+                # 첫 명령을 실행할 때 비로소 커널/그래프 준비가 끝날 때까지 기다립니다.
+                boot = agent_boot.wait(console)
+                app, config = boot["app"], boot["config"]
+
+                # 새 작업 시 'suggested_options'만 초기화합니다.
+                turn = run_execution_graph(app, config, task, renderer, title="AI 에이전트 작업 시작")
+                archive_turn(boot, task, turn)
+                if not turn.interrupted:
+                    # 실행과 함께 만든 다음 단계 제안은 [2] 메뉴에서 고를 수 있게 남겨 둡니다.
+                    if turn.suggested_options:
+                        last_suggested_options = turn.suggested_options
+                        console.print("💡 다음 단계 제안이 준비되었습니다. ([2] 메뉴)", style="dim")
                     continue
-                else:
-                    selected_task_for_execution = show_option_menu(last_suggested_options, console)
+                last_suggested_options = turn.suggested_options
+
+            boot = agent_boot.wait(console)
+            app, config = boot["app"], boot["config"]
+
+            # 사용자가 메뉴를 보는 동안 상위 옵션들의 코드를 백그라운드에서 미리 생성합니다.
+            if not args.no_speculate and last_suggested_options:
+                if speculator is None:
+                    speculator = _timed_import("src.agent.speculation").PlanSpeculator()
+                speculator.start(app.get_state(config).values, last_suggested_options)
 
-            elif main_choice == "previous":
-                selected_task_for_execution = show_option_menu(last_suggested_options, console)
+            selected_task_for_execution = show_option_menu(last_suggested_options, console)
 
             if not selected_task_for_execution:
                 console.print("작업이 취소되었습니다.", style="yellow")
+                if speculator:
+                    speculator.discard()
                 continue
 
-            printed_plan, previous_event, plan_just_printed = run_execution_graph(app, config, selected_task_for_execution, session_history, previous_event, printed_plan)
+            prefetched_plan = speculator.take(selected_task_for_execution) if speculator else None
+            turn = run_execution_graph(app, config, selected_task_for_execution, renderer,
+                                       prefetched_plan=prefetched_plan)
+            archive_turn(boot, selected_task_for_execution, turn)
+            if turn.suggested_options:
+                last_suggested_options = turn.suggested_options
+            if speculator:
+                # 선택부터 첫 실행까지의 지연을 기록하고, 쓰이지 않은 사전 생성 코드는 버립니다.
+                speculator.record_latency(turn.time_to_first_execution, prefetched_plan is not None)
+                speculator.discard()
 
     except Exception as e:
         console.print(f"\n🛑 에이전트 실행 중 심각한 오류가 발생했습니다.", style="bold red")
         console.print_exception(show_locals=False)
     finally:
-        if executor:
-            console.print("\n--- 셧다운 ---", style="dim")
-            executor.shutdown()
+        console.print("\n--- 셧다운 ---", style="dim")
+        if speculator:
+            console.print(f"⚡ 사전 생성 통계: {speculator.report()}", style="dim")
+            speculator.shutdown()
+        if "src.agent.nodes" in sys.modules:
+            print_skill_report(console)
+            # 티어별 호출 수, 지연 시간, (프롬프트 캐시로) 재사용된 입력 토큰
+            console.print(f"📊 모델 티어별 호출 통계: {sys.modules['src.agent.llm'].tier_report()}", style="dim")
+            governor = sys.modules["src.agent.governor"].LLMGovernor.default()
+            if governor.stats["calls"]:
+                console.print(f"🚦 LLM governor 통계: {governor.report()}", style="dim")
+        agent_boot.shutdown()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
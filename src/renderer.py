@@ -0,0 +1,179 @@
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.tools.resource_monitor import format_resources
+from src.tools.cell_profiler import format_profile
+from src.agent.events import (
+    iter_events, NodeUpdate, PlanEvent, ExecutionStarted, OutputChunk, ResourceSample, InterruptEvent,
+)
+
+
+@dataclass
+class TurnResult:
+    """그래프 한 번 실행(턴)의 요약."""
+    interrupted: bool = False
+    suggested_options: List[str] = field(default_factory=list)
+    executed_cells: int = 0
+    last_stderr: str = ""
+    # 턴 시작(사용자의 선택)부터 첫 코드 실행이 시작될 때까지 걸린 시간 (초)
+    time_to_first_execution: Optional[float] = None
+    # 이번 턴의 라우팅 결정 (노드 이름과 destination 등, 세션 아카이브에 기록)
+    routing: List[dict] = field(default_factory=list)
+
+
+def format_sample(sample: dict) -> str:
+    """실행 중 자원 측정값 한 줄."""
+    return (f"{sample['t']:.0f}s  CPU {sample['cpu_percent']:.0f}%  RSS {sample['rss_mb']:.0f} MB  "
+            f"threads {sample['threads']}  I/O r {sample['read_mb']:.0f} MB / w {sample['write_mb']:.0f} MB")
+
+
+def executed_resources(update: dict, min_duration_s: float = 1.0) -> str:
+    """executor 업데이트의 기록에서 자원 사용 요약을 꺼냅니다. (짧게 끝난 셀은 생략)"""
+    records = update.get("history") or []
+    resources = records[-1].get("resources") if records and isinstance(records[-1], dict) else None
+    if not resources or resources.get("duration_s", 0.0) < min_duration_s:
+        return ""
+    return format_resources(resources)
+
+
+def executed_profiles(update: dict) -> list:
+    """executor 업데이트의 기록 중 프로파일링된 셀들의 한 줄 요약."""
+    records = update.get("history") or []
+    return [format_profile(record["profile"]) for record in records
+            if isinstance(record, dict) and record.get("profile")]
+
+
+class BaseRenderer:
+    """
+    델타 이벤트를 화면에 그리는 렌더러의 공통 인터페이스.
+    프론트엔드(main.py, llm_cli.py)는 출력 방식만 다르고 이벤트 처리 흐름은 run_turn()을 공유합니다.
+    """
+    def __init__(self):
+        self._executor_header_printed = False
+
+    def turn_started(self, title: str): ...
+    def plan(self, code: str): ...
+    def step(self, node: str): ...
+    def output(self, stream: str, text: str): ...
+    def resources(self, sample: dict): ...
+    def executed(self, update: dict): ...
+    def turn_finished(self, result: TurnResult): ...
+
+    def _ensure_executor_header(self):
+        if not self._executor_header_printed:
+            self.step("executor")
+            self._executor_header_printed = True
+
+    def handle(self, event):
+        if isinstance(event, PlanEvent):
+            self._executor_header_printed = False
+            self.step("generator")
+            self.plan(event.code)
+        elif isinstance(event, OutputChunk):
+            self._ensure_executor_header()
+            self.output(event.stream, event.text)
+        elif isinstance(event, ResourceSample):
+            self.resources(event.sample)
+        elif isinstance(event, NodeUpdate) and event.node == "executor":
+            self._ensure_executor_header()
+            self.executed(event.update)
+            self._executor_header_printed = False
+
+
+class PlainRenderer(BaseRenderer):
+    """print() 기반 렌더러 (src/main.py)."""
+    def turn_started(self, title: str):
+        print(f"\n--- 🚀 {title} ---")
+
+    def step(self, node: str):
+        print(f"\n✅ 다음 단계: [ {node} ]", flush=True)
+        print("-" * 25, flush=True)
+
+    def plan(self, code: str):
+        print(f"🤔 계획:\n{code}", flush=True)
+
+    def output(self, stream: str, text: str):
+        prefix = "🔥 " if stream == "stderr" else ""
+        print(f"{prefix}{text}", end="", flush=True)
+
+    def resources(self, sample: dict):
+        print(f"\n📈 {format_sample(sample)}", flush=True)
+
+    def executed(self, update: dict):
+        summary = executed_resources(update)
+        if summary:
+            print(f"\n📊 자원 사용: {summary}", flush=True)
+        for profile in executed_profiles(update):
+            print(f"⏱️ 프로파일: {profile}", flush=True)
+
+    def turn_finished(self, result: TurnResult):
+        if not result.interrupted:
+            print("\n--- 🎉 작업 완료 ---")
+
+
+class RichRenderer(BaseRenderer):
+    """rich 기반 렌더러 (src/llm_cli.py). 출력은 도착하는 대로 색을 입혀 바로 보여줍니다."""
+    def __init__(self, console):
+        super().__init__()
+        from rich.panel import Panel
+        from rich.text import Text
+        self.console = console
+        self._panel = Panel
+        self._text = Text
+
+    def turn_started(self, title: str):
+        self.console.print(f"\n--- 🚀 {title} ---", style="bold yellow")
+
+    def step(self, node: str):
+        self.console.print(f"\n✅ 다음 단계: [ [bold magenta]{node}[/bold magenta] ]")
+
+    def plan(self, code: str):
+        # rich 자동 구문 강조가 터미널 테마와 충돌하므로 Text로 감싸 강조를 끕니다.
+        self.console.print(self._panel(self._text(code), title="🤔 계획", border_style="magenta", title_align="left"))
+
+    def output(self, stream: str, text: str):
+        self.console.print(self._text(text, style="red" if stream == "stderr" else "green"), end="")
+
+    def resources(self, sample: dict):
+        self.console.print(f"📈 {format_sample(sample)}", style="dim")
+
+    def executed(self, update: dict):
+        summary = executed_resources(update)
+        if summary:
+            self.console.print(f"\n📊 자원 사용: {summary}", style="dim")
+        for profile in executed_profiles(update):
+            self.console.print(f"⏱️ 프로파일: {profile}", style="dim")
+
+    def turn_finished(self, result: TurnResult):
+        if not result.interrupted:
+            self.console.print("\n--- 🎉 작업 완료 ---", style="bold green")
+
+
+def run_turn(app, inputs: dict, config: dict, renderer: BaseRenderer, title: Optional[str] = None) -> TurnResult:
+    """
+    그래프를 한 번 실행하며 델타 이벤트를 렌더러로 넘기고, 턴 요약(TurnResult)을 반환합니다.
+    전체 상태를 매 이벤트마다 복사하거나 비교하지 않습니다.
+    """
+    result = TurnResult()
+    started = time.perf_counter()
+    renderer.turn_started(title or f"'{inputs.get('task')}' 작업 시작")
+    for event in iter_events(app, inputs, config):
+        renderer.handle(event)
+        if isinstance(event, NodeUpdate) and (event.update or {}).get("destination"):
+            result.routing.append({"node": event.node, "destination": event.update["destination"],
+                                   "task_type": event.update.get("task_type")})
+        if isinstance(event, ExecutionStarted):
+            if result.time_to_first_execution is None:
+                result.time_to_first_execution = time.perf_counter() - started
+        elif isinstance(event, NodeUpdate) and event.node == "executor":
+            result.executed_cells += 1
+            result.last_stderr = event.update.get("stderr", "")
+        elif isinstance(event, NodeUpdate) and event.node == "next_suggester":
+            # 셀 실행과 동시에 만든 다음 단계 제안 (JUPYTER_LLM_SUGGEST_NEXT=1)
+            result.suggested_options = event.update.get("suggested_options") or result.suggested_options
+        elif isinstance(event, InterruptEvent):
+            result.interrupted = True
+            result.suggested_options = event.options
+    renderer.turn_finished(result)
+    return result
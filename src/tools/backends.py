@@ -0,0 +1,381 @@
+import os
+import sys
+import json
+import uuid
+import queue
+import threading
+import subprocess
+import itertools
+import urllib.parse
+import urllib.request
+from datetime import datetime, timezone
+from typing import Optional
+
+# 커널을 둘 호스트 목록. 쉼표로 구분하며 각 항목은 다음 중 하나입니다.
+#   local[?capacity=N]                     이 머신에서 KernelManager로 직접 시작 (기본값)
+#   attach:/path/to/kernel-1234.json       이미 실행 중인 커널에 연결 파일로 붙기
+#   gateway:http://host:8888[?token=...&capacity=N&kernel=python3]
+#                                          원격 Jupyter Server / Kernel Gateway의 REST + WebSocket API
+KERNEL_HOSTS = os.getenv("JUPYTER_LLM_KERNEL_HOSTS", "local")
+
+
+class KernelBackend:
+    """
+    커널 하나의 수명과 통신 채널을 담당하는 백엔드의 공통 인터페이스.
+    JupyterExecutor는 `client`(execute / get_iopub_msg / get_shell_msg를 가진 객체)만 사용하므로,
+    백엔드는 커널이 어디에서 실행되는지만 다르게 구현하면 됩니다.
+    """
+    name = "base"
+
+    def __init__(self):
+        self.client = None
+
+    def start(self, timeout: int = 10): ...
+    def interrupt(self): ...
+    def shutdown(self): ...
+
+    def is_alive(self) -> bool:
+        return False
+
+    def kernel_pid(self) -> Optional[int]:
+        """같은 머신의 커널일 때만 PID를 알 수 있습니다. (자원 측정용)"""
+        return None
+
+    def describe(self) -> str:
+        return self.name
+
+
+def _forward_stderr(pipe):
+    """커널 프로세스의 stderr를 줄 단위로 sys.stderr에 옮겨 적습니다. (커널이 종료되어 파이프가 닫히면 끝)"""
+    try:
+        for line in iter(pipe.readline, b""):
+            sys.stderr.write(line.decode("utf-8", errors="replace"))
+            sys.stderr.flush()
+    except (OSError, ValueError):
+        pass
+
+
+class LocalBackend(KernelBackend):
+    """이 머신에서 KernelManager로 커널을 시작하고 관리합니다. (기존 동작)"""
+    name = "local"
+
+    def __init__(self, kernel_name: str = None):
+        super().__init__()
+        self.kernel_name = kernel_name
+        self.km = None
+
+    def start(self, timeout: int = 10):
+        from jupyter_client.manager import KernelManager
+        # 1. 커널 매니저를 통해 백그라운드에서 커널 프로세스를 시작합니다.
+        self.km = KernelManager(kernel_name=self.kernel_name) if self.kernel_name else KernelManager()
+        # 커널 프로세스의 stderr(시작 경고, 크래시 로그)는 파이프로 받아 이 프로세스의 sys.stderr로 옮겨 적습니다.
+        # 파일 디스크립터를 그대로 물려주면 CLI가 프롬프트를 그리는 도중에 화면에 끼어들기 때문입니다.
+        self.km.start_kernel(stderr=subprocess.PIPE)
+        process = getattr(self.km.provisioner, "process", None)
+        if process is not None and process.stderr is not None:
+            # 시작한 스레드의 이름을 이어받아, 누가 띄운 커널의 출력인지 구분할 수 있게 합니다.
+            threading.Thread(target=_forward_stderr, args=(process.stderr,), daemon=True,
+                             name=f"{threading.current_thread().name}-kernel-stderr").start()
+        print("🚀 Jupyter Kernel process started.")
+        # 2. 커널과 통신할 클라이언트를 생성하고 채널을 엽니다.
+        self.client = self.km.client()
+        self.client.start_channels()
+        # 3. 커널이 응답할 준비가 될 때까지 기다립니다.
+        self.client.wait_for_ready(timeout=timeout)
+
+    def interrupt(self):
+        self.km.interrupt_kernel()
+
+    def shutdown(self):
+        if self.client and self.client.channels_running:
+            self.client.stop_channels()
+            print("🔌 Kernel client channels stopped.")
+        if self.km and self.km.is_alive():
+            self.km.shutdown_kernel(now=True)
+            print("💥 Kernel process shut down.")
+
+    def is_alive(self) -> bool:
+        return bool(self.km and self.km.is_alive())
+
+    def kernel_pid(self) -> Optional[int]:
+        provisioner = getattr(self.km, "provisioner", None)
+        process = getattr(provisioner, "process", None) or getattr(self.km, "kernel", None)
+        return getattr(process, "pid", None)
+
+
+class AttachBackend(KernelBackend):
+    """
+    이미 실행 중인 커널(다른 프로세스나 다른 머신에서 `jupyter kernel`로 띄운 커널 등)에
+    연결 파일로 붙습니다. 커널을 소유하지 않으므로 종료 시 채널만 닫습니다.
+    """
+    name = "attach"
+
+    def __init__(self, connection_file: str, owns_kernel: bool = False):
+        super().__init__()
+        self.connection_file = connection_file
+        self.owns_kernel = owns_kernel
+
+    def start(self, timeout: int = 10):
+        from jupyter_client import BlockingKernelClient
+        self.client = BlockingKernelClient(connection_file=self.connection_file)
+        self.client.load_connection_file()
+        self.client.start_channels()
+        self.client.wait_for_ready(timeout=timeout)
+        print(f"🔗 Attached to kernel: {self.connection_file}")
+
+    def _send_control(self, msg_type: str, content: dict):
+        msg = self.client.session.msg(msg_type, content)
+        self.client.control_channel.send(msg)
+
+    def interrupt(self):
+        # 프로세스에 신호를 보낼 수 없으므로 메시지 기반 인터럽트(프로토콜 5.3+)를 사용합니다.
+        self._send_control("interrupt_request", {})
+
+    def shutdown(self):
+        if self.client and self.owns_kernel:
+            self._send_control("shutdown_request", {"restart": False})
+        if self.client and self.client.channels_running:
+            self.client.stop_channels()
+            print("🔌 Detached from kernel.")
+
+    def is_alive(self) -> bool:
+        return bool(self.client and self.client.is_alive())
+
+    def describe(self) -> str:
+        return f"attach:{self.connection_file}"
+
+
+class GatewayClient:
+    """
+    Jupyter Server / Kernel Gateway의 '/api/kernels/<id>/channels' WebSocket을
+    jupyter_client의 BlockingKernelClient와 같은 모양(execute, get_iopub_msg, get_shell_msg)으로 감쌉니다.
+    """
+    def __init__(self, ws_url: str, headers: list):
+        import websocket
+        self.session_id = uuid.uuid4().hex
+        self._ws = websocket.create_connection(f"{ws_url}?session_id={self.session_id}", header=headers, timeout=30)
+        self._ws.settimeout(None)
+        self._queues = {"shell": queue.Queue(), "iopub": queue.Queue(), "stdin": queue.Queue(), "control": queue.Queue()}
+        self._send_lock = threading.Lock()
+        self.channels_running = True
+        self._reader = threading.Thread(target=self._read_loop, name="gateway-reader", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        while self.channels_running:
+            try:
+                raw = self._ws.recv()
+            except Exception:
+                break
+            if not raw or isinstance(raw, bytes):
+                continue  # 바이너리 버퍼 메시지는 사용하지 않습니다.
+            msg = json.loads(raw)
+            self._queues.get(msg.get("channel"), self._queues["iopub"]).put(msg)
+        self.channels_running = False
+
+    def _send(self, channel: str, msg_type: str, content: dict) -> str:
+        msg_id = uuid.uuid4().hex
+        msg = {
+            "header": {"msg_id": msg_id, "username": "jupyter_llm", "session": self.session_id,
+                       "msg_type": msg_type, "version": "5.3", "date": datetime.now(timezone.utc).isoformat()},
+            "parent_header": {}, "metadata": {}, "content": content, "buffers": [], "channel": channel,
+        }
+        with self._send_lock:
+            self._ws.send(json.dumps(msg))
+        return msg_id
+
+    def execute(self, code: str, silent: bool = False, store_history: bool = True,
+                user_expressions: dict = None, allow_stdin: bool = False) -> str:
+        return self._send("shell", "execute_request", {
+            "code": code, "silent": silent, "store_history": store_history,
+            "user_expressions": user_expressions or {}, "allow_stdin": allow_stdin, "stop_on_error": True,
+        })
+
+    def get_iopub_msg(self, timeout: float = None) -> dict:
+        return self._queues["iopub"].get(timeout=timeout)  # 시간 초과 시 queue.Empty (jupyter_client와 동일)
+
+    def get_shell_msg(self, timeout: float = None) -> dict:
+        return self._queues["shell"].get(timeout=timeout)
+
+    def wait_for_ready(self, timeout: float = 10):
+        """kernel_info_request에 응답이 올 때까지 기다립니다."""
+        deadline = datetime.now().timestamp() + timeout
+        while datetime.now().timestamp() < deadline:
+            msg_id = self._send("shell", "kernel_info_request", {})
+            try:
+                while True:
+                    reply = self.get_shell_msg(timeout=1)
+                    if reply["parent_header"].get("msg_id") == msg_id:
+                        return
+            except queue.Empty:
+                continue
+        raise RuntimeError("Kernel didn't respond in %d seconds" % timeout)
+
+    def stop_channels(self):
+        self.channels_running = False
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+class GatewayBackend(KernelBackend):
+    """원격 Jupyter Server / Kernel Gateway에 REST로 커널을 만들고 WebSocket으로 통신합니다."""
+    name = "gateway"
+
+    def __init__(self, base_url: str, token: str = None, kernel_name: str = "python3", capacity: int = 4):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.token = token or os.getenv("JUPYTER_LLM_GATEWAY_TOKEN")
+        self.kernel_name = kernel_name
+        self.capacity = capacity
+        self.kernel_id = None
+
+    def _request(self, method: str, path: str, body: dict = None, timeout: float = 30):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("Authorization", f"token {self.token}")
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = response.read()
+        return json.loads(payload) if payload else None
+
+    def running_kernels(self) -> int:
+        """스케줄러가 부하를 판단할 때 쓰는 원격 서버의 실행 중 커널 수."""
+        status = self._request("GET", "/api/status", timeout=5) or {}
+        return int(status.get("kernels", 0))
+
+    def start(self, timeout: int = 10):
+        kernel = self._request("POST", "/api/kernels", {"name": self.kernel_name})
+        self.kernel_id = kernel["id"]
+        ws_base = "ws" + self.base_url[len("http"):]
+        headers = [f"Authorization: token {self.token}"] if self.token else []
+        self.client = GatewayClient(f"{ws_base}/api/kernels/{self.kernel_id}/channels", headers)
+        self.client.wait_for_ready(timeout=timeout)
+        print(f"🌐 Remote kernel {self.kernel_id} started on {self.base_url}")
+
+    def interrupt(self):
+        self._request("POST", f"/api/kernels/{self.kernel_id}/interrupt")
+
+    def shutdown(self):
+        if self.client and self.client.channels_running:
+            self.client.stop_channels()
+            print("🔌 Remote kernel channels closed.")
+        if self.kernel_id:
+            try:
+                self._request("DELETE", f"/api/kernels/{self.kernel_id}")
+                print("💥 Remote kernel shut down.")
+            except Exception:
+                pass
+            self.kernel_id = None
+
+    def is_alive(self) -> bool:
+        if not self.kernel_id:
+            return False
+        try:
+            return self._request("GET", f"/api/kernels/{self.kernel_id}", timeout=5).get("execution_state") != "dead"
+        except Exception:
+            return False
+
+    def describe(self) -> str:
+        return f"gateway:{self.base_url}"
+
+
+def parse_host(spec: str) -> dict:
+    """'gateway:http://h:8888?token=x&capacity=8' 같은 호스트 항목을 dict로 바꿉니다."""
+    spec = spec.strip()
+    kind, _, rest = spec.partition(":") if not spec.startswith("local") else ("local", "", spec[len("local"):])
+    target, _, query = rest.partition("?")
+    options = dict(urllib.parse.parse_qsl(query))
+    return {"kind": kind, "target": target, **options}
+
+
+def create_backend(host: dict) -> KernelBackend:
+    kind = host["kind"]
+    if kind == "local":
+        return LocalBackend(kernel_name=host.get("kernel"))
+    if kind == "attach":
+        return AttachBackend(host["target"])
+    if kind == "gateway":
+        return GatewayBackend(host["target"], token=host.get("token"), kernel_name=host.get("kernel", "python3"),
+                              capacity=int(host.get("capacity", 4)))
+    raise ValueError(f"알 수 없는 커널 호스트 종류: {kind}")
+
+
+class KernelScheduler:
+    """
+    새 커널을 가장 여유 있는 호스트에 배치합니다. (실행 중 커널 수 / 용량이 가장 작은 곳)
+    같은 값이면 돌아가며 배치합니다. 'attach' 호스트는 커널 하나를 공유하므로 한 번에 하나만 배치합니다.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, hosts: str = KERNEL_HOSTS):
+        self.hosts = [parse_host(spec) for spec in hosts.split(",") if spec.strip()]
+        self._placed = {i: 0 for i in range(len(self.hosts))}  # 이 프로세스가 배치한 커널 수
+        # 배치했지만 아직 start()하지 않은 커널 수. 게이트웨이의 실행 중 커널 수(/api/status)에는 아직 보이지 않으므로
+        # 따로 더해야, 동시에 시작하는 워커들이 모두 같은 게이트웨이로 몰리지 않습니다.
+        self._pending = {i: 0 for i in range(len(self.hosts))}
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+
+    @classmethod
+    def default(cls) -> "KernelScheduler":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @classmethod
+    def configure(cls, hosts: str) -> "KernelScheduler":
+        """명령줄 옵션 등으로 호스트 목록을 바꿉니다. (이후 default()가 이 스케줄러를 반환)"""
+        with cls._default_lock:
+            cls._default = cls(hosts)
+            return cls._default
+
+    def _load(self, i: int) -> float:
+        host = self.hosts[i]
+        if host["kind"] == "gateway":
+            try:
+                running = create_backend(host).running_kernels()
+            except Exception:
+                return float("inf")  # 응답하지 않는 호스트는 고르지 않습니다.
+            return (running + self._pending[i]) / int(host.get("capacity", 4))
+        if host["kind"] == "attach":
+            return float("inf") if self._placed[i] else 0.0
+        capacity = int(host.get("capacity", os.cpu_count() or 1))
+        return self._placed[i] / capacity
+
+    def acquire(self) -> KernelBackend:
+        """가장 여유 있는 호스트의 백엔드를 만듭니다. (커널 시작은 호출자가 start()로)"""
+        with self._lock:
+            loads = [(self._load(i), i) for i in range(len(self.hosts))]
+            best = min(load for load, _ in loads)
+            if best == float("inf"):
+                raise RuntimeError("사용할 수 있는 커널 호스트가 없습니다.")
+            candidates = [i for load, i in loads if load == best]
+            index = candidates[next(self._round_robin) % len(candidates)]
+            self._placed[index] += 1
+            self._pending[index] += 1
+        backend = create_backend(self.hosts[index])
+        backend.host_index = index
+        backend.pending = True
+        return backend
+
+    def started(self, backend: KernelBackend):
+        """백엔드가 커널을 시작했습니다. 이제 호스트의 실행 중 커널 수에 포함되므로 대기 중인 배치에서 뺍니다."""
+        with self._lock:
+            self._settle(backend)
+
+    def release(self, backend: KernelBackend):
+        index = getattr(backend, "host_index", None)
+        if index is not None:
+            with self._lock:
+                self._settle(backend)  # 시작하지 못하고 반환된 경우
+                self._placed[index] = max(0, self._placed[index] - 1)
+
+    def _settle(self, backend: KernelBackend):
+        if getattr(backend, "pending", False):
+            backend.pending = False
+            self._pending[backend.host_index] = max(0, self._pending[backend.host_index] - 1)
@@ -0,0 +1,83 @@
+import os
+from typing import Optional
+
+from src.tools.output_store import METADATA_KEY
+
+# 셀 프로파일링 모드 (기본 꺼짐). cProfile과 tracemalloc 때문에 셀이 눈에 띄게 느려질 수 있습니다.
+PROFILE_CELLS = os.getenv("JUPYTER_LLM_PROFILE_CELLS", "0") == "1"
+
+# 커널에 주입되는 도우미 모듈의 이름 (src/tools/kernel_profiler.py)
+KERNEL_PROFILER = "_jupyter_llm_profiler"
+
+
+def format_profile(profile: Optional[dict], limit: int = 3) -> str:
+    """사용자 화면과 LLM 프롬프트에 넣을 한 줄 요약."""
+    if not profile:
+        return ""
+    text = f"wall {profile['wall_s']:.2f}s, cpu {profile['cpu_s']:.2f}s, peak allocated {profile['peak_mb']:.0f} MB."
+    top = profile.get("top") or []
+    if top:
+        # 셀 코드가 직접 부른 함수가 있으면 그것을 핫스팟으로 보여줍니다. (라이브러리 내부 함수보다 고치기 쉬움)
+        hotspot = hotspot_of(profile)
+        text += f" The cell spent {hotspot['cum_pct']:.0f}% of its time in {hotspot['function']}"
+        if hotspot["calls"] > 1:
+            text += f" ({hotspot['calls']} calls)"
+        text += "."
+        others = [row for row in top if row is not hotspot and row["cum_pct"] >= 1][:limit - 1]
+        if others:
+            text += " Also: " + ", ".join(f"{row['function']} {row['cum_pct']:.0f}%" for row in others) + "."
+    return text
+
+
+def hotspot_of(profile: dict) -> dict:
+    top = profile.get("top") or [{}]
+    return next((row for row in top if row.get("entry")), top[0])
+
+
+def notebook_profiles(path: str) -> list:
+    """노트북에서 프로파일이 기록된 셀들 [(셀 번호, 소스, 프로파일)]. 출력 페이로드는 읽지 않습니다."""
+    from src.tools.lazy_notebook import LazyNotebook
+    notebook = LazyNotebook.open(path, create=False)
+    profiles = []
+    for i in range(len(notebook)):
+        cell = notebook.cell(i)
+        profile = cell.get("metadata", {}).get(METADATA_KEY, {}).get("profile")
+        if profile:
+            profiles.append((i, cell.get("source", ""), profile))
+    return profiles
+
+
+def hotspot_report(path: str, limit: int = 10) -> list:
+    """
+    노트북 전체의 핫스팟 보고서 (출력할 줄 목록).
+    가장 느린 셀들과, 모든 셀에 걸쳐 누적 시간이 가장 큰 함수들을 보여줍니다.
+    """
+    if not os.path.exists(path):
+        return [f"노트북이 없습니다: {path}"]
+    profiles = notebook_profiles(path)
+    if not profiles:
+        return [f"프로파일이 기록된 셀이 없습니다: {path} (JUPYTER_LLM_PROFILE_CELLS=1 또는 --profile-cells로 실행)"]
+    total_s = sum(profile["wall_s"] for _, _, profile in profiles)
+    lines = [f"프로파일된 셀 {len(profiles)}개, 총 {total_s:.2f}s", "", "가장 느린 셀:"]
+    for i, source, profile in sorted(profiles, key=lambda item: -item[2]["wall_s"])[:limit]:
+        first_line = (source.strip().splitlines() or [""])[0][:60]
+        hotspot = hotspot_of(profile)
+        lines.append(f"  #{i:<4} {profile['wall_s']:>8.2f}s {100 * profile['wall_s'] / total_s if total_s else 0:>5.1f}%"
+                     f"  cpu {profile['cpu_s']:>7.2f}s  peak {profile['peak_mb']:>7.1f} MB  {first_line}")
+        if hotspot:
+            lines.append(f"         └ {hotspot['function']} ({hotspot['cum_pct']:.0f}%)")
+
+    # 함수별 누적 시간은 셀마다 그 셀에서의 누적 시간을 더합니다. (한 셀 안에서 중첩 호출은 cProfile이 이미 처리)
+    functions = {}
+    for _, _, profile in profiles:
+        for row in profile.get("top") or []:
+            entry = functions.setdefault(row["function"], {"cum_s": 0.0, "self_s": 0.0, "calls": 0, "cells": 0})
+            entry["cum_s"] += row["cum_s"]
+            entry["self_s"] += row["self_s"]
+            entry["calls"] += row["calls"]
+            entry["cells"] += 1
+    lines += ["", "누적 시간이 가장 큰 함수:"]
+    for name, entry in sorted(functions.items(), key=lambda item: -item[1]["cum_s"])[:limit]:
+        lines.append(f"  {entry['cum_s']:>8.2f}s (self {entry['self_s']:>7.2f}s, {entry['calls']:>6} calls, "
+                     f"{entry['cells']} cells)  {name}")
+    return lines
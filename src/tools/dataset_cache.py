@@ -0,0 +1,201 @@
+# 호스트 공용 데이터셋 캐시.
+# CSV/Parquet 파일을 처음 읽을 때 메모리 매핑이 가능한 Arrow IPC(Feather v2, 비압축) 파일로 변환해 두고,
+# 이후에는 어느 커널이든 그 파일을 mmap으로 열어 복사 없이 사용합니다. 같은 데이터셋을 여러 세션이 읽어도
+# 운영체제 페이지 캐시의 한 벌만 공유됩니다. JupyterExecutor가 커널 시작 시 이 모듈을 주입하며,
+# pyarrow가 없으면 pandas로 바로 읽습니다. (캐시 없음)
+import os
+import json
+import time
+import hashlib
+from contextlib import contextmanager
+
+CACHE_DIR = os.getenv("JUPYTER_LLM_DATASET_CACHE",
+                      os.path.join(os.path.expanduser("~"), ".cache", "jupyter_llm", "datasets"))
+
+_CSV_SUFFIXES = (".csv", ".tsv", ".txt")
+_PARQUET_SUFFIXES = (".parquet", ".pq")
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # pyarrow는 선택 의존성입니다.
+    pa = None
+
+
+def _source_id(path: str) -> str:
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+
+def _version_id(path: str) -> str:
+    st = os.stat(path)
+    return hashlib.sha1(f"{st.st_mtime_ns}-{st.st_size}".encode("utf-8")).hexdigest()[:12]
+
+
+def cache_key(path: str, **options) -> str:
+    """
+    '<원본>-<버전>-<읽기 옵션>' 형태의 캐시 키. 버전은 원본의 mtime과 크기에서 만들므로 원본이 바뀌면 키도 바뀌고,
+    같은 버전의 다른 컬럼 선택(columns=)이나 구분자는 서로 다른 캐시 파일로 함께 남습니다.
+    """
+    raw = json.dumps(options, sort_keys=True, default=str)
+    return f"{_source_id(path)}-{_version_id(path)}-{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]}"
+
+
+@contextmanager
+def _file_lock(lock_path: str):
+    """여러 커널이 같은 파일을 동시에 변환하지 않도록 하는 프로세스 간 잠금 (POSIX에서만)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield  # Windows: 잠금 없이 진행 (원자적 rename 덕분에 결과는 안전하고, 중복 작업만 생길 수 있음)
+        return
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _remove_stale(path: str, key: str):
+    """같은 원본의 예전 버전(mtime/size가 달랐던) 캐시 파일을 지웁니다. 같은 버전의 다른 읽기 옵션 캐시는 둡니다."""
+    source, version, _ = key.split("-")
+    for name in os.listdir(CACHE_DIR):
+        parts = name[:-len(".arrow")].split("-")
+        if name.endswith(".arrow") and parts[0] == source and (len(parts) != 3 or parts[1] != version):
+            try:
+                os.remove(os.path.join(CACHE_DIR, name))
+            except OSError:
+                pass  # 다른 커널이 mmap으로 열고 있는 경우 (Windows) 다음에 다시 시도
+
+
+def _convert(path: str, target: str, options: dict):
+    """원본을 레코드 배치 단위로 읽어 Arrow IPC 파일로 씁니다. (전체를 메모리에 올리지 않음)"""
+    lower = path.lower()
+    if lower.endswith(_PARQUET_SUFFIXES):
+        parquet = pa_parquet.ParquetFile(path)
+        columns = options.get("columns")
+        schema = parquet.schema_arrow
+        if columns:
+            # iter_batches(columns=...)는 요청한 컬럼만 담은 배치를 돌려주므로 스키마도 같은 순서로 맞춥니다.
+            schema = pa.schema([schema.field(column) for column in columns])
+        batches = parquet.iter_batches(columns=columns)
+    else:
+        parse = pa_csv.ParseOptions(delimiter=options.get("sep") or ("\t" if lower.endswith(".tsv") else ","))
+        convert = pa_csv.ConvertOptions(include_columns=options.get("columns"))
+        reader = pa_csv.open_csv(path, parse_options=parse, convert_options=convert)
+        schema, batches = reader.schema, reader
+
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    except BaseException:
+        # 변환에 실패하면 (스키마 불일치, 중단 등) 반쯤 쓴 임시 파일을 남기지 않습니다.
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, target)
+
+
+def cached_arrow_path(path: str, **options) -> str:
+    """원본에 해당하는 Arrow IPC 캐시 파일 경로를 반환합니다. 없거나 낡았으면 먼저 변환합니다."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    key = cache_key(path, **options)
+    target = os.path.join(CACHE_DIR, key + ".arrow")
+    if not os.path.exists(target):
+        with _file_lock(os.path.join(CACHE_DIR, key + ".lock")):
+            if not os.path.exists(target):  # 기다리는 동안 다른 커널이 변환했을 수 있음
+                _convert(path, target, options)
+                _remove_stale(path, key)
+    return target
+
+
+def load_table(path: str, **options):
+    """캐시된 Arrow 테이블을 mmap으로 엽니다. (복사 없음, 페이지는 커널 간에 공유)"""
+    source = pa.memory_map(cached_arrow_path(path, **options), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_dataset(path: str, columns=None, sep=None, as_arrow: bool = False, zero_copy: bool = True):
+    """
+    CSV/Parquet 파일을 공용 캐시를 통해 읽습니다.
+
+    Args:
+        path (str): 원본 파일 경로.
+        columns (list): 읽을 컬럼 (None이면 전부).
+        sep (str): CSV 구분자 (기본: 확장자로 추정).
+        as_arrow (bool): True면 pyarrow.Table을 그대로 반환합니다.
+        zero_copy (bool): True면 Arrow 메모리를 그대로 쓰는 DataFrame(ArrowDtype)을 반환하고,
+                          False면 일반 numpy 기반 DataFrame으로 복사합니다.
+    """
+    import pandas as pd
+
+    supported = path.lower().endswith(_CSV_SUFFIXES + _PARQUET_SUFFIXES)
+    if pa is None or not supported:
+        if path.lower().endswith(_PARQUET_SUFFIXES):
+            return pd.read_parquet(path, columns=columns)
+        return pd.read_csv(path, usecols=columns, sep=sep or ("\t" if path.lower().endswith(".tsv") else ","))
+
+    options = {key: value for key, value in (("columns", columns), ("sep", sep)) if value is not None}
+    table = load_table(path, **options)
+    if as_arrow:
+        return table
+    if zero_copy:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas()
+
+
+# --- 직접 실행하여 N개 세션의 로딩 시간과 메모리를 비교하는 경우 ---
+if __name__ == '__main__':
+    import subprocess
+    import sys
+    import tempfile
+
+    import numpy as np
+    import pandas as pd
+
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000
+    tmp_dir = tempfile.mkdtemp()
+    csv_path = os.path.join(tmp_dir, "data.csv")
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        "id": np.arange(rows),
+        "value": rng.normal(size=rows),
+        "score": rng.integers(0, 100, size=rows),
+        "group": rng.choice(["a", "b", "c", "d"], size=rows),
+    }).to_csv(csv_path, index=False)
+    print(f"CSV: {os.path.getsize(csv_path) / 1e6:.0f} MB, {rows} rows, {sessions} sessions")
+
+    session_code = """
+import sys, time, os, psutil
+sys.path.insert(0, {root!r})
+from src.tools.dataset_cache import load_dataset
+import pandas as pd
+start = time.perf_counter()
+df = {loader}
+df['value'].sum()  # 데이터를 실제로 건드려 페이지를 올립니다.
+elapsed = time.perf_counter() - start
+mem = psutil.Process().memory_full_info()
+print(elapsed, mem.rss, getattr(mem, 'pss', mem.uss))
+time.sleep(1.5)  # 다른 세션들이 동시에 떠 있는 상태에서 측정되도록 잠시 유지
+"""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    def run_sessions(label, loader):
+        code = session_code.format(root=root, loader=loader)
+        procs = [subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True)
+                 for _ in range(sessions)]
+        results = [tuple(map(float, proc.communicate()[0].split())) for proc in procs]
+        mean_time = sum(r[0] for r in results) / len(results)
+        total_rss = sum(r[1] for r in results) / 1e6
+        total_pss = sum(r[2] for r in results) / 1e6
+        print(f"{label:<22} load {mean_time:6.2f}s   total RSS {total_rss:8.0f} MB   total PSS {total_pss:8.0f} MB")
+
+    run_sessions("pd.read_csv", f"pd.read_csv({csv_path!r})")
+    start = time.perf_counter()
+    cached_arrow_path(csv_path)
+    print(f"{'first conversion':<22} {time.perf_counter() - start:6.2f}s")
+    run_sessions("load_dataset (cached)", f"load_dataset({csv_path!r})")
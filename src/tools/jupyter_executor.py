@@ -1,28 +1,59 @@
-from jupyter_client.manager import KernelManager
+import os
+import json
+from src.tools.backends import KernelBackend, KernelScheduler
+from src.tools.resource_monitor import ResourceSampler
+from src.tools.memory_watchdog import MemoryWatchdog, WATCHDOG_ENABLED, KERNEL_HELPER, _expression_value
+from src.tools.cell_profiler import PROFILE_CELLS, KERNEL_PROFILER
+from src.tools.large_data import KERNEL_LARGE_DATA, kernel_settings
+
+# 커널 시작 시 주입할 도우미 모듈 (원격 커널에서도 동작하도록 파일 경로가 아니라 소스를 보냅니다)
+DATASET_CACHE_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset_cache.py")
+KERNEL_MEMORY_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kernel_memory.py")
+WORKER_POOL_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker_pool.py")
+KERNEL_PROFILER_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kernel_profiler.py")
+KERNEL_SAMPLING_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kernel_sampling.py")
 
 class JupyterExecutor:
     """
     jupyter_client를 래핑하여 Jupyter 커널을 제어하는 클래스.
     커널 시작, 코드 실행, 결과 수집, 커널 종료 기능을 캡슐화
+    커널이 어디에서 실행되는지(로컬, 연결 파일, 원격 게이트웨이)는 backend가 결정합니다.
     """
-    def __init__(self, timeout: int = 10, create_notebook_on_start: str = None):
+    def __init__(self, timeout: int = 10, create_notebook_on_start: str = None, backend: KernelBackend = None,
+                 profile: bool = None):
         """
         클래스 인스턴스를 초기화 하고 Jupyter 커널을 시작
+        backend를 지정하지 않으면 스케줄러가 JUPYTER_LLM_KERNEL_HOSTS 중 가장 여유 있는 호스트를 고릅니다.
+        profile이 True이면 (기본: JUPYTER_LLM_PROFILE_CELLS) 모든 셀을 프로파일링합니다.
         """
+        self.profile = PROFILE_CELLS if profile is None else profile
+        self.profiler_ready = False
+        self.helpers_ready = False
+        self.scheduler = None
+        if backend is None:
+            self.scheduler = KernelScheduler.default()
+            backend = self.scheduler.acquire()
+        self.backend = backend
+        self.kc = None
+        self.watchdog = None
         try:
-            # 1. 커널 매니저를 통해 백그라운드에서 커널 프로세스를 시작합니다.
-            self.km = KernelManager()
-            self.km.start_kernel()
-            print("🚀 Jupyter Kernel process started.")
-
-            # 2. 커널과 통신할 클라이언트를 생성하고 채널을 엽니다.
-            self.kc = self.km.client()
-
-            self.kc.start_channels()
-
-            # 3. 커널이 응답할 준비가 될 때까지 기다립니다.
-            self.kc.wait_for_ready(timeout=timeout)
-            print("✅ Jupyter Kernel is ready and connected.")
+            # 1. 백엔드가 커널을 시작(또는 연결)하고 준비될 때까지 기다립니다.
+            self.backend.start(timeout=timeout)
+            if self.scheduler:
+                self.scheduler.started(self.backend)
+            # 2. 커널과 통신할 클라이언트 (execute / get_iopub_msg / get_shell_msg)
+            self.kc = self.backend.client
+            print(f"✅ Jupyter Kernel is ready and connected. ({self.backend.describe()})")
+
+            # 3. 공용 데이터셋 캐시 도우미(load_dataset), 메모리 회수 도우미, 보조 커널 풀(scatter),
+            #    셀 프로파일러, 대용량 데이터 도우미(표본 load_dataset, read_chunks)를 커널 네임스페이스에 주입합니다.
+            helpers_ok = self._inject_helpers()
+            self.profiler_ready = helpers_ok
+            self.helpers_ready = helpers_ok
+
+            # 4. 셀이 끝날 때마다 커널 메모리를 예산과 비교하는 감시자
+            if WATCHDOG_ENABLED and helpers_ok:
+                self.watchdog = MemoryWatchdog(self)
 
             # 초기 노트북 생성 메서드 호출
             # if create_notebook_on_start:
@@ -60,32 +91,159 @@ class JupyterExecutor:
         # execute 메서드를 재사용하여 코드를 실행
         result = self.execute(creation_code)
 
-    def execute(self, code: str, timeout: int = 30) -> dict:
+    def _run_silent(self, code: str, user_expressions: dict = None, timeout: int = 30) -> dict:
+        """
+        실행 기록과 출력을 남기지 않고 코드를 실행합니다. (execution_count도 늘지 않음)
+        shell 응답의 content를 반환하며, user_expressions의 평가 결과는 content['user_expressions']에 있습니다.
+        """
+        msg_id = self.kc.execute(code, silent=True, store_history=False, user_expressions=user_expressions or {})
+        reply = self.kc.get_shell_msg(timeout=timeout)
+        while reply['parent_header'].get('msg_id') != msg_id:
+            reply = self.kc.get_shell_msg(timeout=timeout)
+        # 이 요청의 iopub 메시지(busy/idle)를 비워, 다음 execute()가 잘못된 'idle'을 보지 않도록 합니다.
+        while True:
+            msg = self.kc.get_iopub_msg(timeout=timeout)
+            if (msg['parent_header'].get('msg_id') == msg_id and msg['header']['msg_type'] == 'status'
+                    and msg['content']['execution_state'] == 'idle'):
+                break
+        return reply['content']
+
+    @staticmethod
+    def _module_code(path: str, module_name: str, bind: str) -> str:
+        """모듈 소스를 커널 안에서 모듈 객체로 만들고 bind 문장을 실행하는 코드."""
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        return (
+            "import types as _types\n"
+            f"_module = _types.ModuleType({module_name!r})\n"
+            f"exec(compile({source!r}, {path!r}, 'exec'), _module.__dict__)\n"
+            f"{bind}\n"
+            "del _types, _module\n"
+        )
+
+    def _inject_helpers(self) -> bool:
+        code = (
+            self._module_code(DATASET_CACHE_MODULE, "jupyter_llm_dataset_cache", "load_dataset = _module.load_dataset")
+            + self._module_code(KERNEL_MEMORY_MODULE, "jupyter_llm_memory", f"{KERNEL_HELPER} = _module; _module.install()")
+            + self._module_code(WORKER_POOL_MODULE, "jupyter_llm_workers", "scatter = _module.scatter; _jupyter_llm_workers = _module")
+            + self._module_code(KERNEL_PROFILER_MODULE, "jupyter_llm_profiler", f"{KERNEL_PROFILER} = _module; _module.install()")
+            # load_dataset을 감싸므로 공용 캐시 도우미보다 뒤에 주입합니다.
+            + self._module_code(KERNEL_SAMPLING_MODULE, "jupyter_llm_large_data",
+                                f"{KERNEL_LARGE_DATA} = _module; load_dataset = _module.install(load_dataset, "
+                                f"{kernel_settings()!r}); read_chunks = _module.read_chunks")
+        )
+        try:
+            content = self._run_silent(code)
+            if content.get('status') != 'ok':
+                print(f"⚠️ 커널 도우미 주입 실패: {content.get('ename')}: {content.get('evalue')}")
+                return False
+            return True
+        except Exception as e:
+            print(f"⚠️ 커널 도우미 주입 실패: {e}")
+            return False
+
+    def set_data_mode(self, mode: str) -> bool:
+        """대용량 모드를 바꿉니다. ('sample': 큰 파일은 표본으로, 'full': 전체 데이터로, 'off')"""
+        if not self.helpers_ready:
+            return False
+        try:
+            return self._run_silent(f"{KERNEL_LARGE_DATA}.set_mode({mode!r})").get("status") == "ok"
+        except Exception as e:
+            print(f"⚠️ 대용량 모드 전환 실패: {e}")
+            return False
+
+    def sampled_sources(self, clear: bool = False) -> list:
+        """마지막 전체 실행 이후 셀들이 표본으로 대신 읽은 파일 목록. clear=True면 목록을 비웁니다."""
+        if not self.helpers_ready:
+            return []
+        try:
+            content = self._run_silent("", user_expressions={"sampled": f"{KERNEL_LARGE_DATA}.pending_json({clear!r})"})
+            return json.loads(_expression_value(content, "sampled"))
+        except Exception as e:
+            print(f"⚠️ 표본 기록 조회 실패: {e}")
+            return []
+
+    def snapshot_namespace(self, path: str, timeout: int = 600):
+        """
+        커널 네임스페이스를 path에 저장하고 보고서(dict)를 반환합니다. 실패하면 None.
+        커널이 파일을 직접 쓰므로 같은 파일 시스템을 쓰는 로컬 커널에서만 사용할 수 있습니다.
+        """
+        if not self.helpers_ready or self.kernel_pid() is None:
+            return None
+        try:
+            content = self._run_silent("", user_expressions={"report": f"{KERNEL_HELPER}.snapshot_json({path!r})"},
+                                       timeout=timeout)
+            return json.loads(_expression_value(content, "report"))
+        except Exception as e:
+            print(f"⚠️ 커널 스냅샷 실패: {e}")
+            return None
+
+    def restore_namespace(self, path: str, timeout: int = 600):
+        """snapshot_namespace()로 저장한 파일을 커널에 되살리고 보고서(dict)를 반환합니다. 실패하면 None."""
+        if not self.helpers_ready or self.kernel_pid() is None:
+            return None
+        try:
+            content = self._run_silent("", user_expressions={"report": f"{KERNEL_HELPER}.restore_json({path!r})"},
+                                       timeout=timeout)
+            return json.loads(_expression_value(content, "report"))
+        except Exception as e:
+            print(f"⚠️ 커널 스냅샷 복원 실패: {e}")
+            return None
+
+    def kernel_pid(self):
+        """커널 프로세스의 PID (로컬 커널이 아니어서 알 수 없다면 None)."""
+        return self.backend.kernel_pid()
+
+    def interrupt(self):
+        """실행 중인 셀을 중단합니다. (KeyboardInterrupt)"""
+        self.backend.interrupt()
+
+    def execute(self, code: str, timeout: int = 30, on_output=None, on_resources=None, profile: bool = None) -> dict:
         """
         주어진 코드를 커널에서 실행하고, 그 결과를 정리된 문자열로 반환합니다.
 
         Args:
             code (str): 실행할 Python 코드.
             timeout (int): 각 메시지를 기다릴 최대 시간 (초).
+            on_output (callable): 출력 조각이 도착할 때마다 on_output(stream_name, text)로 호출됩니다.
+                                  (stream_name은 'stdout' 또는 'stderr')
+            on_resources (callable): 실행 중 주기적으로 on_resources(sample)로 호출됩니다.
+                                     (sample은 cpu_percent, rss_mb, threads 등을 담은 dict)
+            profile (bool): 이 셀을 cProfile/tracemalloc으로 프로파일링합니다. (기본: self.profile)
+                            결과는 반환값의 'profile'에 담깁니다. (wall_s, cpu_s, peak_mb, top)
 
         Returns:
             str: stdout과 stderr를 분리된 딕셔너리로 반환
         """
         if not self.is_alive():
-            return {"stdout": "", "stderr": "Kernel is not running.", "outputs": []}
+            return {"stdout": "", "stderr": "Kernel is not running.", "outputs": [], "error": None, "resources": None,
+                    "memory": None, "profile": None}
+
+        profile = (self.profile if profile is None else profile) and self.profiler_ready
+        if profile:
+            # 다음 셀 하나만 프로파일러 아래에서 실행되도록 커널 쪽 훅을 준비시킵니다.
+            self._run_silent(f"{KERNEL_PROFILER}.arm()")
+
+        # 실행하는 동안 커널 프로세스의 CPU/메모리/I/O를 측정합니다.
+        pid = self.kernel_pid()
+        sampler = ResourceSampler(pid, on_sample=on_resources).start() if pid else None
 
         # 실행 요청 보내기
-        self.kc.execute(code)
+        msg_id = self.kc.execute(code)
 
         stdout = ""
         stderr = ""
         outputs = []
+        error = None
         # 실행이 완료될 때까지 커널로부터 메시지를 받아 처리
         while True:
             try:
                 # IOPub 채널에서 메시지를 가져옵니다.
                 msg = self.kc.get_iopub_msg(timeout=timeout)
                 # print(msg)
+                # 이전 요청(예: 조용한 실행)에 대한 메시지는 건너뜁니다.
+                if msg['parent_header'].get('msg_id') != msg_id:
+                    continue
                 msg_type = msg['header']['msg_type']
                 content = msg['content']
 
@@ -101,24 +259,48 @@ class JupyterExecutor:
                         stdout += content['text']
                     else:
                         stderr += content['text']
+                    if on_output:
+                        on_output(content['name'], content['text'])
 
-                # 'execute_result'와 'display_data'를 원본 그대로 outputs 리스트에 추가
+                # 'execute_result'와 'display_data'는 base64 페이로드를 디코딩하지 않고 그대로 보관
+                # (출력 종류를 함께 기록해야 노트북에 올바른 output_type으로 저장할 수 있습니다.)
                 if msg_type in ('execute_result', 'display_data'):
-                    outputs.append(content)
+                    outputs.append({"output_type": msg_type, **content})
                     # 결과 데이터 중 일반 텍스트(text/plain) 표현을 가져옵니다.
                     if 'data' in content and 'text/plain' in content['data']:
                         stdout += content['data']['text/plain'] + '\n'
+                        if on_output:
+                            on_output('stdout', content['data']['text/plain'] + '\n')
 
                 # 에러 메시지를 처리
                 if msg_type == 'error':
-                    stderr += f"{content['ename']}: {content['evalue']}\n"
+                    # 오류 지문(fingerprint) 계산을 위해 구조화된 형태도 함께 보관
+                    error = {
+                        "ename": content.get('ename', ''),
+                        "evalue": content.get('evalue', ''),
+                        "traceback": content.get('traceback', []),
+                    }
+                    error_text = f"{content['ename']}: {content['evalue']}\n"
                     # traceback 정보가 있다면 추가
                     if 'traceback' in content:
-                        stderr += "\n".join(content['traceback']) + "\n"
+                        error_text += "\n".join(content['traceback']) + "\n"
+                    stderr += error_text
+                    if on_output:
+                        on_output('stderr', error_text)
 
             except Exception:
                 break
 
+        resources = None
+        if sampler:
+            sampler.stop()
+            resources = sampler.summary()
+
+        profile_report = self._profile_report() if profile else None
+
+        # 커널 메모리가 예산에 가까우면 최근 셀이 쓰지 않는 큰 객체를 디스크로 내보냅니다.
+        memory = self.watchdog.check((resources or {}).get("rss_mb_end")) if self.watchdog else None
+
         # 결과를 하나의 문자열로 정리하여 반환
         # observation = f"--- STDOUT ---\n{stdout}\n"
         # if stderr:
@@ -126,26 +308,39 @@ class JupyterExecutor:
         return {
             "stdout": stdout.strip(),
             "stderr": stderr.strip(),
-            "outputs": outputs
+            "outputs": outputs,
+            "error": error,
+            "resources": resources,
+            "memory": memory,
+            "profile": profile_report
         }
 
+    def _profile_report(self):
+        """방금 실행한 셀의 프로파일 결과. (가져오지 못하면 None)"""
+        try:
+            content = self._run_silent("", user_expressions={"profile": f"{KERNEL_PROFILER}.report_json()"})
+            return json.loads(_expression_value(content, "profile"))
+        except Exception as e:
+            print(f"⚠️ 셀 프로파일 수집 실패: {e}")
+            return None
+
     def shutdown(self):
         """
-        커널 클라이언트 채널을 닫고 커널 프로세스를 안전하게 종료합니다.
+        커널 클라이언트 채널을 닫고 커널을 안전하게 종료합니다. (연결만 한 커널은 채널만 닫습니다)
         """
-        if hasattr(self, 'kc') and self.kc and self.kc.channels_running:
-            self.kc.stop_channels()
-            print("🔌 Kernel client channels stopped.")
-
-        if hasattr(self, 'km') and self.km and self.km.is_alive():
-            self.km.shutdown_kernel(now=True)
-            print("💥 Kernel process shut down.")
+        backend = getattr(self, 'backend', None)
+        if backend is None:
+            return
+        backend.shutdown()
+        if self.scheduler:
+            self.scheduler.release(backend)
+            self.scheduler = None
 
     def is_alive(self) -> bool:
         """
-        커널 프로세스가 현재 실행 중인지 확인합니다.
+        커널이 현재 실행 중인지 확인합니다.
         """
-        return self.km.is_alive()
+        return self.backend.is_alive()
 
 
 # --- 직접 실행하여 테스트하는 경우 ---
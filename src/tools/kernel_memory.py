@@ -0,0 +1,345 @@
+# 커널 안에서 실행되는 메모리 회수 도우미.
+# JupyterExecutor가 커널 시작 시 이 모듈을 '_jupyter_llm_memory'라는 이름으로 주입하고,
+# 메모리 감시자(memory_watchdog.py)가 조용한 실행(silent)으로 아래 함수들을 호출합니다.
+#  - largest_objects(): 네임스페이스의 큰 객체 목록 (DataFrame, ndarray, 모델 등)
+#  - reclaim():         최근 셀이 쓰지 않는 큰 객체를 디스크로 내보내고(spill), 출력 캐시를 비우고, gc 실행
+#  - snapshot()/restore(): 세션 아카이브(session_archive.py)를 위해 네임스페이스를 파일로 저장하고 되살림
+# 내보낸 객체의 자리에는 SpilledObject가 남으며, 셀에서 그 이름을 쓰면 실행 직전에(pre_run_cell),
+# 그 밖의 경로로 속성/인덱스에 접근하면 그 순간에 디스크에서 다시 불러옵니다.
+import os
+import re
+import gc
+import sys
+import json
+import time
+import pickle
+
+SPILL_DIR = os.getenv("JUPYTER_LLM_SPILL_DIR",
+                      os.path.join(os.path.expanduser("~"), ".cache", "jupyter_llm", "spill", str(os.getpid())))
+MB = 1024 * 1024
+
+_NAME = re.compile(r"[A-Za-z_]\w*")
+_spilled = {}  # 이름 -> SpilledObject
+last_report = {}
+
+
+def _shell():
+    from IPython import get_ipython
+    return get_ipython()
+
+
+def rss_mb() -> float:
+    """이 커널 프로세스의 현재 RSS (MB)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / MB
+    except ImportError:
+        with open("/proc/self/statm") as f:  # Linux
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+
+
+def sizeof(obj, _depth: int = 0) -> int:
+    """객체가 차지하는 메모리의 추정치 (바이트). 정확하지 않아도 큰 객체를 골라낼 수 있으면 충분합니다."""
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    nbytes = getattr(obj, "nbytes", None)  # numpy, pyarrow, torch 등
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(obj, 0)
+    if _depth >= 2:
+        return size
+    if isinstance(obj, dict):
+        items = list(obj.values())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = list(obj)
+    else:
+        # 모델 객체 등은 속성(계수 배열, 트리 등)의 크기를 더합니다.
+        items = list(getattr(obj, "__dict__", {}).values())
+    if not items:
+        return size
+    sample = items[:1000]  # 큰 컨테이너는 앞부분으로 추정합니다.
+    return size + sum(sizeof(item, _depth + 1) for item in sample) * len(items) // len(sample)
+
+
+def _user_names(ns: dict) -> dict:
+    """사용자가 만든 변수만 (모듈, 함수, 클래스, '_'로 시작하는 이름과 이미 내보낸 객체 제외). id -> 이름 목록"""
+    import types
+    hidden = set(getattr(_shell(), "user_ns_hidden", {}) or {})
+    groups = {}
+    for name, value in list(ns.items()):
+        if (name.startswith("_") or name in hidden or isinstance(value, SpilledObject)
+                or isinstance(value, (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, type))):
+            continue
+        groups.setdefault(id(value), []).append(name)
+    return groups
+
+
+def largest_objects(limit: int = 20, min_mb: float = 1.0) -> list:
+    """네임스페이스의 큰 객체를 크기 순으로 반환합니다. 같은 객체를 가리키는 이름은 함께 묶습니다."""
+    ns = _shell().user_ns
+    objects = []
+    for names in _user_names(ns).values():
+        value = ns[names[0]]
+        try:
+            size_mb = sizeof(value) / MB
+        except Exception:
+            continue
+        if size_mb >= min_mb:
+            objects.append({"names": names, "type": type(value).__name__, "mb": round(size_mb, 1)})
+    objects.sort(key=lambda item: -item["mb"])
+    return objects[:limit]
+
+
+def largest_objects_json(limit: int = 20, min_mb: float = 1.0) -> str:
+    return json.dumps(largest_objects(limit, min_mb))
+
+
+def recent_names(cells: int) -> set:
+    """최근 cells개의 셀 입력에 나오는 이름들 (이 객체들은 곧 다시 쓰일 가능성이 높으므로 내보내지 않습니다)."""
+    history = _shell().user_ns.get("In") or []
+    names = set()
+    for source in history[-cells:]:
+        names.update(_NAME.findall(source or ""))
+    return names
+
+
+class SpilledObject:
+    """디스크로 내보낸 객체의 자리 표시자. 접근하면 원래 객체를 불러와 이름에 다시 연결합니다."""
+    __slots__ = ("_names", "_path", "_type", "_mb")
+
+    def __init__(self, names, path, type_name, mb):
+        object.__setattr__(self, "_names", list(names))
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_type", type_name)
+        object.__setattr__(self, "_mb", mb)
+
+    def _load(self):
+        with open(self._path, "rb") as f:
+            value = pickle.load(f)
+        ns = _shell().user_ns
+        for name in self._names:
+            if ns.get(name) is self:
+                ns[name] = value
+            _spilled.pop(name, None)
+        try:
+            os.remove(self._path)
+        except OSError:
+            pass
+        print(f"♻️ Reloaded spilled object {', '.join(self._names)} ({self._type}, {self._mb:.0f} MB) from disk.")
+        return value
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+
+    def __len__(self):
+        return len(self._load())
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __contains__(self, item):
+        return item in self._load()
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __array__(self, *args, **kwargs):
+        import numpy as np
+        return np.asarray(self._load(), *args, **kwargs)
+
+    def __repr__(self):
+        return f"<spilled {self._type} '{self._names[0]}' ({self._mb:.0f} MB) - loads on access>"
+
+
+def reload_referenced(source: str):
+    """셀이 내보낸 객체의 이름을 쓰면 실행 전에 미리 불러옵니다. (함수 인자로 넘기는 경우 등도 투명하게 동작)"""
+    if not _spilled:
+        return
+    for name in set(_NAME.findall(source or "")) & set(_spilled):
+        placeholder = _spilled.get(name)
+        if placeholder is not None:
+            placeholder._load()
+
+
+def _pre_run_cell(info=None):
+    reload_referenced(getattr(info, "raw_cell", "") or "")
+
+
+def install():
+    """pre_run_cell 훅을 등록합니다. (주입 시 한 번 호출)"""
+    events = _shell().events
+    try:
+        events.unregister("pre_run_cell", _pre_run_cell)
+    except ValueError:
+        pass
+    events.register("pre_run_cell", _pre_run_cell)
+
+
+def _malloc_trim():
+    """해제된 힙 메모리를 운영체제에 돌려줍니다. (glibc에서만)"""
+    try:
+        import ctypes
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except Exception:
+        pass
+
+
+def reclaim(need_mb: float, protect_cells: int = 3, min_mb: float = 10.0) -> dict:
+    """
+    need_mb만큼 메모리를 확보하려고 시도합니다.
+    1. 출력 캐시(Out, _, __, ___)를 비웁니다.
+    2. 최근 protect_cells개의 셀이 쓰지 않는 큰 객체를 큰 순서대로 디스크에 pickle로 내보냅니다.
+       네임스페이스 밖에서도 참조되는 객체는 내보내도 해제되지 않으므로 남겨 둡니다.
+    3. gc를 실행하고 힙을 정리합니다.
+    결과는 last_report에도 남겨 둡니다.
+    """
+    global last_report
+    started = time.perf_counter()
+    shell = _shell()
+    ns = shell.user_ns
+    before = rss_mb()
+
+    cleared_outputs = len(ns.get("Out") or {})
+    if cleared_outputs:
+        shell.displayhook.flush()
+
+    protected = recent_names(protect_cells)
+    evicted, kept, estimated = [], [], 0.0
+    os.makedirs(SPILL_DIR, exist_ok=True)
+    for item in largest_objects(limit=50, min_mb=min_mb):
+        if estimated >= need_mb:
+            break
+        if protected & set(item["names"]):
+            kept.append({**item, "reason": "used by a recent cell"})
+            continue
+        value = ns[item["names"][0]]
+        # 이름들 + 지역 변수 value + getrefcount 인자보다 참조가 많으면 클로저, 다른 컨테이너, 모듈 속성 등이
+        # 같은 객체를 붙잡고 있는 것입니다. 내보내도 메모리가 줄지 않고 디스크 사본만 생기므로 건너뜁니다.
+        if sys.getrefcount(value) > len(item["names"]) + 2:
+            kept.append({**item, "reason": "referenced elsewhere"})
+            del value
+            continue
+        path = os.path.join(SPILL_DIR, f"{item['names'][0]}-{int(time.time() * 1000)}.pkl")
+        try:
+            with open(path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            if os.path.exists(path):
+                os.remove(path)
+            kept.append({**item, "reason": f"not picklable ({type(e).__name__})"})
+            continue
+        placeholder = SpilledObject(item["names"], path, item["type"], item["mb"])
+        for name in item["names"]:
+            ns[name] = placeholder
+            _spilled[name] = placeholder
+        del value
+        evicted.append({**item, "action": "spilled", "path": path})
+        estimated += item["mb"]
+
+    gc.collect()
+    _malloc_trim()
+    last_report = {
+        "rss_mb_before": round(before, 1),
+        "rss_mb_after": round(rss_mb(), 1),
+        "cleared_outputs": cleared_outputs,
+        "evicted": evicted,
+        "kept": kept[:5],
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    return last_report
+
+
+def last_report_json() -> str:
+    return json.dumps(last_report)
+
+
+def snapshot(path: str) -> dict:
+    """
+    사용자 네임스페이스를 path에 pickle로 저장합니다. (세션 아카이브의 커널 스냅샷)
+    값은 이름 묶음마다 따로 pickle하므로 일부가 실패해도 나머지는 저장되고, 실패한 이름은 skipped에 남깁니다.
+    모듈은 import 문으로, 셀에서 정의한 함수/클래스는 소스로 저장하고, 내보낸(spill) 객체는 파일을 그대로 담습니다.
+    """
+    import types
+    import inspect
+    started = time.perf_counter()
+    ns = _shell().user_ns
+    hidden = set(getattr(_shell(), "user_ns_hidden", {}) or {})
+    modules, sources, values, spilled, skipped = {}, [], [], [], []
+    for name, value in list(ns.items()):
+        if name.startswith("_") or name in hidden:
+            continue
+        if isinstance(value, types.ModuleType):
+            modules[name] = value.__name__
+        elif isinstance(value, (types.FunctionType, type)) and getattr(value, "__module__", None) == "__main__":
+            try:
+                sources.append(inspect.getsource(value))
+            except (OSError, TypeError):
+                skipped.append({"names": [name], "reason": "source not found"})
+    for names in _user_names(ns).values():
+        value = ns[names[0]]
+        if isinstance(value, (types.FunctionType, type)):
+            continue
+        try:
+            values.append((names, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+        except Exception as e:
+            skipped.append({"names": names, "reason": f"not picklable ({type(e).__name__})"})
+    for name, placeholder in list(_spilled.items()):
+        if ns.get(name) is placeholder and os.path.exists(placeholder._path):
+            with open(placeholder._path, "rb") as f:
+                spilled.append(([name], f.read()))
+    with open(path, "wb") as f:
+        pickle.dump({"modules": modules, "sources": sources, "values": values + spilled}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    return {"names": sum(len(names) for names, _ in values + spilled) + len(modules) + len(sources),
+            "bytes": os.path.getsize(path), "skipped": skipped, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def snapshot_json(path: str) -> str:
+    return json.dumps(snapshot(path))
+
+
+def restore(path: str) -> dict:
+    """snapshot()으로 저장한 파일을 네임스페이스에 되살립니다. 모듈, 함수/클래스, 값 순서로 복원합니다."""
+    import importlib
+    started = time.perf_counter()
+    ns = _shell().user_ns
+    with open(path, "rb") as f:
+        saved = pickle.load(f)
+    restored, failed = 0, []
+    for name, module in saved["modules"].items():
+        try:
+            ns[name] = importlib.import_module(module)
+            restored += 1
+        except ImportError as e:
+            failed.append({"names": [name], "reason": str(e)})
+    for source in saved["sources"]:
+        try:
+            exec(compile(source, "<snapshot>", "exec"), ns)
+            restored += 1
+        except Exception as e:
+            failed.append({"names": [source.split("(")[0]], "reason": f"{type(e).__name__}: {e}"})
+    for names, blob in saved["values"]:
+        try:
+            value = pickle.loads(blob)
+        except Exception as e:
+            failed.append({"names": names, "reason": f"{type(e).__name__}: {e}"})
+            continue
+        for name in names:
+            ns[name] = value
+        restored += len(names)
+    return {"restored": restored, "failed": failed, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def restore_json(path: str) -> str:
+    return json.dumps(restore(path))
@@ -0,0 +1,160 @@
+# 커널 안에서 실행되는 셀 프로파일러.
+# JupyterExecutor가 커널 시작 시 이 모듈을 '_jupyter_llm_profiler'라는 이름으로 주입하고,
+# 프로파일링 모드에서는 셀을 실행하기 직전에 arm()을 조용히 호출합니다.
+# 그러면 다음 셀 하나가 pre_run_cell ~ post_run_cell 동안 cProfile과 tracemalloc 아래에서 실행되고,
+# 결과(벽시계/CPU 시간, 누적 시간 상위 함수, 최대 할당 메모리)는 report_json()으로 가져갑니다.
+import os
+import re
+import sys
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+
+MB = 1024 * 1024
+
+# 셀 실행 기계 장치(IPython/ipykernel/asyncio, 오류 traceback 서식화)와 이 모듈의 프레임은 보고서에서 뺍니다.
+_INTERNAL = {"IPython", "ipykernel", "asyncio", "traitlets", "zmq", "tornado", "contextlib", "codeop", "comm",
+             "jupyter_client", "stack_data", "executing", "pure_eval", "pygments", "traceback", "linecache"}
+_INTERNAL_BUILTINS = {"builtins.exec", "builtins.compile"}
+_C_METHOD = re.compile(r"^method '(\w+)' of '([\w.]+)' objects$")
+
+_armed = False
+_profiler = None
+_started = None
+_owns_tracemalloc = False
+last_report = None
+
+
+def _shell():
+    from IPython import get_ipython
+    return get_ipython()
+
+
+def _module_name(filename: str) -> str:
+    """파일 경로를 'pandas.core.frame' 같은 모듈 이름으로 바꿉니다. (셀은 '<cell>')"""
+    if filename.startswith("<frozen "):  # 고정(frozen) 표준 모듈 (예: <frozen posixpath>)
+        return filename[len("<frozen "):-1]
+    if not filename or filename.startswith("<") or "ipykernel_" in filename:
+        return "<cell>"
+    path = os.path.abspath(filename)
+    best = ""
+    for entry in sys.path:
+        entry = os.path.abspath(entry or ".")
+        if path.startswith(entry + os.sep) and len(entry) > len(best):
+            best = entry
+    relative = path[len(best) + 1:] if best else os.path.basename(path)
+    module = os.path.splitext(relative)[0].replace(os.sep, ".")
+    return module[:-len(".__init__")] if module.endswith(".__init__") else module
+
+
+def _label(filename: str, name: str) -> str:
+    """cProfile의 (파일, 함수 이름)을 'pandas.core.series.apply' 같은 이름으로 바꿉니다."""
+    if filename == "~":  # 내장 함수 (예: <built-in method time.sleep>, <method 'tolist' of 'numpy.ndarray' objects>)
+        name = name.strip("<>").replace("built-in method ", "")
+        method = _C_METHOD.match(name)
+        return f"{method.group(2)}.{method.group(1)}" if method else name
+    return f"{_module_name(filename)}.{name}"
+
+
+def _is_internal(filename: str, label: str) -> bool:
+    if filename == "~":
+        return label in _INTERNAL_BUILTINS
+    return filename == _module_name.__code__.co_filename or label.split(".")[0] in _INTERNAL
+
+
+def top_functions(profiler: cProfile.Profile, wall_s: float, limit: int = 8) -> list:
+    """
+    누적 시간 순으로 상위 함수들. 셀의 최상위 코드와 실행 기계 장치는 제외합니다.
+    셀 코드가 직접 부른 함수(entry)는 상위 limit개 밖이어도 3개까지 함께 남깁니다. (예: DataFrame.apply)
+    """
+    stats = pstats.Stats(profiler).stats
+    rows = []
+    for (filename, lineno, name), (_, ncalls, tottime, cumtime, callers) in stats.items():
+        label = _label(filename, name)
+        if label == "<cell>.<module>" or _is_internal(filename, label):
+            continue
+        rows.append({
+            "function": label,
+            "calls": ncalls,
+            "cum_s": round(cumtime, 4),
+            "self_s": round(tottime, 4),
+            "cum_pct": round(100 * cumtime / wall_s, 1) if wall_s else 0.0,
+            "entry": any(_module_name(caller[0]) == "<cell>" for caller in callers),
+        })
+    rows.sort(key=lambda row: -row["cum_s"])
+    top = rows[:limit]
+    top += [row for row in rows[limit:] if row["entry"]][:max(0, 3 - sum(row["entry"] for row in top))]
+    return top
+
+
+def _pre_run_cell(info=None):
+    global _armed, _profiler, _started, _owns_tracemalloc
+    if not _armed:
+        return
+    _armed = False
+    _owns_tracemalloc = not tracemalloc.is_tracing()  # 사용자가 이미 켜 둔 tracemalloc은 끄지 않습니다.
+    if _owns_tracemalloc:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    # 셀이 예외로 끝나면 traceback 서식화(수백 ms~수 초)가 측정에 섞이지 않도록 그 직전에 멈춥니다.
+    shell = _shell()
+    original = shell.showtraceback
+
+    def showtraceback(*args, **kwargs):
+        _stop()
+        return original(*args, **kwargs)
+
+    shell.showtraceback = showtraceback
+    _started = (time.perf_counter(), time.process_time())
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+def _stop():
+    global _profiler, last_report
+    if _profiler is None:
+        return
+    _profiler.disable()
+    wall_s = time.perf_counter() - _started[0]
+    cpu_s = time.process_time() - _started[1]
+    peak = tracemalloc.get_traced_memory()[1]
+    if _owns_tracemalloc:
+        tracemalloc.stop()
+    shell = _shell()
+    if "showtraceback" in vars(shell):
+        del shell.showtraceback  # 인스턴스에 덮어쓴 래퍼를 지워 클래스의 메서드로 되돌립니다.
+    last_report = {
+        "wall_s": round(wall_s, 4),
+        "cpu_s": round(cpu_s, 4),
+        "peak_mb": round(peak / MB, 1),
+        "top": top_functions(_profiler, wall_s),
+    }
+    _profiler = None
+
+
+def _post_run_cell(result=None):
+    _stop()
+
+
+def arm():
+    """다음에 실행되는 셀 하나를 프로파일링합니다."""
+    global _armed, last_report
+    _armed = True
+    last_report = None
+
+
+def report_json() -> str:
+    return json.dumps(last_report)
+
+
+def install():
+    """pre_run_cell / post_run_cell 훅을 등록합니다. (주입 시 한 번 호출)"""
+    events = _shell().events
+    for event, callback in (("pre_run_cell", _pre_run_cell), ("post_run_cell", _post_run_cell)):
+        try:
+            events.unregister(event, callback)
+        except ValueError:
+            pass
+        events.register(event, callback)
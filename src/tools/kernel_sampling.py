@@ -0,0 +1,293 @@
+# 커널 안에서 실행되는 대용량 데이터 도우미.
+# JupyterExecutor가 커널 시작 시 이 모듈을 '_jupyter_llm_large_data'라는 이름으로 주입하고,
+# 공용 캐시의 load_dataset을 install()로 감쌉니다. 모드는 에이전트가 조용한 실행(silent)으로 바꿉니다.
+#  - "sample": 임계값보다 큰 파일은 load_dataset/read_chunks가 자동으로 뽑은 표본을 돌려줍니다.
+#              (head/random/stratified, 커널 안에 캐시하므로 fix-error 반복에서는 파일을 다시 읽지 않음)
+#  - "full":   표본으로 성공한 셀을 전체 데이터로 다시 실행할 때. read_chunks는 파일을 청크 단위로
+#              스트리밍하며 진행률을 출력합니다.
+#  - "off":    대용량 모드를 끈 경우 (load_dataset은 그대로, read_chunks는 항상 전체를 스트리밍)
+# 진행률은 stdout으로 출력합니다. (stderr에 쓰면 에이전트가 오류로 검사합니다)
+import os
+import json
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # pyarrow는 선택 의존성입니다. (없으면 pandas의 chunksize로 읽음)
+    pa = None
+
+MB = 1024 * 1024
+PROGRESS_EVERY_S = 2.0
+
+_CSV_SUFFIXES = (".csv", ".tsv", ".txt")
+_PARQUET_SUFFIXES = (".parquet", ".pq")
+
+settings = {"mode": "sample", "threshold_mb": 256.0, "rows": 100_000, "strategy": "random",
+            "chunk_rows": 1_000_000, "seed": 0}
+_full_loader = None
+_samples = {}  # 캐시 키 -> (표본, 원본 행 수)
+pending = {}   # 표본으로 대신 읽은 파일 경로 -> 설명 (전체 데이터로 다시 실행해 성공하면 비움)
+
+
+def install(loader, options: dict = None):
+    """공용 캐시의 load_dataset(loader)을 감싼 load_dataset을 돌려줍니다."""
+    global _full_loader
+    _full_loader = loader
+    settings.update(options or {})
+    return load_dataset
+
+
+def set_mode(mode: str):
+    if mode not in ("sample", "full", "off"):
+        raise ValueError(f"unknown large-data mode: {mode!r}")
+    settings["mode"] = mode
+
+
+def pending_json(clear: bool = False) -> str:
+    """마지막 전체 실행 이후 표본으로 대신 읽은 파일들. (에이전트가 user_expressions로 가져감)"""
+    sources = list(pending.values())
+    if clear:
+        pending.clear()
+    return json.dumps(sources)
+
+
+def _is_large(path: str) -> bool:
+    try:
+        return os.path.getsize(path) >= settings["threshold_mb"] * MB
+    except OSError:
+        return False  # 없는 파일은 원래 로더가 FileNotFoundError를 내도록 둡니다.
+
+
+class _Progress:
+    """파일을 읽는 동안 PROGRESS_EVERY_S마다 한 줄씩 진행률을 출력합니다. (빨리 끝나면 아무것도 출력하지 않음)"""
+    def __init__(self, label: str):
+        self.label = label
+        self.rows = 0
+        self.started = self.last = time.perf_counter()
+        self.printed = False
+
+    def update(self, rows: int, fraction: float):
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self.last >= PROGRESS_EVERY_S:
+            self.last = now
+            self.printed = True
+            print(f"⏳ {self.label}: {min(fraction, 1.0):.0%} · {self.rows:,} rows · {now - self.started:.0f}s",
+                  flush=True)
+
+    def done(self):
+        if self.printed:
+            print(f"⏳ {self.label}: done · {self.rows:,} rows · {time.perf_counter() - self.started:.1f}s", flush=True)
+
+
+def _batches(path: str, columns=None, sep=None, chunk_rows: int = None):
+    """
+    파일을 (배치, 읽은 비율 0~1) 순서로 스트리밍합니다. 배치는 pyarrow가 있으면 pyarrow.Table, 없으면 DataFrame.
+    CSV는 공용 캐시의 변환과 같은 pyarrow 옵션으로 읽으므로 표본과 전체 데이터의 컬럼 타입이 같습니다.
+    """
+    import pandas as pd
+
+    chunk_rows = chunk_rows or settings["chunk_rows"]
+    lower = path.lower()
+    if lower.endswith(_PARQUET_SUFFIXES):
+        if pa is None:
+            yield pd.read_parquet(path, columns=columns), 1.0
+            return
+        parquet = pa_parquet.ParquetFile(path)
+        total, seen = max(parquet.metadata.num_rows, 1), 0
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            seen += batch.num_rows
+            yield pa.Table.from_batches([batch]), seen / total
+        return
+
+    sep = sep or ("\t" if lower.endswith(".tsv") else ",")
+    size = max(os.path.getsize(path), 1)
+    with open(path, "rb") as handle:
+        if pa is None:
+            for frame in pd.read_csv(handle, sep=sep, usecols=columns, chunksize=chunk_rows):
+                yield frame, handle.tell() / size
+            return
+        reader = pa_csv.open_csv(handle, parse_options=pa_csv.ParseOptions(delimiter=sep),
+                                 convert_options=pa_csv.ConvertOptions(include_columns=columns))
+        for batch in reader:
+            yield pa.Table.from_batches([batch]), handle.tell() / size
+
+
+def _len(batch) -> int:
+    return batch.num_rows if pa is not None and isinstance(batch, pa.Table) else len(batch)
+
+
+def _take(batch, indices):
+    if pa is not None and isinstance(batch, pa.Table):
+        return batch.take(pa.array(indices, type=pa.int64()))
+    return batch.iloc[indices].reset_index(drop=True)
+
+
+def _concat(parts: list):
+    if pa is not None and isinstance(parts[0], pa.Table):
+        return pa.concat_tables(parts)
+    import pandas as pd
+    return pd.concat(parts, ignore_index=True)
+
+
+def _column(batch, name: str):
+    if pa is not None and isinstance(batch, pa.Table):
+        return batch.column(name).to_numpy(zero_copy_only=False)
+    return batch[name].to_numpy()
+
+
+def _within_quota(keys, groups, quota):
+    """각 그룹 안에서 키가 작은 순서로 quota(정수 또는 그룹별 Series)개까지의 위치."""
+    import numpy as np
+    import pandas as pd
+
+    frame = pd.DataFrame({"key": keys, "group": groups})
+    rank = frame.groupby("group", sort=False, dropna=False)["key"].rank(method="first").to_numpy()
+    limit = frame["group"].map(quota).to_numpy(dtype=float) if isinstance(quota, pd.Series) else quota
+    return np.flatnonzero(rank <= limit)
+
+
+def draw_sample(path: str, rows: int = None, strategy: str = None, stratify: str = None, columns=None, sep=None):
+    """
+    파일을 한 번 스트리밍하며 표본을 뽑습니다. (전체를 메모리에 올리지 않음) (표본, 원본 행 수)를 반환합니다.
+     - head:       앞에서부터 rows행 (가장 빠르지만 정렬된 파일에서는 치우침, 원본 행 수는 None)
+     - random:     균등 무작위 rows행 (각 행에 난수 키를 주고 가장 작은 rows개를 남기는 bottom-k)
+     - stratified: stratify 컬럼의 그룹 비율대로 (그룹마다 bottom-k, 작은 그룹도 최소 한 행)
+    head가 아니면 표본의 행은 원본 순서대로 정렬합니다. (시계열 코드가 표본에서도 같은 순서를 보도록)
+    """
+    import numpy as np
+    import pandas as pd
+
+    rows = rows or settings["rows"]
+    strategy = "stratified" if stratify else (strategy or settings["strategy"])
+    if strategy not in ("head", "random", "stratified"):
+        raise ValueError(f"unknown sample strategy: {strategy!r}")
+    if strategy == "stratified" and not stratify:
+        raise ValueError("stratified sampling needs stratify=<column>")
+    read_columns = list(columns) + [stratify] if columns is not None and stratify and stratify not in columns \
+        else columns
+
+    rng = np.random.default_rng(settings["seed"])
+    progress = _Progress(f"sampling {os.path.basename(path)}")
+    kept, seen = None, 0
+    keys, positions, groups = np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=object)
+    counts = pd.Series(dtype=float)   # 그룹별 원본 행 수 (층화 표본의 비율)
+    thresholds = pd.Series(dtype=float)  # 이미 가득 찬 그룹의 가장 큰 키 (이보다 큰 키의 행은 볼 필요 없음)
+    for batch, fraction in _batches(path, read_columns, sep):
+        n = _len(batch)
+        progress.update(n, fraction)
+        if strategy == "head":
+            kept = batch if kept is None else _concat([kept, batch])
+            if _len(kept) >= rows:
+                kept = _take(kept, np.arange(rows))
+                break
+            continue
+
+        batch_keys = rng.random(n)
+        batch_positions = np.arange(seen, seen + n)
+        batch_groups = _column(batch, stratify) if stratify else np.zeros(n, dtype=np.int8)
+        seen += n
+        if stratify:
+            counts = counts.add(pd.Series(batch_groups).value_counts(dropna=False), fill_value=0)
+        if len(thresholds):
+            limit = pd.Series(batch_groups).map(thresholds).to_numpy(dtype=float)
+            candidates = np.flatnonzero(~(batch_keys >= limit))  # NaN(아직 덜 찬 그룹)은 모두 후보
+            if not len(candidates):
+                continue
+            batch = _take(batch, candidates)
+            batch_keys, batch_positions, batch_groups = (batch_keys[candidates], batch_positions[candidates],
+                                                         batch_groups[candidates])
+        kept = batch if kept is None else _concat([kept, batch])
+        keys = np.concatenate([keys, batch_keys])
+        positions = np.concatenate([positions, batch_positions])
+        groups = np.concatenate([groups, batch_groups]) if len(groups) else batch_groups
+        if len(keys) > 2 * rows:  # 배치마다 고르지 않고 후보가 두 배로 쌓였을 때만 줄입니다.
+            selected = _within_quota(keys, groups, rows)
+            kept, keys, positions, groups = _take(kept, selected), keys[selected], positions[selected], groups[selected]
+            per_group = pd.DataFrame({"key": keys, "group": groups}).groupby("group", sort=False, dropna=False)["key"]
+            full = per_group.size() >= rows
+            thresholds = per_group.max()[full]
+    progress.done()
+
+    if kept is None:  # 빈 파일
+        return _full_loader(path, columns=columns, sep=sep, as_arrow=pa is not None, zero_copy=False), 0
+    if strategy == "head":
+        return kept, None
+    if strategy == "random":
+        selected = _within_quota(keys, groups, rows)
+        kept, positions = _take(kept, selected), positions[selected]
+    else:
+        quota = (counts * rows / counts.sum()).round().clip(lower=1)
+        selected = _within_quota(keys, groups, quota)
+        kept, positions = _take(kept, selected), positions[selected]
+        if columns is not None and stratify not in columns:
+            kept = kept.drop_columns([stratify]) if pa is not None and isinstance(kept, pa.Table) \
+                else kept.drop(columns=[stratify])
+    return _take(kept, np.argsort(positions, kind="stable")), seen
+
+
+def _cached_sample(path: str, columns=None, sep=None, stratify: str = None):
+    """같은 파일/옵션의 표본은 커널 안에 캐시합니다. (파일이 바뀌면 다시 뽑음) 쓸 때마다 pending에 기록합니다."""
+    st = os.stat(path)
+    strategy = "stratified" if stratify else settings["strategy"]
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, tuple(columns) if columns is not None else None,
+           sep, strategy, stratify, settings["rows"], settings["seed"])
+    if key not in _samples:
+        _samples[key] = draw_sample(path, columns=columns, sep=sep, stratify=stratify)
+    sample, source_rows = _samples[key]
+    pending[os.path.abspath(path)] = {"path": path, "rows": _len(sample), "source_rows": source_rows,
+                                      "source_mb": round(st.st_size / MB, 1), "strategy": strategy}
+    of = f" of {source_rows:,}" if source_rows else ""
+    print(f"📦 {os.path.basename(path)} ({st.st_size / MB:,.0f} MB): using a {strategy} sample of "
+          f"{_len(sample):,}{of} rows while developing; the agent re-runs on the full file after success.", flush=True)
+    return sample
+
+
+def _to_frame(table, as_arrow: bool = False, zero_copy: bool = False):
+    """표본을 공용 캐시의 load_dataset과 같은 형태로 바꿉니다."""
+    if pa is None or not isinstance(table, pa.Table):
+        return table
+    if as_arrow:
+        return table
+    import pandas as pd
+    return table.to_pandas(types_mapper=pd.ArrowDtype) if zero_copy else table.to_pandas()
+
+
+def load_dataset(path: str, columns=None, sep=None, as_arrow: bool = False, zero_copy: bool = True,
+                 stratify: str = None):
+    """
+    공용 캐시의 load_dataset과 같지만, 표본 모드에서는 임계값보다 큰 파일 대신 그 표본을 돌려줍니다.
+    stratify를 주면 그 컬럼의 그룹 비율을 유지하는 층화 표본을 뽑습니다. (전체 데이터에서는 무시)
+    """
+    if settings["mode"] != "sample" or not _is_large(path):
+        return _full_loader(path, columns=columns, sep=sep, as_arrow=as_arrow, zero_copy=zero_copy)
+    return _to_frame(_cached_sample(path, columns, sep, stratify), as_arrow, zero_copy)
+
+
+def read_chunks(path: str, chunk_rows: int = None, columns=None, sep=None):
+    """
+    파일을 chunk_rows행씩 (numpy 기반) DataFrame으로 읽습니다. 메모리에 다 올릴 수 없는 파일의 집계에 씁니다.
+    표본 모드에서는 큰 파일의 표본만 같은 크기로 나누어 돌려주고, 그 밖에는 파일 전체를 스트리밍하며
+    진행률을 출력합니다.
+    """
+    chunk_rows = chunk_rows or settings["chunk_rows"]
+    if settings["mode"] == "sample" and _is_large(path):
+        sample = _to_frame(_cached_sample(path, columns, sep))
+        for start in range(0, len(sample), chunk_rows):
+            yield sample.iloc[start:start + chunk_rows]
+        return
+
+    progress = _Progress(f"reading {os.path.basename(path)}")
+    buffered, buffered_rows = [], 0
+    for batch, fraction in _batches(path, columns, sep, chunk_rows):
+        buffered.append(batch)
+        buffered_rows += _len(batch)
+        progress.update(_len(batch), fraction)
+        if buffered_rows >= chunk_rows:
+            yield _to_frame(_concat(buffered))
+            buffered, buffered_rows = [], 0
+    if buffered:
+        yield _to_frame(_concat(buffered))
+    progress.done()
@@ -0,0 +1,101 @@
+import os
+
+# 대용량 모드 (기본 켜짐). 임계값보다 큰 CSV/Parquet 파일은 load_dataset/read_chunks가 표본을 돌려주어
+# 생성-실행-수정 반복을 표본 위에서 하고, plan이 성공하면 에이전트가 전체 데이터로 한 번 다시 실행합니다.
+LARGE_DATA_ENABLED = os.getenv("JUPYTER_LLM_LARGE_DATA", "1") != "0"
+LARGE_DATA_MB = float(os.getenv("JUPYTER_LLM_LARGE_DATA_MB", "256"))
+SAMPLE_ROWS = int(os.getenv("JUPYTER_LLM_SAMPLE_ROWS", "100000"))
+# head(가장 빠름) / random(균등 무작위, 파일을 한 번 스트리밍). 층화 표본은 load_dataset(..., stratify=컬럼)
+SAMPLE_STRATEGY = os.getenv("JUPYTER_LLM_SAMPLE_STRATEGY", "random")
+CHUNK_ROWS = int(os.getenv("JUPYTER_LLM_CHUNK_ROWS", "1000000"))
+# 전체 데이터로 다시 실행할 때 출력 없이 기다릴 최대 시간 (초). 큰 파일의 첫 캐시 변환은 오래 걸릴 수 있습니다.
+FULL_RUN_TIMEOUT = int(os.getenv("JUPYTER_LLM_FULL_RUN_TIMEOUT", "3600"))
+
+# 커널에 주입되는 도우미 모듈의 이름 (src/tools/kernel_sampling.py)
+KERNEL_LARGE_DATA = "_jupyter_llm_large_data"
+
+
+def kernel_settings() -> dict:
+    """커널 쪽 도우미의 install()에 넘길 설정."""
+    return {"mode": "sample" if LARGE_DATA_ENABLED else "off", "threshold_mb": LARGE_DATA_MB,
+            "rows": SAMPLE_ROWS, "strategy": SAMPLE_STRATEGY, "chunk_rows": CHUNK_ROWS}
+
+
+def format_sampled(sources: list) -> str:
+    """표본으로 대신 읽은 파일들의 한 줄 요약."""
+    parts = []
+    for source in sources:
+        of = f" / {source['source_rows']:,}" if source.get("source_rows") else ""
+        parts.append(f"{os.path.basename(source['path'])} {source['rows']:,}{of} rows ({source['strategy']})")
+    return ", ".join(parts)
+
+
+# --- 직접 실행하여 표본 모드의 수정 반복 시간과 전체 실행 시간을 비교하는 경우 ---
+if __name__ == '__main__':
+    import sys
+    import time
+    import tempfile
+
+    import numpy as np
+    import pandas as pd
+
+    # 커널 설정은 src.tools.large_data를 불러올 때 읽으므로, 임계값은 그 전에 정합니다.
+    os.environ.setdefault("JUPYTER_LLM_LARGE_DATA_MB", "64")
+    from src.tools.jupyter_executor import JupyterExecutor
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000_000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    csv_path = os.path.join(tempfile.mkdtemp(), "events.csv")
+    rng = np.random.default_rng(0)
+    step = 1_000_000
+    for start in range(0, rows, step):
+        n = min(step, rows - start)
+        pd.DataFrame({
+            "id": np.arange(start, start + n),
+            "amount": rng.gamma(2.0, 30.0, n).round(2),
+            "qty": rng.integers(1, 10, n),
+            "customer": rng.integers(0, 1_000_000, n),
+            "city": rng.choice(["Seoul", "Busan", "Daegu", "Incheon"], n),
+        }).to_csv(csv_path, mode="a", header=start == 0, index=False)
+    print(f"CSV: {os.path.getsize(csv_path) / 1e6:.0f} MB, {rows:,} rows, "
+          f"threshold {os.environ['JUPYTER_LLM_LARGE_DATA_MB']} MB")
+
+    # 수정 반복마다 다시 실행되는 셀 (데이터를 읽고 집계) - 실패했다 고쳐지는 셀을 흉내 냅니다.
+    cell = (f"df = load_dataset({csv_path!r})\n"
+            "df['revenue'] = df['amount'] * df['qty']\n"
+            "summary = df.groupby('city')['revenue'].agg(['sum', 'mean', 'count'])\n"
+            "top = df.groupby('customer')['revenue'].sum().nlargest(10)")
+    chunked = (f"parts = [chunk.assign(revenue=chunk['amount'] * chunk['qty']).groupby('city')['revenue'].agg(['sum', 'count'])\n"
+               f"         for chunk in read_chunks({csv_path!r})]\n"
+               "summary = pd.concat(parts).groupby(level=0).sum()")
+    executor = JupyterExecutor()
+    try:
+        executor.execute("import pandas as pd")
+
+        def run(code, timeout=30):
+            started = time.perf_counter()
+            result = executor.execute(code, timeout=timeout)
+            assert not result["error"], result["stderr"]
+            return time.perf_counter() - started
+
+        print(f"{'step':<34} {'seconds':>8}")
+        executor.set_data_mode("full")
+        full_first = run(cell, timeout=FULL_RUN_TIMEOUT)  # 공용 캐시 변환 포함
+        full_iter = [run(cell, timeout=FULL_RUN_TIMEOUT) for _ in range(iterations)]
+        print(f"{'full data, first run (+cache)':<34} {full_first:>8.2f}")
+        print(f"{'full data, per fix iteration':<34} {sum(full_iter) / iterations:>8.2f}")
+
+        executor.set_data_mode("sample")
+        sample_first = run(cell)  # 표본 뽑기 포함
+        sample_iter = [run(cell) for _ in range(iterations)]
+        print(f"{'sample, first run (+draw)':<34} {sample_first:>8.2f}")
+        print(f"{'sample, per fix iteration':<34} {sum(sample_iter) / iterations:>8.2f}")
+        print(f"sampled: {format_sampled(executor.sampled_sources(clear=True))}")
+
+        executor.set_data_mode("full")
+        print(f"{'full chunked run (read_chunks)':<34} {run(chunked, timeout=FULL_RUN_TIMEOUT):>8.2f}")
+        executor.set_data_mode("sample")
+        print(f"{iterations} fix iterations: full {full_first + sum(full_iter):.1f}s -> "
+              f"sample {sample_first + sum(sample_iter):.1f}s (+ one full run at the end)")
+    finally:
+        executor.shutdown()
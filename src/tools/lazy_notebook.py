@@ -0,0 +1,327 @@
+import os
+import re
+import json
+import mmap
+import threading
+from collections import OrderedDict
+
+import nbformat
+
+# 메모리에 올려 둘 최근 셀 수 (노드들은 마지막 몇 개의 코드 셀만 참조합니다)
+RESIDENT_CELLS = 20
+
+# JSON 문자열 하나 또는 괄호 하나. 긴 문자열(base64 이미지 등)은 정규식 엔진 안에서 한 번에 건너뜁니다.
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+
+
+def _index_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.index.json")
+
+
+def scan_cells(buffer) -> dict:
+    """
+    노트북 JSON을 파싱하지 않고 훑어서 셀의 바이트 범위를 찾습니다.
+
+    Returns:
+        dict: {"cells_start": '['의 위치, "cells_end": ']'의 위치,
+               "cells": [[셀 시작, 셀 끝(포함), outputs '[' 위치 또는 -1, outputs ']' 위치 또는 -1], ...]}
+    """
+    depth = 0
+    last_string = {}  # 깊이별 마지막 문자열 (괄호가 열릴 때 그 값의 키가 됨)
+    cells_start = cells_end = -1
+    cells = []
+    current = None
+    for match in _TOKEN.finditer(buffer):
+        token = match.group()
+        char = token[:1]
+        if char == b'"':
+            last_string[depth] = token
+            continue
+        pos = match.start()
+        if char in (b"[", b"{"):
+            key = last_string.get(depth)
+            depth += 1
+            last_string[depth] = None
+            if depth == 2 and char == b"[" and key == b'"cells"':
+                cells_start = pos
+            elif depth == 3 and cells_start >= 0 and cells_end < 0 and char == b"{":
+                current = [pos, -1, -1, -1]
+            elif depth == 4 and current is not None and char == b"[" and key == b'"outputs"':
+                current[2] = pos
+        else:
+            if depth == 4 and current is not None and current[2] >= 0 and current[3] < 0 and char == b"]":
+                current[3] = pos
+            elif depth == 3 and current is not None and char == b"}":
+                current[1] = pos
+                cells.append(current)
+                current = None
+            elif depth == 2 and cells_start >= 0 and cells_end < 0 and char == b"]":
+                cells_end = pos
+            depth -= 1
+    if cells_start < 0 or cells_end < 0:
+        raise ValueError("노트북에서 'cells' 배열을 찾을 수 없습니다.")
+    return {"cells_start": cells_start, "cells_end": cells_end, "cells": cells}
+
+
+def _rejoin(node: dict) -> dict:
+    """파일에는 줄 단위 목록으로 저장된 source/text/data를 문자열로 되돌립니다. (nbformat.read와 같은 결과)"""
+    for key in ("source", "text"):
+        if isinstance(node.get(key), list):
+            node[key] = "".join(node[key])
+    for mime, value in (node.get("data") or {}).items():
+        if isinstance(value, list):
+            node["data"][mime] = "".join(value)
+    return node
+
+
+def _cell_json(cell) -> bytes:
+    """nbformat.write와 같은 모양(정렬된 키, indent=1, 줄 단위 source)으로 셀 하나를 직렬화합니다."""
+    cell = dict(cell)
+    if isinstance(cell.get("source"), str):
+        cell["source"] = cell["source"].splitlines(True)
+    text = json.dumps(cell, sort_keys=True, indent=1, ensure_ascii=False)
+    return "\n".join("  " + line for line in text.split("\n")).encode("utf-8")
+
+
+class LazyNotebook:
+    """
+    큰 노트북을 통째로 읽지 않고 다루는 뷰.
+    - 셀의 바이트 범위만 색인하고 (색인은 mtime/size 기준으로 옆 파일에 캐시),
+    - 최근 RESIDENT_CELLS개 셀의 source/metadata만 메모리에 올리며,
+    - 출력 페이로드는 요청할 때만 읽고,
+    - 새 셀은 파일 끝부분만 다시 써서 추가합니다.
+    """
+    # 노트북 경로별로 하나의 뷰만 사용하도록 캐시합니다.
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: str, resident_cells: int = RESIDENT_CELLS):
+        self.path = os.path.abspath(path)
+        self.resident_cells = resident_cells
+        self._lock = threading.Lock()
+        self._index = None
+        self._resident = OrderedDict()  # 셀 번호 -> 출력을 뺀 셀 (NotebookNode)
+        self.metadata = {}
+        self.stats = {"scans": 0, "index_hits": 0, "appends": 0, "output_loads": 0}
+        self._load_index()
+
+    @classmethod
+    def open(cls, path: str, create: bool = True) -> "LazyNotebook":
+        """경로별로 캐시된 뷰를 반환합니다. 파일이 없으면 빈 노트북을 만듭니다."""
+        path = os.path.abspath(path)
+        with cls._instances_lock:
+            if path not in cls._instances:
+                if create and not os.path.exists(path):
+                    with open(path, 'w', encoding='utf-8') as f:
+                        nbformat.write(nbformat.v4.new_notebook(), f)
+                cls._instances[path] = cls(path)
+            return cls._instances[path]
+
+    # --- 색인 ---
+    def _stat_key(self) -> list:
+        st = os.stat(self.path)
+        return [st.st_mtime_ns, st.st_size]
+
+    def _load_index(self):
+        key = self._stat_key()
+        index = None
+        try:
+            with open(_index_path(self.path), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                index = cached
+                self.stats["index_hits"] += 1
+        except (FileNotFoundError, ValueError):
+            pass
+        if index is None:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                index = scan_cells(buffer)
+            index["key"] = key
+            self.stats["scans"] += 1
+            self._save_index(index)
+        self._index = index
+        self._resident.clear()
+        self._load_root_metadata()
+        self._load_tail()
+
+    def _save_index(self, index: dict):
+        try:
+            with open(_index_path(self.path), 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+        except OSError:
+            pass  # 색인 캐시는 최적화일 뿐이므로 쓰기 실패는 무시합니다.
+
+    def _refresh_if_changed(self):
+        """다른 프로그램이 노트북을 수정했다면 다시 색인합니다."""
+        if self._stat_key() != self._index["key"]:
+            self._load_index()
+
+    def _read(self, start: int, end: int) -> bytes:
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def _load_root_metadata(self):
+        # cells 배열 앞뒤(작은 부분)만 읽어 루트 객체를 만듭니다.
+        with open(self.path, 'rb') as f:
+            head = f.read(self._index["cells_start"])
+            f.seek(self._index["cells_end"] + 1)
+            tail = f.read()
+        root = json.loads(head + b"[]" + tail)
+        self.metadata = root.get("metadata", {})
+        self.nbformat = root.get("nbformat", 4)
+        self.nbformat_minor = root.get("nbformat_minor", 5)
+
+    def _load_tail(self):
+        for i in range(max(0, len(self) - self.resident_cells), len(self)):
+            self._resident[i] = self._read_cell(i)
+
+    def _read_cell(self, i: int):
+        start, end, out_start, out_end = self._index["cells"][i]
+        if out_start >= 0:
+            # 출력 배열은 빈 배열로 바꿔 파싱합니다. (페이로드는 outputs()로 따로 읽음)
+            raw = self._read(start, out_start) + b"[]" + self._read(out_end + 1, end + 1)
+        else:
+            raw = self._read(start, end + 1)
+        return nbformat.from_dict(_rejoin(json.loads(raw)))
+
+    # --- 읽기 ---
+    def __len__(self) -> int:
+        return len(self._index["cells"])
+
+    def cell(self, i: int):
+        """출력을 뺀 셀 하나 (source, metadata 등)."""
+        with self._lock:
+            self._refresh_if_changed()
+            i = i % len(self)
+            if i in self._resident:
+                return self._resident[i]
+            return self._read_cell(i)
+
+    def outputs(self, i: int) -> list:
+        """셀 하나의 출력 페이로드를 디스크에서 읽습니다."""
+        with self._lock:
+            self._refresh_if_changed()
+            _, _, out_start, out_end = self._index["cells"][i % len(self)]
+            self.stats["output_loads"] += 1
+            if out_start < 0:
+                return []
+            return [nbformat.from_dict(_rejoin(output)) for output in json.loads(self._read(out_start, out_end + 1))]
+
+    def tail(self, n: int = None) -> list:
+        """최근 셀 n개 (기본: 메모리에 올라와 있는 셀 전부)."""
+        with self._lock:
+            self._refresh_if_changed()
+            cells = list(self._resident.values())
+        return cells if n is None else cells[-n:]
+
+    def tail_view(self, n: int = None):
+        """
+        최근 셀만 담은 작은 NotebookNode. 그래프 상태에는 전체 노트북 대신 이 뷰를 넣습니다.
+        """
+        notebook = nbformat.v4.new_notebook(metadata=self.metadata)
+        notebook.cells = self.tail(n)
+        return notebook
+
+    # --- 쓰기 ---
+    def append_cell(self, cell):
+        """
+        파일 전체를 다시 쓰지 않고, 마지막 셀 뒤부터 파일 끝까지만 다시 써서 셀을 추가합니다.
+        """
+        with self._lock:
+            self._refresh_if_changed()
+            index = self._index
+            cells = index["cells"]
+            write_at = cells[-1][1] + 1 if cells else index["cells_start"] + 1
+            trailer = self._read(index["cells_end"] + 1, index["key"][1])
+
+            prefix = b",\n" if cells else b"\n"
+            body = _cell_json(cell)
+            with open(self.path, 'r+b') as f:
+                f.seek(write_at)
+                f.write(prefix + body + b"\n ]" + trailer)
+                f.truncate()
+
+            # 새 셀의 바이트 범위를 색인에 추가합니다. (outputs 위치는 새 셀만 다시 훑어 찾음)
+            cell_start = write_at + len(prefix)
+            wrapper = b'{"cells": ['
+            local = scan_cells(wrapper + body + b"]}")["cells"][0]
+            shift = cell_start - len(wrapper)  # body 앞의 들여쓰기를 포함해 body 시작 위치를 기준으로 옮깁니다.
+            cells.append([local[0] + shift, local[1] + shift,
+                          local[2] + shift if local[2] >= 0 else -1,
+                          local[3] + shift if local[3] >= 0 else -1])
+            index["cells_end"] = cell_start + len(body) + 2
+            index["key"] = self._stat_key()
+            self._save_index(index)
+            self.stats["appends"] += 1
+
+            light = nbformat.from_dict(dict(cell, outputs=[]) if "outputs" in cell else dict(cell))
+            self._resident[len(cells) - 1] = light
+            while len(self._resident) > self.resident_cells:
+                self._resident.popitem(last=False)
+
+
+def load_notebook_view(path: str) -> tuple:
+    """
+    [진입점용] 노트북을 지연 로딩으로 열고 (최근 셀 뷰, 새로 만들었는지 여부)를 반환합니다.
+    """
+    created = not os.path.exists(path)
+    return LazyNotebook.open(path).tail_view(), created
+
+
+# --- 직접 실행하여 전체 로딩과 지연 로딩을 비교하는 경우 ---
+if __name__ == '__main__':
+    import base64
+    import tempfile
+    import time
+    import tracemalloc
+
+    tmp_dir = tempfile.mkdtemp()
+    path = os.path.join(tmp_dir, "big.ipynb")
+    image = base64.b64encode(os.urandom(150_000)).decode("ascii")
+    notebook = nbformat.v4.new_notebook()
+    for i in range(600):
+        cell = nbformat.v4.new_code_cell(f"df.plot(kind='line', title='step {i}')\nprint({i})")
+        cell.outputs = [nbformat.v4.new_output("stream", name="stdout", text=f"{i}\n"),
+                        nbformat.v4.new_output("display_data", data={"image/png": image, "text/plain": "<Figure>"})]
+        notebook.cells.append(cell)
+    with open(path, 'w', encoding='utf-8') as f:
+        nbformat.write(notebook, f)
+    del notebook
+    print(f"notebook size: {os.path.getsize(path) / 1e6:.1f} MB")
+
+    def measure(label, fn):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:<22} {elapsed * 1000:8.1f} ms   peak {peak / 1e6:8.1f} MB")
+        return result
+
+    def full_read():
+        with open(path, 'r', encoding='utf-8') as f:
+            return nbformat.read(f, as_version=4)
+
+    measure("nbformat.read", full_read)
+    measure("lazy (cold scan)", lambda: LazyNotebook(path).tail_view())
+    lazy = measure("lazy (cached index)", lambda: LazyNotebook(path))
+
+    def full_append():
+        nb = full_read()
+        nb.cells.append(nbformat.v4.new_code_cell("print('full')"))
+        with open(path, 'w', encoding='utf-8') as f:
+            nbformat.write(nb, f)
+
+    measure("append (full rewrite)", full_append)
+    lazy = LazyNotebook(path)
+    measure("append (in place)", lambda: lazy.append_cell(nbformat.v4.new_code_cell("print('lazy')")))
+
+    # 추가 후에도 nbformat으로 읽을 수 있고 셀 수가 맞는지 확인합니다.
+    check = full_read()
+    assert len(check.cells) == len(lazy) == 602, (len(check.cells), len(lazy))
+    assert check.cells[-1].source == "print('lazy')"
+    assert lazy.outputs(0)[1]["data"]["image/png"] == image
+    print("ok:", lazy.stats)
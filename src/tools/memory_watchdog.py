@@ -0,0 +1,122 @@
+import os
+import ast
+import json
+from typing import Optional
+
+import psutil
+
+# 커널 메모리 예산 (MB). 0이면 이 머신 물리 메모리의 절반을 사용합니다.
+MEMORY_BUDGET_MB = float(os.getenv("JUPYTER_LLM_KERNEL_MEMORY_MB", "0"))
+# 예산의 이 비율을 넘으면 회수를 시작하고, 이 비율까지 낮추는 것을 목표로 합니다.
+RECLAIM_AT = float(os.getenv("JUPYTER_LLM_MEMORY_RECLAIM_AT", "0.85"))
+RECLAIM_TARGET = float(os.getenv("JUPYTER_LLM_MEMORY_RECLAIM_TARGET", "0.6"))
+# 최근 몇 개 셀에서 쓴 이름은 내보내지 않습니다.
+PROTECT_RECENT_CELLS = int(os.getenv("JUPYTER_LLM_MEMORY_PROTECT_CELLS", "3"))
+WATCHDOG_ENABLED = os.getenv("JUPYTER_LLM_MEMORY_WATCHDOG", "1") != "0"
+
+# 커널에 주입되는 도우미 모듈의 이름 (src/tools/kernel_memory.py)
+KERNEL_HELPER = "_jupyter_llm_memory"
+
+
+def default_budget_mb() -> float:
+    return MEMORY_BUDGET_MB or psutil.virtual_memory().total / (1024 * 1024) / 2
+
+
+def _expression_value(content: dict, name: str):
+    """silent 실행 응답의 user_expressions 값(text/plain repr)을 파이썬 값으로 바꿉니다."""
+    expression = (content.get("user_expressions") or {}).get(name) or {}
+    if expression.get("status") != "ok":
+        raise RuntimeError(f"{expression.get('ename')}: {expression.get('evalue')}")
+    return ast.literal_eval(expression["data"]["text/plain"])
+
+
+class MemoryWatchdog:
+    """
+    셀이 끝날 때마다 커널 RSS를 예산과 비교하고, 가까워지면 커널 안의 도우미를 조용히 호출해
+    최근 셀이 쓰지 않는 큰 객체를 디스크로 내보내고 gc를 실행합니다. (사용자 셀의 실행 기록에는 남지 않음)
+    내보낸 객체는 다음에 셀에서 쓰일 때 자동으로 다시 불러옵니다.
+    """
+    def __init__(self, executor, budget_mb: float = None, reclaim_at: float = RECLAIM_AT,
+                 target: float = RECLAIM_TARGET, protect_cells: int = PROTECT_RECENT_CELLS):
+        self.executor = executor
+        self.budget_mb = budget_mb or default_budget_mb()
+        self.reclaim_at = reclaim_at
+        self.target = target
+        self.protect_cells = protect_cells
+        self.reports = []
+        # 내보낼 것이 없었다면 RSS가 더 늘거나 최근 셀의 보호가 풀릴 때까지는 다시 시도하지 않습니다.
+        self._quiet_below_mb = 0.0
+        self._quiet_cells = 0
+
+    def kernel_rss_mb(self) -> Optional[float]:
+        """로컬 커널은 프로세스 트리를 직접 재고, 원격 커널은 커널에게 묻습니다."""
+        pid = self.executor.kernel_pid()
+        if pid:
+            try:
+                process = psutil.Process(pid)
+                return sum(p.memory_info().rss for p in [process] + process.children(recursive=True)) / (1024 * 1024)
+            except psutil.Error:
+                return None
+        content = self.executor._run_silent("", user_expressions={"rss": f"{KERNEL_HELPER}.rss_mb()"})
+        return _expression_value(content, "rss")
+
+    def largest_objects(self, limit: int = 20) -> list:
+        """커널 네임스페이스의 큰 객체 목록 (names, type, mb)."""
+        content = self.executor._run_silent(
+            "", user_expressions={"objects": f"{KERNEL_HELPER}.largest_objects_json({limit})"})
+        return json.loads(_expression_value(content, "objects"))
+
+    def check(self, rss_mb: float = None) -> Optional[dict]:
+        """예산에 가까우면 회수하고 그 결과를, 아니면 None을 반환합니다."""
+        try:
+            rss_mb = rss_mb or self.kernel_rss_mb()
+        except Exception:
+            return None
+        if rss_mb is None or rss_mb < self.budget_mb * self.reclaim_at:
+            return None
+        if self._quiet_cells > 0 and rss_mb < self._quiet_below_mb:
+            self._quiet_cells -= 1
+            return None
+        report = self.reclaim(rss_mb)
+        futile = report is None or not (report.get("evicted") or report.get("cleared_outputs"))
+        self._quiet_below_mb = rss_mb + self.budget_mb * 0.05 if futile else 0.0
+        self._quiet_cells = self.protect_cells if futile else 0
+        return report
+
+    def reclaim(self, rss_mb: float) -> Optional[dict]:
+        need_mb = rss_mb - self.budget_mb * self.target
+        try:
+            content = self.executor._run_silent(
+                f"{KERNEL_HELPER}.reclaim({need_mb:.1f}, {self.protect_cells})",
+                user_expressions={"report": f"{KERNEL_HELPER}.last_report_json()"}, timeout=120)
+            report = json.loads(_expression_value(content, "report"))
+        except Exception as e:
+            print(f"⚠️ 커널 메모리 회수 실패: {e}")
+            return None
+        report["budget_mb"] = round(self.budget_mb, 1)
+        self.reports.append(report)
+        print(f"🧹 {format_memory_report(report)}")
+        return report
+
+
+def format_memory_report(report: Optional[dict]) -> str:
+    """사용자 화면과 LLM 프롬프트에 넣을 한 줄 요약."""
+    if not report:
+        return ""
+    parts = [f"kernel memory was near its budget ({report['rss_mb_before']:.0f} MB of {report['budget_mb']:.0f} MB), "
+             f"now {report['rss_mb_after']:.0f} MB."]
+    if report.get("evicted"):
+        evicted = ", ".join(f"{'/'.join(item['names'])} ({item['type']}, {item['mb']:.0f} MB)" for item in report["evicted"])
+        parts.append(f"Spilled to disk: {evicted} - these reload automatically when used, "
+                     "but avoid keeping several large intermediates alive.")
+    if report.get("cleared_outputs"):
+        parts.append(f"Cleared {report['cleared_outputs']} cached outputs (Out/_).")
+    if not report.get("evicted") and report.get("kept"):
+        kept = ", ".join(f"{'/'.join(item['names'])} ({item['reason']})" for item in report["kept"])
+        parts.append(f"Could not evict: {kept}.")
+    elif any(item["reason"] == "referenced elsewhere" for item in report.get("kept", [])):
+        # 다른 참조(클로저, 컨테이너 등)를 지워야 해제되는 객체는 내보낸 객체가 있어도 알려 줍니다.
+        held = ", ".join(f"{'/'.join(item['names'])} ({item['mb']:.0f} MB)" for item in report["kept"]
+                         if item["reason"] == "referenced elsewhere")
+        parts.append(f"Kept (referenced elsewhere): {held} - drop the other references to free them.")
+    return " ".join(parts)
@@ -0,0 +1,195 @@
+import base64
+import hashlib
+import os
+
+# 외부 파일로 분리할 수 있는 바이너리 MIME 타입과 저장 시 사용할 확장자
+BINARY_MIME_TYPES = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "application/pdf": ".pdf",
+}
+
+# 출력 메타데이터에서 이 에이전트가 사용하는 네임스페이스
+METADATA_KEY = "jupyter_llm"
+
+
+class OutputStore:
+    """
+    노트북의 리치 출력(이미지 등 바이너리 MIME 번들)을 내용 해시 기준으로 보관하는 저장소.
+    동일한 이미지는 한 번만 저장되고, 큰 페이로드는 노트북 밖의 파일로 분리됩니다.
+    """
+    # 노트북 경로별로 하나의 저장소만 사용하도록 캐시합니다.
+    _instances = {}
+
+    def __init__(self, root: str, externalize_threshold: int = 32 * 1024):
+        """
+        Args:
+            root (str): 분리된 출력 파일을 저장할 디렉터리.
+            externalize_threshold (int): 이 크기(base64 문자 수) 이상인 페이로드만 파일로 분리합니다.
+        """
+        self.root = root
+        self.externalize_threshold = externalize_threshold
+        self._known = None  # 이미 디스크에 있는 해시 집합 (최초 사용 시 한 번만 스캔)
+        self.stats = {"stored": 0, "deduplicated": 0, "inlined": 0}
+
+    @classmethod
+    def for_notebook(cls, notebook_path: str, **kwargs) -> "OutputStore":
+        """
+        노트북 파일 옆의 '<노트북 이름>_outputs' 디렉터리를 사용하는 저장소를 반환합니다.
+        """
+        notebook_path = os.path.abspath(notebook_path)
+        if notebook_path not in cls._instances:
+            stem, _ = os.path.splitext(notebook_path)
+            cls._instances[notebook_path] = cls(f"{stem}_outputs", **kwargs)
+        return cls._instances[notebook_path]
+
+    @staticmethod
+    def digest(payload: str) -> str:
+        """
+        base64 텍스트 그대로 해시를 계산합니다. (디코딩 없이 중복 여부를 판단하기 위함)
+        """
+        return hashlib.sha256(payload.encode("ascii")).hexdigest()
+
+    def _known_digests(self) -> set:
+        if self._known is None:
+            self._known = set()
+            if os.path.isdir(self.root):
+                for name in os.listdir(self.root):
+                    self._known.add(os.path.splitext(name)[0])
+        return self._known
+
+    def put(self, mime: str, payload) -> tuple:
+        """
+        바이너리 페이로드를 저장하고 (해시, 파일 경로)를 반환합니다.
+        이미 같은 내용이 저장되어 있다면 디코딩과 쓰기를 모두 건너뜁니다.
+        """
+        if isinstance(payload, list):
+            payload = "".join(payload)
+        payload = payload.replace("\n", "")
+        digest = self.digest(payload)
+        path = os.path.join(self.root, digest + BINARY_MIME_TYPES.get(mime, ".bin"))
+
+        known = self._known_digests()
+        if digest in known:
+            self.stats["deduplicated"] += 1
+            return digest, path
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(base64.b64decode(payload))
+        os.replace(tmp_path, path)
+        known.add(digest)
+        self.stats["stored"] += 1
+        return digest, path
+
+    def compact_output(self, output: dict, notebook_dir: str = None) -> dict:
+        """
+        출력(dict)의 큰 바이너리 데이터를 파일로 분리하고, 노트북에는 참조만 남깁니다.
+        노트북 뷰어에서 계속 보이도록 'text/markdown' 이미지 링크를 함께 기록합니다.
+        """
+        data = output.get("data") or {}
+        targets = [
+            mime for mime in BINARY_MIME_TYPES
+            if mime in data and len(data[mime]) >= self.externalize_threshold
+        ]
+        if not targets:
+            return output
+
+        data = dict(data)
+        metadata = dict(output.get("metadata") or {})
+        refs = dict(metadata.get(METADATA_KEY, {}).get("attachments", {}))
+        links = []
+        for mime in targets:
+            digest, path = self.put(mime, data.pop(mime))
+            rel_path = os.path.relpath(path, notebook_dir or os.getcwd()).replace(os.sep, "/")
+            refs[mime] = {"sha256": digest, "path": rel_path}
+            if mime.startswith("image/"):
+                links.append(f"![{mime}]({rel_path})")
+
+        if links and "text/markdown" not in data:
+            data["text/markdown"] = "\n".join(links)
+        metadata[METADATA_KEY] = {**metadata.get(METADATA_KEY, {}), "attachments": refs}
+        return {**output, "data": data, "metadata": metadata}
+
+    def inline_output(self, output: dict, notebook_dir: str = None) -> dict:
+        """
+        compact_output()으로 분리된 출력을 원래의 인라인 base64 형태로 되돌립니다.
+        (노트북을 다른 곳으로 내보낼 때만 필요하며, 평소 로드/저장 경로에서는 호출하지 않습니다.)
+        """
+        refs = (output.get("metadata") or {}).get(METADATA_KEY, {}).get("attachments")
+        if not refs:
+            return output
+
+        data = dict(output.get("data") or {})
+        for mime, ref in refs.items():
+            path = os.path.join(notebook_dir or os.getcwd(), ref["path"])
+            with open(path, "rb") as f:
+                data[mime] = base64.b64encode(f.read()).decode("ascii")
+            self.stats["inlined"] += 1
+        data.pop("text/markdown", None)
+
+        metadata = dict(output["metadata"])
+        rest = {k: v for k, v in metadata[METADATA_KEY].items() if k != "attachments"}
+        if rest:
+            metadata[METADATA_KEY] = rest
+        else:
+            metadata.pop(METADATA_KEY)
+        return {**output, "data": data, "metadata": metadata}
+
+
+# --- 직접 실행하여 벤치마크하는 경우 ---
+if __name__ == '__main__':
+    import random
+    import shutil
+    import tempfile
+    import time
+
+    import nbformat
+    from nbformat.v4 import new_code_cell, new_notebook, new_output
+
+    print("플롯이 많은 세션에서 인라인 저장과 OutputStore 저장을 비교합니다.")
+    num_cells, num_unique = 200, 20
+    rng = random.Random(0)
+    # 실제 PNG는 아니지만 크기와 엔트로피가 비슷한 ~60KB 페이로드를 사용합니다.
+    images = [base64.b64encode(rng.randbytes(60 * 1024)).decode("ascii") for _ in range(num_unique)]
+
+    def build(store: OutputStore = None, notebook_dir: str = None):
+        nb = new_notebook()
+        for i in range(num_cells):
+            cell = new_code_cell(f"plt.plot(range({i}))")
+            output = {
+                "output_type": "display_data",
+                "data": {"image/png": images[i % num_unique], "text/plain": "<Figure size 640x480 with 1 Axes>"},
+                "metadata": {},
+            }
+            if store:
+                output = store.compact_output(output, notebook_dir)
+            cell.outputs.append(new_output(**output))
+            nb.cells.append(cell)
+        return nb
+
+    workdir = tempfile.mkdtemp()
+    try:
+        for label, use_store in (("inline", False), ("output_store", True)):
+            path = os.path.join(workdir, f"{label}.ipynb")
+            store = OutputStore.for_notebook(path) if use_store else None
+            nb = build(store, workdir)
+
+            start = time.perf_counter()
+            with open(path, 'w', encoding='utf-8') as f:
+                nbformat.write(nb, f)
+            save_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with open(path, 'r', encoding='utf-8') as f:
+                nbformat.read(f, as_version=4)
+            load_time = time.perf_counter() - start
+
+            size = os.path.getsize(path)
+            print(f"[{label:>12}] notebook={size / 1e6:.2f} MB save={save_time * 1000:.1f} ms "
+                  f"load={load_time * 1000:.1f} ms" + (f" store={store.stats}" if store else ""))
+    finally:
+        shutil.rmtree(workdir)
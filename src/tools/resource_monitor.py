@@ -0,0 +1,215 @@
+import time
+import threading
+from typing import Callable, Optional
+
+import psutil
+
+# 샘플링 간격(초)과, 실행 중 라이브 측정값을 프론트엔드로 보내는 간격(초)
+SAMPLE_INTERVAL = 0.25
+LIVE_INTERVAL = 2.0
+
+MB = 1024 * 1024
+
+
+def _process_tree(process: psutil.Process) -> list:
+    """커널 프로세스와 그 자식 프로세스들 (`!pip install` 같은 셸 명령 포함)."""
+    try:
+        return [process] + process.children(recursive=True)
+    except psutil.Error:
+        return [process]
+
+
+class ResourceSampler:
+    """
+    코드 셀 하나가 실행되는 동안 커널 프로세스(와 자식 프로세스)의
+    CPU, RSS, I/O, 스레드 수를 백그라운드 스레드에서 주기적으로 측정합니다.
+
+    사용법:
+        with ResourceSampler(pid, on_sample=print) as sampler:
+            ...  # 셀 실행
+        sampler.summary()
+    """
+    def __init__(self, pid: int, interval: float = SAMPLE_INTERVAL,
+                 on_sample: Optional[Callable[[dict], None]] = None, live_interval: float = LIVE_INTERVAL):
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.on_sample = on_sample
+        self.live_interval = live_interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+        self._start_io = None
+        self._start_cpu = None
+        self._start_swap = None
+
+    # --- 측정 ---
+    def _io_counters(self, processes: list) -> tuple:
+        read = write = 0
+        for process in processes:
+            try:
+                io = process.io_counters()  # macOS 등에서는 지원되지 않습니다.
+            except (psutil.Error, AttributeError):
+                continue
+            read += io.read_bytes
+            write += io.write_bytes
+        return read, write
+
+    def _cpu_times(self, processes: list) -> tuple:
+        busy = iowait = 0.0
+        for process in processes:
+            try:
+                times = process.cpu_times()
+            except psutil.Error:
+                continue
+            busy += times.user + times.system
+            iowait += getattr(times, "iowait", 0.0)  # Linux에서만 제공
+        return busy, iowait
+
+    def _sample(self) -> dict:
+        processes = _process_tree(self.process)
+        rss = threads = 0
+        cpu = 0.0
+        for process in processes:
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    threads += process.num_threads()
+                    cpu += process.cpu_percent(None)
+            except psutil.Error:
+                continue
+        read, write = self._io_counters(processes)
+        busy, iowait = self._cpu_times(processes)
+        return {
+            "t": round(time.perf_counter() - self._start, 3),
+            "cpu_percent": round(cpu, 1),
+            "rss_mb": round(rss / MB, 1),
+            "threads": threads,
+            "read_mb": round((read - self._start_io[0]) / MB, 2),
+            "write_mb": round((write - self._start_io[1]) / MB, 2),
+            "cpu_s": round(max(0.0, busy - self._start_cpu[0]), 3),
+            "iowait_s": round(max(0.0, iowait - self._start_cpu[1]), 3),
+        }
+
+    def _run(self):
+        last_live = 0.0
+        while not self._stop.wait(self.interval):
+            sample = self._sample()
+            self.samples.append(sample)
+            if self.on_sample and sample["t"] - last_live >= self.live_interval:
+                last_live = sample["t"]
+                try:
+                    self.on_sample(sample)
+                except Exception:
+                    pass  # 표시 실패가 측정을 멈추게 하지 않도록 합니다.
+
+    def start(self) -> "ResourceSampler":
+        self._start = time.perf_counter()
+        processes = _process_tree(self.process)
+        for process in processes:
+            try:
+                process.cpu_percent(None)  # 첫 호출은 기준점만 잡습니다.
+            except psutil.Error:
+                pass
+        self._start_io = self._io_counters(processes)
+        self._start_cpu = self._cpu_times(processes)
+        self._start_swap = psutil.swap_memory()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        # 아주 짧은 셀도 최소 한 번은 측정되도록 마지막 샘플을 남깁니다.
+        sample = self._sample()
+        if sample["rss_mb"]:  # 프로세스가 이미 종료되었다면 0으로 채워진 샘플은 버립니다.
+            self.samples.append(sample)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # --- 요약 ---
+    def summary(self) -> dict:
+        """셀 하나에 대한 최대/평균 사용량과, CPU/I/O/메모리 중 무엇에 묶였는지에 대한 추정."""
+        duration = time.perf_counter() - self._start if self._start else 0.0
+        if not self.samples:
+            return {"duration_s": round(duration, 3), "samples": 0}
+
+        def mean(key):
+            return round(sum(s[key] for s in self.samples) / len(self.samples), 1)
+
+        swap = psutil.swap_memory()
+        swapped_mb = ((swap.sin - self._start_swap.sin) + (swap.sout - self._start_swap.sout)) / MB
+        last = self.samples[-1]
+        summary = {
+            "duration_s": round(duration, 3),
+            "samples": len(self.samples),
+            "cpu_percent_peak": max(s["cpu_percent"] for s in self.samples),
+            "cpu_percent_mean": mean("cpu_percent"),
+            "cpu_s": max(s["cpu_s"] for s in self.samples),
+            "iowait_s": max(s["iowait_s"] for s in self.samples),
+            "rss_mb_peak": max(s["rss_mb"] for s in self.samples),
+            "rss_mb_mean": mean("rss_mb"),
+            "rss_mb_end": last["rss_mb"],
+            "threads_peak": max(s["threads"] for s in self.samples),
+            "read_mb": max(s["read_mb"] for s in self.samples),
+            "write_mb": max(s["write_mb"] for s in self.samples),
+            "swap_mb": round(max(0.0, swapped_mb), 1),
+        }
+        summary["bound"] = classify_bound(summary)
+        return summary
+
+
+def classify_bound(summary: dict) -> str:
+    """요약 수치로 셀이 무엇 때문에 느렸는지 대략 분류합니다."""
+    duration = summary.get("duration_s", 0.0)
+    if duration < 1.0:
+        return "fast"
+    if summary.get("swap_mb", 0.0) > 100:
+        return "memory (swapping)"
+    if summary.get("iowait_s", 0.0) > 0.3 * duration or summary.get("read_mb", 0) + summary.get("write_mb", 0) > 50 * duration:
+        return "io"
+    if summary.get("cpu_s", 0.0) > 0.5 * duration:
+        return "cpu"
+    return "waiting"  # 네트워크, sleep, 외부 프로세스 대기 등
+
+
+def format_resources(summary: Optional[dict]) -> str:
+    """프롬프트/화면에 넣을 한 줄 요약."""
+    if not summary or not summary.get("samples"):
+        return ""
+    rss = summary["rss_mb_peak"]
+    rss_text = f"{rss / 1024:.1f} GB" if rss >= 1024 else f"{rss:.0f} MB"
+    return (f"took {summary['duration_s']:.1f}s ({summary['bound']}), peak RSS {rss_text}, "
+            f"CPU peak {summary['cpu_percent_peak']:.0f}% / mean {summary['cpu_percent_mean']:.0f}%, "
+            f"I/O read {summary['read_mb']:.0f} MB / write {summary['write_mb']:.0f} MB, "
+            f"threads {summary['threads_peak']}, swap {summary['swap_mb']:.0f} MB")
+
+
+# --- 직접 실행하여 측정 오버헤드를 확인하는 경우 ---
+if __name__ == '__main__':
+    import os
+    import subprocess
+    import sys
+
+    busy_loop = "import time\nt=time.time()\nx=0\nwhile time.time()-t<3: x+=1\nb=bytearray(300*1024*1024)\ntime.sleep(1)"
+    child = subprocess.Popen([sys.executable, "-c", busy_loop])
+    with ResourceSampler(child.pid, on_sample=lambda s: print("live:", s)) as sampler:
+        child.wait()
+    summary = sampler.summary()
+    print(summary)
+    print(format_resources(summary))
+
+    # 측정 자체의 비용 (샘플 1회당)
+    sampler = ResourceSampler(os.getpid()).start()
+    start = time.perf_counter()
+    for _ in range(200):
+        sampler._sample()
+    print(f"sample cost: {(time.perf_counter() - start) / 200 * 1000:.2f} ms")
+    sampler.stop()
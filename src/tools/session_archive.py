@@ -0,0 +1,465 @@
+import os
+import time
+import uuid
+import base64
+import struct
+import tempfile
+import threading
+
+import ormsgpack
+import zstandard
+
+# 세션 아카이브 (기본 켜짐). 노트북 옆의 '<노트북 이름>.session' 파일 하나에 턴마다
+# 구조화된 실행 기록, 라우팅 결정, 셀 저널(출력 포함), 출력 바이너리, (선택) 커널 스냅샷을 덧붙입니다.
+ARCHIVE_ENABLED = os.getenv("JUPYTER_LLM_ARCHIVE", "1") != "0"
+# 성공한 턴마다 커널 네임스페이스를 스냅샷으로 저장합니다. (기본 꺼짐, 큰 객체가 많으면 턴이 느려짐)
+SNAPSHOT_KERNEL = os.getenv("JUPYTER_LLM_ARCHIVE_SNAPSHOT", "0") == "1"
+COMPRESSION_LEVEL = int(os.getenv("JUPYTER_LLM_ARCHIVE_LEVEL", "3"))
+# 스냅샷은 이 크기 단위로 나누어 압축합니다. (읽고 쓸 때 스냅샷 전체를 메모리에 올리지 않음)
+SNAPSHOT_CHUNK_BYTES = 8 * 1024 * 1024
+
+# 파일 구조:
+#   헤더   MAGIC, FORMAT_VERSION
+#   프레임 (압축된 길이, 종류) + zstd(msgpack(레코드))  ... 덧붙이기만 함
+#   색인   zstd(msgpack({"version", "entries": [[종류, 키, 위치, 길이], ...]}))
+#   꼬리   (색인 위치, 색인 길이, FOOTER_MAGIC)
+# 새 프레임은 이전 색인 자리에 덮어쓰고 그 뒤에 색인을 다시 씁니다. 쓰는 도중 중단되어 색인이 깨졌다면
+# 열 때 프레임을 처음부터 훑어 색인을 다시 만듭니다.
+MAGIC = b"JLSA"
+FOOTER_MAGIC = b"JLSX"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+_FRAME = struct.Struct("<IB")
+_FOOTER = struct.Struct("<QI4s")
+KINDS = ("session", "turn", "history", "cell", "blob", "snapshot")
+
+_PACK_OPTIONS = ormsgpack.OPT_NON_STR_KEYS | ormsgpack.OPT_SERIALIZE_NUMPY
+
+
+class ArchiveError(Exception):
+    """읽을 수 없는 아카이브 (다른 형식이거나 더 새로운 버전)."""
+
+
+def _attachments(cell: dict) -> list:
+    """셀 출력 중 OutputStore가 노트북 밖 파일로 분리한 바이너리의 참조 목록."""
+    refs = []
+    for output in cell.get("outputs") or []:
+        refs.extend(((output.get("metadata") or {}).get("jupyter_llm") or {}).get("attachments", {}).values())
+    return refs
+
+
+class SessionArchive:
+    """
+    세션 하나(또는 이어서 진행한 여러 세션)의 압축된 기록. 턴/기록/셀 단위로 따로 압축하므로
+    색인만 읽고 원하는 항목 하나만 풀 수 있습니다. 재개(resume) 시에는 마지막 턴의 상태와 기록을 읽고,
+    커널은 스냅샷을 불러온 뒤 그 이후에 성공한 셀만 다시 실행합니다. (스냅샷이 없으면 성공한 셀 전부)
+    """
+    # 노트북 경로별로 하나의 아카이브만 사용하도록 캐시합니다.
+    _instances = {}
+
+    def __init__(self, path: str, level: int = COMPRESSION_LEVEL):
+        self.path = os.path.abspath(path)
+        self._lock = threading.Lock()
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._entries = {kind: {} for kind in KINDS}  # 종류 -> {키: (위치, 길이)} (덧붙인 순서 유지)
+        self._end = _HEADER.size  # 마지막 프레임의 끝 = 색인을 쓸 위치
+        self.session_id = None
+        self.recovered = False
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            self._load_index()
+        else:
+            with open(self.path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+                f.write(self._footer())
+
+    @classmethod
+    def for_notebook(cls, notebook_path: str, **kwargs) -> "SessionArchive":
+        """노트북 파일 옆의 '<노트북 이름>.session' 아카이브를 반환합니다."""
+        notebook_path = os.path.abspath(notebook_path)
+        if notebook_path not in cls._instances:
+            stem, _ = os.path.splitext(notebook_path)
+            cls._instances[notebook_path] = cls(f"{stem}.session", **kwargs)
+        return cls._instances[notebook_path]
+
+    # --- 색인 ---
+    def _footer(self) -> bytes:
+        entries = [[KINDS.index(kind), key, offset, length]
+                   for kind, items in self._entries.items() for key, (offset, length) in items.items()]
+        index = self._compressor.compress(ormsgpack.packb({"version": FORMAT_VERSION, "entries": entries}))
+        return index + _FOOTER.pack(self._end, len(index), FOOTER_MAGIC)
+
+    def _load_index(self):
+        with open(self.path, "rb") as f:
+            magic, version, _ = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ArchiveError(f"{self.path}: not a session archive")
+            if version > FORMAT_VERSION:
+                raise ArchiveError(f"{self.path}: format version {version} is newer than {FORMAT_VERSION}")
+            try:
+                f.seek(-_FOOTER.size, os.SEEK_END)
+                index_at, index_length, footer_magic = _FOOTER.unpack(f.read(_FOOTER.size))
+                if footer_magic != FOOTER_MAGIC:
+                    raise ArchiveError("missing footer")
+                f.seek(index_at)
+                index = ormsgpack.unpackb(self._decompressor.decompress(f.read(index_length)))
+            except (OSError, ArchiveError, zstandard.ZstdError, ValueError):
+                self._rebuild_index(f)
+                return
+        for kind, key, offset, length in index["entries"]:
+            self._entries[KINDS[kind]][key] = (offset, length)
+        self._end = index_at
+
+    def _rebuild_index(self, f):
+        """색인이 깨진 경우 (쓰는 도중 중단) 온전한 프레임만 다시 훑어 색인을 만듭니다."""
+        size = os.fstat(f.fileno()).st_size
+        offset = _HEADER.size
+        while offset + _FRAME.size <= size:
+            f.seek(offset)
+            length, kind = _FRAME.unpack(f.read(_FRAME.size))
+            if kind >= len(KINDS) or offset + _FRAME.size + length > size:
+                break
+            try:
+                record = self._unpack(f.read(length))
+            except (zstandard.ZstdError, ValueError):
+                break
+            self._entries[KINDS[kind]][record["key"]] = (offset, length)
+            offset += _FRAME.size + length
+        self._end = offset
+        self.recovered = True
+        with open(self.path, "r+b") as out:
+            out.seek(self._end)
+            out.write(self._footer())
+            out.truncate()
+
+    # --- 프레임 읽기/쓰기 ---
+    def _pack(self, record: dict) -> bytes:
+        return self._compressor.compress(ormsgpack.packb(record, option=_PACK_OPTIONS))
+
+    def _unpack(self, frame: bytes) -> dict:
+        return ormsgpack.unpackb(self._decompressor.decompress(frame), option=ormsgpack.OPT_NON_STR_KEYS)
+
+    def _append(self, records):
+        """(종류, 레코드) 목록을 덧붙이고 색인을 한 번만 다시 씁니다. 레코드마다 'key'가 있어야 합니다."""
+        with self._lock, open(self.path, "r+b") as f:
+            f.seek(self._end)
+            for kind, record in records:
+                frame = self._pack(record)
+                f.write(_FRAME.pack(len(frame), KINDS.index(kind)) + frame)
+                self._entries[kind][record["key"]] = (self._end, len(frame))
+                self._end += _FRAME.size + len(frame)
+            f.write(self._footer())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_many(self, kind: str, keys) -> list:
+        with open(self.path, "rb") as f:
+            records = []
+            for key in keys:
+                offset, length = self._entries[kind][key]
+                f.seek(offset + _FRAME.size)
+                records.append(self._unpack(f.read(length)))
+            return records
+
+    def get(self, kind: str, key: str):
+        """항목 하나만 풀어서 반환합니다. 없으면 None."""
+        if key not in self._entries[kind]:
+            return None
+        return self._read_many(kind, [key])[0]
+
+    def keys(self, kind: str) -> list:
+        return list(self._entries[kind])
+
+    # --- 기록 ---
+    def start_session(self, notebook_path: str, resume: bool = False) -> str:
+        """
+        세션 시작을 기록합니다. resume이면 마지막 세션을 이어서 기록합니다.
+        이미 노트북에 있던 셀은 저널에 넣지 않고, 이후에 추가되는 셀부터 기록합니다.
+        """
+        from src.tools.lazy_notebook import LazyNotebook
+        last = self.last_turn()
+        if resume and last:
+            self.session_id = last["session"]
+            return self.session_id
+        self.session_id = uuid.uuid4().hex[:12]
+        self._append([("session", {"key": self.session_id, "started_at": time.time(),
+                                   "notebook_path": os.path.abspath(notebook_path),
+                                   "cells_from": len(LazyNotebook.open(notebook_path))})])
+        return self.session_id
+
+    def record_turn(self, task: str, state: dict, routing: list = None, interrupted: bool = False,
+                    executor=None, snapshot: bool = None) -> dict:
+        """
+        턴 하나를 기록합니다. 새 실행 기록, 이번 턴에 노트북에 추가된 셀(출력과 분리된 바이너리 포함),
+        라우팅 결정, 재개에 필요한 상태를 덧붙이고, snapshot이면 (기본: JUPYTER_LLM_ARCHIVE_SNAPSHOT)
+        오류 없이 끝난 턴 뒤에 커널 네임스페이스도 저장합니다. 기록한 턴 레코드를 반환합니다.
+        """
+        from src.tools.lazy_notebook import LazyNotebook
+        snapshot = SNAPSHOT_KERNEL if snapshot is None else snapshot
+        turn_no = len(self._entries["turn"])
+        records = []
+
+        history = [record for record in state.get("history") or []
+                   if isinstance(record, dict) and record["id"] not in self._entries["history"]]
+        for record in history:
+            records.append(("history", {**record, "key": record["id"], "session": self.session_id, "turn": turn_no}))
+
+        notebook_path = state.get("notebook_path")
+        cells = [self._cells_end(), self._cells_end()]
+        if notebook_path:
+            notebook = LazyNotebook.open(notebook_path)
+            notebook_dir = os.path.dirname(os.path.abspath(notebook_path))
+            cells[1] = len(notebook)
+            blobs = set()
+            for i in range(cells[0], cells[1]):
+                cell = dict(notebook.cell(i))
+                if cell.get("cell_type") == "code":
+                    cell["outputs"] = notebook.outputs(i)
+                records.append(("cell", {"key": str(i), "turn": turn_no, "cell": cell}))
+                for ref in _attachments(cell):
+                    if ref["sha256"] in self._entries["blob"] or ref["sha256"] in blobs:
+                        continue
+                    try:
+                        with open(os.path.join(notebook_dir, ref["path"]), "rb") as f:
+                            records.append(("blob", {"key": ref["sha256"], "path": ref["path"], "data": f.read()}))
+                        blobs.add(ref["sha256"])
+                    except OSError:
+                        pass  # 파일이 지워진 경우 참조만 남깁니다.
+
+        turn = {
+            "key": str(turn_no),
+            "session": self.session_id,
+            "task": task,
+            "routing": routing or [],
+            "interrupted": interrupted,
+            "history": [record["id"] for record in history],
+            "cells": cells,
+            "ended_at": time.time(),
+            # 재개할 때 그래프 상태로 되돌릴 값
+            "state": {key: state.get(key) for key in
+                      ("task", "plan", "plan_cursor", "task_type", "suggested_options", "notebook_path")},
+        }
+        # status는 예외가 났는지로 정해집니다. (경고만 낸 셀은 성공)
+        ok = history and all(record["status"] == "ok" for record in history)
+        if snapshot and executor is not None and ok:
+            # 재개 시 이 스냅샷 뒤에 실행된 셀만 다시 실행합니다. (이번 턴의 기록까지 스냅샷에 포함)
+            history_len = len(history) + sum(len(t["history"]) for t in self.turns() if t["session"] == self.session_id)
+            turn["snapshot"] = self._write_snapshot(executor, turn_no, records, history_len)
+        self._append(records + [("turn", turn)])
+        return turn
+
+    def _cells_end(self) -> int:
+        """저널에 기록된 마지막 셀 다음 번호. (세션 시작 전에 노트북에 있던 셀은 건너뜀)"""
+        journaled = int(next(reversed(self._entries["cell"]))) + 1 if self._entries["cell"] else 0
+        session = self.get("session", self.session_id) if self.session_id else None
+        return max(journaled, session["cells_from"] if session else 0)
+
+    def _write_snapshot(self, executor, turn_no: int, records: list, history_len: int):
+        """커널이 임시 파일에 쓴 스냅샷을 나누어 덧붙입니다. 먼저 쌓인 레코드도 함께 씁니다."""
+        fd, path = tempfile.mkstemp(prefix=".snapshot-", dir=os.path.dirname(self.path))
+        os.close(fd)
+        try:
+            report = executor.snapshot_namespace(path)
+            if not report:
+                return None
+            self._append(records)
+            records.clear()
+            chunks = 0
+            with open(path, "rb") as f:
+                while True:
+                    data = f.read(SNAPSHOT_CHUNK_BYTES)
+                    if not data:
+                        break
+                    self._append([("snapshot", {"key": f"{turn_no}/{chunks}", "data": data})])
+                    chunks += 1
+            return {"chunks": chunks, "bytes": report["bytes"], "names": report["names"],
+                    "skipped": report["skipped"], "seconds": report["seconds"], "history_len": history_len}
+        finally:
+            os.remove(path)
+
+    # --- 읽기 ---
+    def turns(self) -> list:
+        return self._read_many("turn", self.keys("turn"))
+
+    def turn(self, n: int):
+        """턴 하나 (음수면 뒤에서부터). 해당 턴만 풀어서 읽습니다."""
+        keys = self.keys("turn")
+        return self.get("turn", keys[n]) if -len(keys) <= n < len(keys) else None
+
+    def last_turn(self):
+        return self.turn(-1)
+
+    def cell(self, i: int, inline: bool = True):
+        """저널의 셀 하나. inline이면 분리된 바이너리를 아카이브에서 꺼내 출력에 다시 넣습니다."""
+        record = self.get("cell", str(i))
+        if record is None:
+            return None
+        cell = record["cell"]
+        if inline:
+            for output in cell.get("outputs") or []:
+                refs = ((output.get("metadata") or {}).get("jupyter_llm") or {}).get("attachments") or {}
+                for mime, ref in refs.items():
+                    blob = self.get("blob", ref["sha256"])
+                    if blob is not None:
+                        output.setdefault("data", {})[mime] = base64.b64encode(blob["data"]).decode("ascii")
+        return cell
+
+    def session_history(self, session_id: str = None) -> list:
+        """세션의 실행 기록을 순서대로 반환합니다. (기본: 마지막 세션)"""
+        session_id = session_id or (self.last_turn() or {}).get("session")
+        ids = [record_id for turn in self.turns() if turn["session"] == session_id for record_id in turn["history"]]
+        records = self._read_many("history", ids)
+        for record in records:
+            for key in ("key", "session", "turn"):
+                record.pop(key, None)
+        return records
+
+    def resume_state(self) -> dict:
+        """마지막 턴이 끝났을 때의 그래프 상태 (실행 기록 포함). 기록된 턴이 없으면 빈 dict."""
+        last = self.last_turn()
+        if not last:
+            return {}
+        state = {key: value for key, value in last["state"].items() if value is not None and key != "notebook_path"}
+        state["history"] = self.session_history(last["session"])
+        return state
+
+    def restore_kernel(self, executor, timeout: int = 600) -> dict:
+        """
+        마지막 세션의 커널 상태를 되살립니다. 가장 최근 스냅샷을 불러오고 그 뒤에 성공한 셀만 다시 실행하며,
+        스냅샷이 없거나 불러오지 못하면 세션에서 성공한 셀을 처음부터 다시 실행합니다.
+        """
+        started = time.perf_counter()
+        turns = self.turns()
+        session_id = turns[-1]["session"] if turns else None
+        history = self.session_history(session_id) if session_id else []
+        mode, restored, failed, replay_from = "replay", 0, [], 0
+        for turn in reversed([t for t in turns if t["session"] == session_id]):
+            if not turn.get("snapshot"):
+                continue
+            report = self._restore_snapshot(executor, int(turn["key"]), turn["snapshot"], timeout)
+            if report is not None:
+                mode, restored, failed = "snapshot", report["restored"], report["failed"]
+                replay_from = turn["snapshot"]["history_len"]
+            break
+        replayed = 0
+        for record in history[replay_from:]:
+            if record["status"] != "ok":  # 예외가 난 셀만 건너뜁니다. (stderr만 있는 셀은 다시 실행)
+                continue
+            result = executor.execute(record["code"], timeout=timeout)
+            replayed += 1
+            if result.get("error"):
+                failed.append({"code_hash": record["code_hash"], "reason": result["stderr"][-300:]})
+        return {"mode": mode, "restored": restored, "replayed": replayed, "failed": failed,
+                "seconds": round(time.perf_counter() - started, 3)}
+
+    def _restore_snapshot(self, executor, turn_no: int, info: dict, timeout: int):
+        keys = [f"{turn_no}/{chunk}" for chunk in range(info["chunks"])]
+        if not all(key in self._entries["snapshot"] for key in keys):
+            return None  # 스냅샷을 쓰는 도중 중단된 경우 -> 셀을 다시 실행
+        fd, path = tempfile.mkstemp(prefix=".snapshot-", dir=os.path.dirname(self.path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for key in keys:
+                    f.write(self.get("snapshot", key)["data"])
+            return executor.restore_namespace(path, timeout=timeout)
+        finally:
+            os.remove(path)
+
+    def export_notebook(self, path: str):
+        """저널의 셀들로 바이너리를 모두 인라인한 노트북을 만듭니다. (감사/공유용)"""
+        import nbformat
+        notebook = nbformat.v4.new_notebook()
+        notebook.cells = [nbformat.from_dict(self.cell(int(key))) for key in self.keys("cell")]
+        with open(path, "w", encoding="utf-8") as f:
+            nbformat.write(notebook, f)
+        return path
+
+    def summary(self) -> dict:
+        return {"path": self.path, "bytes": os.path.getsize(self.path), "version": FORMAT_VERSION,
+                **{kind: len(items) for kind, items in self._entries.items()}}
+
+
+def format_restore(report: dict) -> str:
+    """restore_kernel() 보고서의 한 줄 요약."""
+    if report["mode"] == "snapshot":
+        text = f"snapshot restored ({report['restored']} names) + {report['replayed']} cells re-run"
+    else:
+        text = f"{report['replayed']} cells re-run"
+    text += f" in {report['seconds']:.1f}s"
+    if report["failed"]:
+        text += f", {len(report['failed'])} failed"
+    return text
+
+
+# --- 직접 실행하여 재개 방식(셀 재실행 vs 스냅샷)과 임의 접근 시간을 비교하는 경우 ---
+if __name__ == '__main__':
+    import sys
+    import json
+    import shutil
+
+    from src.tools.jupyter_executor import JupyterExecutor
+    from src.tools.lazy_notebook import load_notebook_view
+    from src.agent.nodes import code_executor_node
+    from src.agent.history import append_history
+
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    cell_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 0.25
+    workdir = tempfile.mkdtemp()
+    notebook_path = os.path.join(workdir, "session.ipynb")
+    notebook, _ = load_notebook_view(notebook_path)
+    archive = SessionArchive.for_notebook(notebook_path)
+    archive.start_session(notebook_path)
+
+    # 각 턴은 오래 걸리는 셀(데이터 로딩/학습 흉내)과, 그 결과로 만든 배열/DataFrame을 남깁니다.
+    executor = JupyterExecutor(timeout=120)
+    history = []
+    try:
+        for turn in range(turns):
+            code = ("import time\nimport numpy as np\nimport pandas as pd\n" if turn == 0 else "") + (
+                    f"time.sleep({cell_seconds})\n"
+                    f"frame_{turn} = pd.DataFrame(np.random.default_rng({turn}).normal(size=(20_000, 8)))\n"
+                    f"print(frame_{turn}.describe())")
+            state = {"plan": [code], "plan_cursor": 0, "fix_attempts": 0, "task": f"step {turn}",
+                     "history": history, "notebook": notebook, "notebook_path": notebook_path}
+            update = code_executor_node(state, executor=executor)
+            history = append_history(history, update["history"])
+            state.update(update, history=history)
+            archive.record_turn(state["task"], state, [{"node": "router", "destination": "simple_task"}],
+                                executor=executor, snapshot=turn == turns - 1)
+    finally:
+        executor.shutdown()
+
+    history_json = len(json.dumps(history).encode("utf-8"))
+    print(f"{turns} turns, {turns * cell_seconds:.0f}s of cell time")
+    print(f"archive {archive.summary()['bytes'] / 1e6:.2f} MB "
+          f"(notebook {os.path.getsize(notebook_path) / 1e6:.2f} MB + history JSON {history_json / 1e6:.2f} MB "
+          f"+ snapshot {archive.last_turn()['snapshot']['bytes'] / 1e6:.2f} MB uncompressed)")
+
+    reader = SessionArchive(archive.path)
+    started = time.perf_counter()
+    middle = reader.turn(turns // 2)
+    reader.cell(middle["cells"][0])
+    one = time.perf_counter() - started
+    started = time.perf_counter()
+    everything = [reader._read_many(kind, reader.keys(kind)) for kind in KINDS]
+    full = time.perf_counter() - started
+    print(f"random access (one turn + its cell): {one * 1000:.2f} ms, decompress everything: {full * 1000:.1f} ms")
+
+    started = time.perf_counter()
+    state = reader.resume_state()
+    print(f"resume_state: {len(state['history'])} records in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    for label, drop_snapshot in (("re-run cells", True), ("snapshot", False)):
+        executor = JupyterExecutor(timeout=120)
+        try:
+            reader = SessionArchive(archive.path)
+            if drop_snapshot:
+                reader._entries["snapshot"].clear()
+            report = reader.restore_kernel(executor)
+            check = executor.execute(f"print(frame_{turns - 1}.shape)")
+            assert check["stdout"].strip() == "(20000, 8)", check
+            print(f"kernel restore ({label}): {format_restore(report)}")
+        finally:
+            executor.shutdown()
+    shutil.rmtree(workdir)
@@ -0,0 +1,255 @@
+import io
+import os
+import re
+import ast
+import json
+import math
+import time
+import hashlib
+import tokenize
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+# 라이브러리 파일 위치와 동작 설정 (환경 변수로 조정 가능)
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".jupyter_llm", "skills.jsonl")
+SKILL_LIBRARY_PATH = os.getenv("JUPYTER_LLM_SKILL_PATH", DEFAULT_PATH)
+SKILLS_ENABLED = os.getenv("JUPYTER_LLM_SKILLS", "1") != "0"
+# 이 유사도 이상이면 generator 없이 바로 실행하고, OFFER 이상이면 generator에 참고 코드로 제공합니다.
+APPLY_THRESHOLD = float(os.getenv("JUPYTER_LLM_SKILL_APPLY", "0.9"))
+OFFER_THRESHOLD = float(os.getenv("JUPYTER_LLM_SKILL_OFFER", "0.6"))
+
+NUM_BUCKETS = 1 << 18
+
+# 작업 문장에서 치환 가능한 매개변수 (파일 이름, 따옴표로 감싼 컬럼 이름 등)
+_FILE_SLOT = re.compile(r"[\w./\\:-]+\.(?:csv|tsv|xlsx?|parquet|feather|arrow|json|jsonl|txt|pkl|pickle)\b", re.IGNORECASE)
+_QUOTED_SLOT = re.compile(r"[`'\"]([^`'\"\n]{1,64})[`'\"]")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def extract_slots(task: str) -> dict:
+    """작업 문장에서 파일 이름과 따옴표로 감싼 값(컬럼 이름 등)을 순서대로 추출합니다."""
+    files = _FILE_SLOT.findall(task)
+    without_files = _FILE_SLOT.sub(" ", task)
+    return {"file": files, "quoted": _QUOTED_SLOT.findall(without_files)}
+
+
+def normalize_task(task: str) -> str:
+    """매개변수를 자리표시자로 바꿔, 대상만 다른 같은 종류의 작업이 같은 문장이 되도록 합니다."""
+    text = _FILE_SLOT.sub(" <file> ", task)
+    text = _QUOTED_SLOT.sub(" <col> ", text)
+    return " ".join(text.lower().split())
+
+
+def _features(text: str) -> Counter:
+    """단어 1-2gram과 문자 3-gram을 해시 버킷으로 센 희소 벡터."""
+    words = _WORD.findall(text)
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    padded = f" {text} "
+    grams += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    counts = Counter()
+    for gram in grams:
+        bucket = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") % NUM_BUCKETS
+        counts[bucket] += 1
+    return counts
+
+
+@dataclass
+class SkillMatch:
+    skill: dict
+    score: float
+    code: str          # 매개변수를 치환한 코드
+    substituted: bool  # 매개변수 치환이 완전히 이루어졌는지 여부
+
+
+class SkillLibrary:
+    """
+    이전에 성공한 (작업 문장, task_type, 코드) 기록의 로컬 색인.
+    해시 n-gram TF-IDF와 코사인 유사도로 비슷한 작업을 찾으며, 네트워크 임베딩 서비스를 쓰지 않습니다.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str = SKILL_LIBRARY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.skills = []
+        self._vectors = []
+        self._df = Counter()
+        self.stats = {"lookups": 0, "hits": 0, "offers": 0, "lookup_s": 0.0, "added": 0}
+        self._load()
+
+    @classmethod
+    def default(cls) -> Optional["SkillLibrary"]:
+        """프로세스 전체에서 공유하는 기본 라이브러리. 비활성화된 경우 None을 반환합니다."""
+        if not SKILLS_ENABLED:
+            return None
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    # --- 저장/로드 ---
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    self._index(json.loads(line))
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for skill in self.skills:
+                f.write(json.dumps(skill, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _index(self, skill: dict):
+        vector = _features(skill["normalized"])
+        self.skills.append(skill)
+        self._vectors.append(vector)
+        self._df.update(vector.keys())
+
+    # --- 색인/검색 ---
+    def _weights(self, counts: Counter) -> dict:
+        n = len(self.skills) + 1
+        weights = {bucket: (1 + math.log(tf)) * (math.log(n / (1 + self._df.get(bucket, 0))) + 1)
+                   for bucket, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {bucket: w / norm for bucket, w in weights.items()}
+
+    def add(self, task: str, task_type: str, code: str):
+        """성공한 실행을 라이브러리에 추가합니다. 같은 작업/코드라면 사용 횟수만 늘립니다."""
+        normalized = normalize_task(task)
+        code_hash = hashlib.sha1(code.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            for skill in self.skills:
+                if skill["normalized"] == normalized and skill["code_hash"] == code_hash:
+                    skill["successes"] += 1
+                    break
+            else:
+                self._index({
+                    "id": f"{code_hash}-{len(self.skills)}",
+                    "task": task,
+                    "normalized": normalized,
+                    "task_type": task_type or "general",
+                    "slots": extract_slots(task),
+                    "code": code,
+                    "code_hash": code_hash,
+                    "successes": 1,
+                    "failures": 0,
+                    "created_at": time.time(),
+                })
+                self.stats["added"] += 1
+            self._save()
+
+    def record_outcome(self, skill_id: str, success: bool):
+        """라이브러리에서 꺼내 실행한 코드의 성공/실패를 기록합니다."""
+        with self._lock:
+            for skill in self.skills:
+                if skill["id"] == skill_id:
+                    skill["successes" if success else "failures"] += 1
+                    self._save()
+                    return
+
+    def lookup(self, task: str, task_type: str = None) -> Optional[SkillMatch]:
+        """가장 비슷한 기록을 찾아 매개변수를 치환한 코드와 함께 반환합니다. (OFFER_THRESHOLD 미만이면 None)"""
+        start = time.perf_counter()
+        with self._lock:
+            self.stats["lookups"] += 1
+            query = self._weights(_features(normalize_task(task)))
+            best, best_score = None, 0.0
+            for skill, counts in zip(self.skills, self._vectors):
+                if skill["failures"] > skill["successes"]:
+                    continue
+                if task_type and skill["task_type"] != task_type:
+                    continue
+                weights = self._weights(counts)
+                score = sum(w * weights.get(bucket, 0.0) for bucket, w in query.items())
+                if score > best_score:
+                    best, best_score = skill, score
+            self.stats["lookup_s"] += time.perf_counter() - start
+        if best is None or best_score < OFFER_THRESHOLD:
+            return None
+        code, substituted = substitute(best, extract_slots(task))
+        return SkillMatch(skill=best, score=best_score, code=code, substituted=substituted)
+
+    def is_confident(self, match: Optional[SkillMatch]) -> bool:
+        return bool(match and match.substituted and match.score >= APPLY_THRESHOLD)
+
+    def report(self, saved_per_hit_s: float = None) -> dict:
+        report = dict(self.stats, skills=len(self.skills), lookup_s=round(self.stats["lookup_s"], 4))
+        report["hit_rate"] = round(self.stats["hits"] / self.stats["lookups"], 3) if self.stats["lookups"] else 0.0
+        if saved_per_hit_s is not None:
+            report["latency_saved_s"] = round(self.stats["hits"] * saved_per_hit_s - self.stats["lookup_s"], 3)
+        return report
+
+
+def _string_tokens(code: str) -> list:
+    """코드의 일반 문자열 리터럴 토큰 목록: (시작 오프셋, 끝 오프셋, 접두사, 따옴표, 값). f-string과 bytes는 제외합니다."""
+    offsets, total = [], 0
+    for line in code.splitlines(keepends=True):
+        offsets.append(total)
+        total += len(line)
+    literals = []
+    for token in tokenize.generate_tokens(io.StringIO(code).readline):
+        if token.type != tokenize.STRING:
+            continue
+        text = token.string
+        prefix = text[:len(text) - len(text.lstrip("rRuUbBfF"))]
+        if set(prefix.lower()) & {"b", "f"}:
+            continue
+        body = text[len(prefix):]
+        quote = body[:3] if body[:3] in ('"""', "'''") else body[0]
+        literals.append((offsets[token.start[0] - 1] + token.start[1], offsets[token.end[0] - 1] + token.end[1],
+                         prefix, quote, ast.literal_eval(text)))
+    return literals
+
+
+def _matching_slot(value: str, kind: str, old_values) -> Optional[str]:
+    """문자열 값 전체가 매개변수이면 그 매개변수를 반환합니다. 파일은 경로의 마지막 부분만 같아도 됩니다."""
+    for old in old_values:
+        if value == old or (kind == "file" and value.endswith(("/" + old, "\\" + old))):
+            return old
+    return None
+
+
+def substitute(skill: dict, slots: dict) -> tuple:
+    """
+    기록된 작업의 매개변수(파일 이름, 컬럼 이름)를 새 작업의 값으로 코드에서 치환합니다.
+    문자열 리터럴 전체가 매개변수와 같을 때만 바꾸므로 식별자나 다른 문자열 안의 부분 문자열은 건드리지 않습니다.
+    매개변수 개수가 다르거나, 기록된 매개변수가 코드에 리터럴로 나오지 않으면 (원래 코드, False)를 반환합니다.
+    """
+    code = skill["code"]
+    old_slots = skill.get("slots", {})
+    try:
+        literals = _string_tokens(code)
+    except (tokenize.TokenError, SyntaxError, ValueError):  # 매직 명령 등으로 토큰화할 수 없는 코드
+        return code, False
+    replacements = {}
+    for kind in ("file", "quoted"):
+        old_values, new_values = old_slots.get(kind, []), slots.get(kind, [])
+        if len(old_values) != len(new_values):
+            return code, False
+        mapping = dict(zip(old_values, new_values))
+        found = set()
+        for start, end, prefix, quote, value in literals:
+            old = _matching_slot(value, kind, mapping)
+            if old is None or start in replacements:
+                continue
+            found.add(old)
+            replacements[start] = (end, prefix, quote, value[:len(value) - len(old)] + mapping[old])
+        # 작업에서는 'age'인데 코드에는 'Age'처럼 매개변수가 그대로 나오지 않으면 치환 결과를 믿을 수 없습니다.
+        if set(old_values) - found:
+            return code, False
+    for start in sorted(replacements, reverse=True):
+        end, prefix, quote, new = replacements[start]
+        if "\\" in new or quote[0] in new or ("\n" in new and len(quote) == 1):
+            literal = repr(new)  # 원래 따옴표로 감쌀 수 없는 값은 repr로 (항상 올바른 리터럴)
+        else:
+            literal = f"{prefix}{quote}{new}{quote}"
+        code = code[:start] + literal + code[end:]
+    return code, True
@@ -1,8 +1,10 @@
 import os
-import time
-# 테스트하려는 클래스를 임포트합니다.
-# 파일 이름이 다르다면 'jupyter_executor' 부분을 수정해주세요.
-from jupyter_executor import JupyterExecutor
+import sys
+import tempfile
+# 저장소 루트에서 src 패키지를 임포트합니다. (실행 계층의 성능 측정은 test/benchmarks 참고)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.tools.jupyter_executor import JupyterExecutor
+from src.tools.lazy_notebook import LazyNotebook, load_notebook_view
 
 
 def run_test(test_function):
@@ -29,8 +31,8 @@ def test_simple_execution():
         result = executor.execute(code)
 
         print(result)
-        assert "Hello, World!" in result
-        assert "STDERR" not in result
+        assert result["stdout"] == "Hello, World!"
+        assert result["error"] is None and result["stderr"] == ""
     finally:
         if executor:
             executor.shutdown()
@@ -45,42 +47,36 @@ def test_error_capture():
         result = executor.execute(code)
 
         print(result)
-        assert "STDERR --- (Error Occurred)" in result
-        assert "NameError" in result
+        assert result["error"] is not None
+        assert result["error"]["ename"] == "NameError"
     finally:
         if executor:
             executor.shutdown()
 
 
 def test_notebook_creation_on_start():
-    """클래스 생성 시 .ipynb 파일이 자동으로 생성되는지 테스트합니다."""
+    """세션 시작 시 노트북이 없으면 새로 만들고, 실행한 셀이 저장되는지 테스트합니다."""
     executor = None
-    test_filename = "test_notebook.ipynb"
-
-    # 테스트 전에 혹시 파일이 남아있다면 삭제하여 깨끗한 상태에서 시작합니다.
-    if os.path.exists(test_filename):
-        os.remove(test_filename)
+    test_filename = os.path.join(tempfile.mkdtemp(), "test_notebook.ipynb")
 
     try:
-        # create_notebook_on_start 인자를 전달하여 객체를 생성합니다.
-        executor = JupyterExecutor(create_notebook_on_start=test_filename)
-
-        # 생성자 실행이 끝날 시간을 잠시 줍니다.
-        time.sleep(2)
-
-        # 파일이 실제로 생성되었는지 확인합니다.
-        print(f"Checking if '{test_filename}' exists...")
-        print(f"파일 경로: {os.path.abspath(test_filename)}")
+        view, created = load_notebook_view(test_filename)
+        assert created, "새 노트북이어야 합니다."
         assert os.path.exists(test_filename), f"File '{test_filename}' was not created!"
-        print(f"File '{test_filename}' created successfully.")
 
+        executor = JupyterExecutor()
+        result = executor.execute("print(1 + 1)")
+        from nbformat.v4 import new_code_cell, new_output
+        cell = new_code_cell("print(1 + 1)")
+        cell.outputs.append(new_output("stream", name="stdout", text=result["stdout"] + "\n"))
+        LazyNotebook.open(test_filename).append_cell(cell)
+
+        view, created = load_notebook_view(test_filename)
+        assert not created and len(LazyNotebook.open(test_filename)) == 1
+        print(f"File '{test_filename}' created successfully.")
     finally:
-        # 테스트가 끝나면 생성된 파일과 커널을 정리합니다.
         if executor:
             executor.shutdown()
-        # if os.path.exists(test_filename):
-        #     os.remove(test_filename)
-        #     print(f"Cleaned up '{test_filename}'.")
 
 
 # --- 메인 실행 블록 ---
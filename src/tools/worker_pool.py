@@ -0,0 +1,348 @@
+# 보조 커널 풀에 작업을 나눠 실행하는 scatter-gather 도우미.
+# JupyterExecutor가 커널 시작 시 이 모듈을 주입하면(scatter, _jupyter_llm_workers) 생성된 코드가
+#   results = scatter(evaluate, param_grid)
+# 처럼 하이퍼파라미터 탐색, 교차 검증 폴드, 파일별 처리를 여러 코어에서 병렬로 실행할 수 있습니다.
+#  - 함수와 그 함수가 참조하는 전역 값(X_train 등)은 한 번 pickle 파일로 공유 디렉터리에 쓰고,
+#    노트북에서 정의한 함수는 소스로 보냅니다. (cloudpickle이 있으면 cloudpickle 사용)
+#  - 항목은 조각(chunk)으로 나눠 놀고 있는 보조 커널이 차례로 가져가며, 결과는 입력 순서대로 모아 반환합니다.
+#  - 보조 커널은 첫 호출 때 시작해 재사용하고, 주 커널이 종료되면 함께 종료됩니다.
+# 주 커널 밖(호스트 프로세스)에서도 WorkerPool을 그대로 쓸 수 있습니다.
+import os
+import re
+import time
+import queue
+import atexit
+import pickle
+import shutil
+import inspect
+import tempfile
+import textwrap
+import threading
+import types
+
+# 보조 커널 수. 0이면 (CPU 수 - 1), 최소 1
+WORKERS = int(os.getenv("JUPYTER_LLM_WORKERS", "0"))
+SCATTER_DIR = os.getenv("JUPYTER_LLM_SCATTER_DIR", os.path.join(tempfile.gettempdir(), "jupyter_llm_scatter"))
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+# 보조 커널이 시작할 때 한 번 실행하는 코드. 호출마다 상태 파일을 한 번 읽고, 조각을 받아 실행합니다.
+_WORKER_CODE = '''
+import pickle as _jl_pickle, time as _jl_time, importlib as _jl_importlib
+_jl_loaded = {}
+
+def _jl_load(state_path):
+    if _jl_loaded.get("path") == state_path:
+        return _jl_loaded["fn"]
+    with open(state_path, "rb") as f:
+        state = _jl_pickle.load(f)
+    g = globals()
+    for alias, module in state["imports"].items():
+        g[alias] = _jl_importlib.import_module(module)
+    g.update(state["values"])
+    for source in state["sources"]:
+        exec(compile(source, "<scatter>", "exec"), g)
+    if state.get("cloud"):
+        fn = _jl_pickle.loads(state["cloud"])
+        fn.__globals__.update(state["values"])  # share=로 넘긴 값
+    else:
+        fn = state["fn"] if state["fn"] is not None else g[state["name"]]
+    _jl_loaded.update(path=state_path, fn=fn)
+    return fn
+
+def _jl_run(state_path, chunk_path, out_path):
+    fn = _jl_load(state_path)
+    with open(chunk_path, "rb") as f:
+        items = _jl_pickle.load(f)
+    started = _jl_time.perf_counter()
+    results = [fn(item) for item in items]
+    with open(out_path, "wb") as f:
+        _jl_pickle.dump({"results": results, "seconds": _jl_time.perf_counter() - started}, f,
+                        protocol=_jl_pickle.HIGHEST_PROTOCOL)
+'''
+
+
+class ScatterError(RuntimeError):
+    """보조 커널에서 항목 처리 중 예외가 발생했습니다. (원래 traceback을 메시지에 포함)"""
+
+
+def default_workers() -> int:
+    return WORKERS or max(1, (os.cpu_count() or 2) - 1)
+
+
+def _code_names(code) -> set:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _is_interactive(obj) -> bool:
+    """노트북 셀에서 정의한 함수/클래스는 다른 커널에서 이름으로 임포트할 수 없으므로 소스로 보내야 합니다."""
+    return getattr(obj, "__module__", None) in ("__main__", None)
+
+
+def _source(obj) -> str:
+    try:
+        return textwrap.dedent(inspect.getsource(obj))
+    except (OSError, TypeError) as e:
+        raise TypeError(f"scatter: cannot ship {getattr(obj, '__name__', obj)!r} to workers ({e}). "
+                        "Define it with `def` in a cell, or install cloudpickle.") from None
+
+
+def _collect(fn, state: dict, seen: set):
+    """fn의 소스와 fn이 참조하는 전역 이름(모듈, 셀에서 정의한 함수, 그 밖의 값)을 state에 모읍니다."""
+    if fn.__name__ == "<lambda>" or fn.__closure__:
+        raise TypeError("scatter: lambdas and closures cannot be shipped by source; "
+                        "use a top-level `def` (pass extra data with share=...) or install cloudpickle.")
+    g = fn.__globals__
+    for name in sorted(_code_names(fn.__code__)):
+        if name in seen or name not in g:
+            continue
+        seen.add(name)
+        value = g[name]
+        if isinstance(value, types.ModuleType):
+            state["imports"][name] = value.__name__
+        elif isinstance(value, types.FunctionType) and _is_interactive(value):
+            _collect(value, state, seen)
+        elif isinstance(value, type) and _is_interactive(value):
+            state["sources"].append(_source(value))
+        else:
+            state["values"][name] = value
+    state["sources"].append(_source(fn))
+
+
+def ship(fn, share: dict = None) -> dict:
+    """보조 커널로 보낼 상태(함수와 함수가 참조하는 전역 값)를 만듭니다."""
+    state = {"fn": None, "name": getattr(fn, "__name__", None), "imports": {}, "sources": [],
+             "values": dict(share or {})}
+    if not _is_interactive(fn):
+        state["fn"] = fn  # 설치된 모듈의 함수는 이름으로 pickle됩니다. (sklearn 함수 등)
+        return state
+    try:
+        import cloudpickle
+        state["cloud"] = cloudpickle.dumps(fn)  # 셀 함수와 그 전역 값을 값으로 직렬화
+        return state
+    except ImportError:
+        pass
+    _collect(fn, state, seen=set(share or {}))
+    return state
+
+
+def partition(items: list, chunks: int) -> list:
+    """항목을 순서를 유지한 채 chunks개 이하의 연속 구간으로 나눕니다. [(시작 인덱스, 항목 목록)]"""
+    chunks = max(1, min(chunks, len(items)))
+    size, extra = divmod(len(items), chunks)
+    parts, start = [], 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        parts.append((start, items[start:end]))
+        start = end
+    return parts
+
+
+class WorkerPool:
+    """
+    보조 ipykernel 여러 개를 띄워 두고, 조각 단위로 작업을 나눠 실행합니다.
+    각 보조 커널은 (CPU 수 / 보조 커널 수)개의 BLAS/OpenMP 스레드만 쓰도록 제한해 코어를 과점하지 않게 합니다.
+    """
+    def __init__(self, workers: int = None, kernel_name: str = "python3", startup_timeout: int = 60):
+        from jupyter_client import KernelManager
+        self.size = workers or default_workers()
+        threads = str(max(1, (os.cpu_count() or 1) // self.size))
+        env = dict(os.environ, JPY_PARENT_PID=str(os.getpid()),  # 주 커널이 죽으면 보조 커널도 종료
+                   OMP_NUM_THREADS=threads, OPENBLAS_NUM_THREADS=threads, MKL_NUM_THREADS=threads)
+        env.pop("JUPYTER_LLM_WORKERS", None)
+        self.managers, self.clients = [], []
+        try:
+            for _ in range(self.size):  # 프로세스를 먼저 모두 띄우고 준비는 함께 기다립니다.
+                km = KernelManager(kernel_name=kernel_name)
+                km.start_kernel(env=env)
+                self.managers.append(km)
+            for km in self.managers:
+                kc = km.blocking_client()
+                kc.start_channels()
+                kc.wait_for_ready(timeout=startup_timeout)
+                self.clients.append(kc)
+                reply = kc.execute_interactive(_WORKER_CODE, store_history=False, timeout=startup_timeout,
+                                               output_hook=lambda msg: None)
+                if reply["content"]["status"] != "ok":
+                    raise RuntimeError(f"worker setup failed: {reply['content'].get('evalue')}")
+        except Exception:
+            self.shutdown()
+            raise
+
+    def _run_chunk(self, kc, state_path: str, chunk_path: str, out_path: str, timeout: float) -> dict:
+        output = []
+
+        def hook(msg):
+            if msg["header"]["msg_type"] == "stream":
+                output.append(msg["content"]["text"])
+
+        code = f"_jl_run({state_path!r}, {chunk_path!r}, {out_path!r})"
+        try:
+            reply = kc.execute_interactive(code, store_history=False, timeout=timeout, output_hook=hook)
+        except TimeoutError:
+            return {"error": f"TimeoutError: chunk did not finish within {timeout}s", "output": "".join(output),
+                    "timed_out": True}
+        content = reply["content"]
+        if content["status"] != "ok":
+            traceback = _ANSI.sub("", "\n".join(content.get("traceback") or []))
+            return {"error": traceback or f"{content.get('ename')}: {content.get('evalue')}",
+                    "output": "".join(output)}
+        with open(out_path, "rb") as f:
+            return {**pickle.load(f), "output": "".join(output)}
+
+    def map(self, fn, items, share: dict = None, chunks: int = None, timeout: float = None) -> tuple:
+        """
+        fn(item)을 모든 항목에 대해 보조 커널에서 실행하고 (결과 목록, 통계)를 반환합니다.
+        chunks를 정하지 않으면 보조 커널당 4개의 조각으로 나눠 실행 시간이 고르지 않아도 부하가 고르게 퍼집니다.
+        """
+        items = list(items)
+        if not items:
+            return [], {"items": 0, "workers": self.size, "seconds": 0.0, "busy_seconds": 0.0}
+        started = time.perf_counter()
+        os.makedirs(SCATTER_DIR, exist_ok=True)
+        call_dir = tempfile.mkdtemp(prefix="call-", dir=SCATTER_DIR)
+        try:
+            state_path = os.path.join(call_dir, "state.pkl")
+            with open(state_path, "wb") as f:
+                pickle.dump(ship(fn, share), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pending = queue.Queue()
+            parts = partition(items, chunks or self.size * 4)
+            for i, (start, part) in enumerate(parts):
+                chunk_path = os.path.join(call_dir, f"chunk-{i}.pkl")
+                with open(chunk_path, "wb") as f:
+                    pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pending.put((i, start, chunk_path, os.path.join(call_dir, f"result-{i}.pkl")))
+
+            done, failures = {}, []
+
+            def drain(worker: int):
+                kc = self.clients[worker]
+                while not failures:
+                    try:
+                        i, start, chunk_path, out_path = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    outcome = self._run_chunk(kc, state_path, chunk_path, out_path, timeout)
+                    if outcome.get("timed_out"):
+                        self.managers[worker].interrupt_kernel()
+                    if "error" in outcome:
+                        failures.append((worker, start, outcome))
+                        return
+                    done[i] = (start, outcome)
+
+            threads = [threading.Thread(target=drain, args=(w,), daemon=True) for w in range(self.size)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            for i in sorted(done):
+                if done[i][1]["output"]:
+                    print(done[i][1]["output"], end="")
+            if failures:
+                worker, start, outcome = failures[0]
+                if outcome["output"]:
+                    print(outcome["output"], end="")
+                raise ScatterError(f"worker {worker} failed on items starting at index {start}:\n{outcome['error']}")
+
+            results = []
+            for i in sorted(done):
+                results.extend(done[i][1]["results"])
+            stats = {"items": len(items), "chunks": len(parts), "workers": self.size,
+                     "seconds": round(time.perf_counter() - started, 3),
+                     "busy_seconds": round(sum(outcome["seconds"] for _, outcome in done.values()), 3)}
+            return results, stats
+        finally:
+            shutil.rmtree(call_dir, ignore_errors=True)
+
+    def shutdown(self):
+        for kc in self.clients:
+            try:
+                kc.stop_channels()
+            except Exception:
+                pass
+        for km in self.managers:
+            try:
+                if km.is_alive():
+                    km.shutdown_kernel(now=True)
+            except Exception:
+                pass
+        self.managers, self.clients = [], []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers: int = None) -> WorkerPool:
+    """주 커널에서 공유하는 보조 커널 풀. 크기가 바뀌면 새로 띄웁니다."""
+    global _pool
+    with _pool_lock:
+        size = workers or default_workers()
+        if _pool is not None and _pool.size != size:
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            _pool = WorkerPool(size)
+        return _pool
+
+
+def shutdown_workers():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+atexit.register(shutdown_workers)
+
+
+def scatter(fn, items, workers: int = None, share: dict = None, chunks: int = None, timeout: float = None,
+            quiet: bool = False) -> list:
+    """
+    fn(item)을 보조 커널들에서 병렬로 실행하고 결과를 items와 같은 순서의 리스트로 반환합니다.
+    fn이 참조하는 전역 변수(데이터 등)는 자동으로 함께 보내며, 그 밖에 필요한 값은 share={'name': value}로 넘깁니다.
+    """
+    results, stats = get_pool(workers).map(fn, items, share=share, chunks=chunks, timeout=timeout)
+    if not quiet and stats["items"]:
+        speedup = stats["busy_seconds"] / stats["seconds"] if stats["seconds"] else 0.0
+        print(f"🧩 scatter: {stats['items']} items in {stats['chunks']} chunks on {stats['workers']} workers, "
+              f"{stats['seconds']:.2f}s (serial work {stats['busy_seconds']:.2f}s, {speedup:.1f}x)")
+    return results
+
+
+# --- 직접 실행하여 sklearn 그리드 탐색의 직렬 실행과 병렬 실행을 비교하는 경우 ---
+if __name__ == '__main__':
+    import itertools
+    from sklearn.datasets import make_classification
+    from sklearn.model_selection import cross_val_score
+    from sklearn.svm import SVC
+
+    X, y = make_classification(n_samples=3000, n_features=30, n_informative=10, random_state=0)
+    grid = [{"C": C, "gamma": gamma} for C, gamma in itertools.product([0.1, 1, 10, 100], [0.001, 0.01, 0.1, "scale"])]
+
+    def evaluate(params):
+        return params, cross_val_score(SVC(**params), X, y, cv=3).mean()
+
+    started = time.perf_counter()
+    expected = [evaluate(params) for params in grid]
+    serial_s = time.perf_counter() - started
+    print(f"cores: {os.cpu_count()}, grid: {len(grid)} x 3-fold SVC")
+    print(f"{'workers':>8} {'start s':>8} {'run s':>8} {'speedup':>8} {'efficiency':>10}")
+    print(f"{'serial':>8} {'-':>8} {serial_s:>8.2f} {1.0:>8.2f} {'-':>10}")
+    for workers in sorted({1, 2, max(1, (os.cpu_count() or 1) // 2), os.cpu_count() or 1}):
+        started = time.perf_counter()
+        pool = WorkerPool(workers)
+        start_s = time.perf_counter() - started
+        try:
+            results, stats = pool.map(evaluate, grid)
+        finally:
+            pool.shutdown()
+        assert [score for _, score in results] == [score for _, score in expected]
+        speedup = serial_s / stats["seconds"]
+        print(f"{workers:>8} {start_s:>8.2f} {stats['seconds']:>8.2f} {speedup:>8.2f} {speedup / workers:>10.0%}")
@@ -0,0 +1,104 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.tools.backends import AttachBackend, GatewayBackend, KernelScheduler, LocalBackend
+from src.tools.jupyter_executor import JupyterExecutor
+
+# 1. 로컬에서 'jupyter server'를 띄워 원격 게이트웨이 역할을 하게 합니다.
+TOKEN = "jupyter-llm-test"
+with socket.socket() as s:
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+base_url = f"http://127.0.0.1:{port}"
+server = subprocess.Popen(
+    [sys.executable, "-m", "jupyter", "server", "--no-browser", "--allow-root", f"--port={port}", "--ip=127.0.0.1",
+     f"--IdentityProvider.token={TOKEN}", f"--ServerApp.root_dir={tempfile.mkdtemp()}"],
+    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+)
+
+
+def wait_for_server(timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            request = urllib.request.Request(f"{base_url}/api/status", headers={"Authorization": f"token {TOKEN}"})
+            with urllib.request.urlopen(request, timeout=2) as response:
+                return json.loads(response.read())
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError("jupyter server가 시작되지 않았습니다.")
+
+
+executors = []
+try:
+    print("서버 상태:", wait_for_server())
+
+    # 테스트 1: 게이트웨이 백엔드 - 실행, 오류, 출력 스트리밍
+    print("\n[Test 1: gateway backend]")
+    gateway = JupyterExecutor(backend=GatewayBackend(base_url, token=TOKEN))
+    executors.append(gateway)
+    chunks = []
+    result = gateway.execute("for i in range(3): print(i)", on_output=lambda name, text: chunks.append(text))
+    assert result["stdout"] == "0\n1\n2", result
+    assert "".join(chunks).strip() == "0\n1\n2", chunks
+    result = gateway.execute("1 / 0")
+    assert result["error"]["ename"] == "ZeroDivisionError", result
+    assert gateway.kernel_pid() is None and result["resources"] is None  # 원격 커널은 자원 측정 없음
+    assert gateway.execute("callable(load_dataset)")["stdout"] == "True"  # 도우미 주입
+    print("✅", result["error"]["ename"])
+
+    # 테스트 2: 게이트웨이 인터럽트
+    print("\n[Test 2: gateway interrupt]")
+    import threading
+    timer = threading.Timer(1.0, gateway.interrupt)
+    timer.start()
+    started = time.monotonic()
+    result = gateway.execute("import time; time.sleep(30)")
+    assert time.monotonic() - started < 10 and result["error"]["ename"] == "KeyboardInterrupt", result
+    print(f"✅ interrupted after {time.monotonic() - started:.1f}s")
+
+    # 테스트 3: 연결 파일로 붙기 - 로컬 커널을 띄우고 다른 클라이언트로 같은 네임스페이스를 사용
+    print("\n[Test 3: attach by connection file]")
+    owner = JupyterExecutor(backend=LocalBackend())
+    executors.append(owner)
+    owner.execute("shared = 42")
+    attached = JupyterExecutor(backend=AttachBackend(owner.backend.km.connection_file))
+    executors.append(attached)
+    assert attached.execute("print(shared)")["stdout"] == "42"
+    attached.shutdown()  # 연결만 끊고 커널은 그대로
+    assert owner.is_alive()
+    print("✅ attached kernel shares state, detaching leaves it running")
+
+    # 테스트 4: 스케줄러는 실행 중 커널 수 / 용량이 가장 작은 호스트를 고릅니다.
+    print("\n[Test 4: least-loaded scheduling]")
+    gateway_spec = f"gateway:{base_url}?token={TOKEN}&capacity=2"
+    scheduler = KernelScheduler(f"local?capacity=1,{gateway_spec}")
+    first = scheduler.acquire()    # local 0/1 < gateway 1/2 (테스트 1의 커널) -> local
+    second = scheduler.acquire()   # local 1/1 > gateway 1/2 -> gateway
+    assert (first.name, second.name) == ("local", "gateway"), (first.name, second.name)
+    scheduler.release(first)
+    assert scheduler.acquire().name == "local"
+    print("✅", first.describe(), "->", second.describe())
+
+    # 테스트 5: 아직 시작하지 않은 게이트웨이 배치도 부하에 셉니다. (동시에 시작하는 워커가 한곳에 몰리지 않음)
+    print("\n[Test 5: pending gateway placements]")
+    scheduler = KernelScheduler(f"{gateway_spec.replace('capacity=2', 'capacity=3')},local?capacity=2")
+    placed = [scheduler.acquire() for _ in range(3)]  # local 0 -> gateway 1/3 -> local 1/2 < gateway (1+1)/3
+    assert [backend.name for backend in placed] == ["local", "gateway", "local"], [b.name for b in placed]
+    scheduler.release(placed[1])  # 시작하지 못한 배치는 반환하면 대기 수에서도 빠집니다.
+    assert scheduler._pending[0] == 0 and scheduler.acquire().name == "gateway"
+    print("✅", [backend.name for backend in placed])
+
+    print("\n🎉 모든 백엔드 테스트 통과")
+finally:
+    for executor in executors:
+        executor.shutdown()
+    server.terminate()
+    server.wait(timeout=10)
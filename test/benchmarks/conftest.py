@@ -0,0 +1,138 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+# 기준값은 머신마다 다르므로 플랫폼/CPU 수/파이썬 버전별 파일로 저장합니다.
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results.json")
+DEFAULT_THRESHOLD = float(os.getenv("JUPYTER_LLM_BENCH_THRESHOLD", "0.3"))
+
+
+def machine_key() -> str:
+    return f"{sys.platform}-{platform.machine()}-{os.cpu_count()}cpu-py{sys.version_info[0]}{sys.version_info[1]}"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("jupyter_llm benchmarks")
+    group.addoption("--update-baseline", action="store_true",
+                    help="이번 측정값을 이 머신의 기준값으로 저장합니다. (회귀 검사는 하지 않음)")
+    group.addoption("--bench-threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="기준값보다 이 비율 이상 나빠지면 실패합니다. (기본 0.3 = 30%%)")
+    group.addoption("--baseline", default=None, help="기준값 JSON 경로 (기본: baselines/<machine>.json)")
+
+
+class BenchRecorder:
+    """측정값을 모으고, 기준값이 있으면 바로 비교합니다."""
+    def __init__(self, config):
+        self.update = config.getoption("--update-baseline")
+        self.threshold = config.getoption("--bench-threshold")
+        self.baseline_path = config.getoption("--baseline") or os.path.join(BASELINE_DIR, machine_key() + ".json")
+        self.baseline = {}
+        if os.path.exists(self.baseline_path):
+            with open(self.baseline_path, encoding="utf-8") as f:
+                self.baseline = json.load(f).get("metrics", {})
+        self.metrics = {}
+        self.regressions = []
+
+    def record(self, name: str, value: float, unit: str, better: str = "lower", noise: float = 0.0):
+        """
+        측정값 하나를 기록합니다. better는 'lower'(시간 등) 또는 'higher'(처리량 등)입니다.
+        기준값보다 threshold 이상, 그리고 noise(같은 단위의 절대값) 이상 나쁘면 회귀로 기록하고,
+        테스트 함수가 끝난 뒤 그 테스트를 실패시킵니다. (한 테스트의 다른 측정값도 모두 남기기 위해)
+        """
+        self.metrics[name] = {"value": round(value, 4), "unit": unit, "better": better}
+        reference = self.baseline.get(name)
+        if self.update or not reference:
+            return
+        base = reference["value"]
+        change = (value - base) / base if base else 0.0
+        regressed = change > self.threshold if better == "lower" else change < -self.threshold
+        if regressed and abs(value - base) > noise:
+            self.regressions.append(f"성능 회귀: {name} = {value:.4g} {unit} (기준 {base:.4g} {unit}, "
+                                    f"{change:+.0%}, 허용 {self.threshold:.0%})")
+
+    def save(self):
+        payload = {"machine": machine_key(), "python": sys.version.split()[0],
+                   "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "metrics": self.metrics}
+        with open(RESULTS_PATH, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+        if self.update and self.metrics:
+            os.makedirs(os.path.dirname(self.baseline_path), exist_ok=True)
+            merged = {**self.baseline, **self.metrics}
+            with open(self.baseline_path, "w", encoding="utf-8") as f:
+                json.dump({**payload, "metrics": merged}, f, indent=2, ensure_ascii=False)
+
+    def summary_lines(self) -> list:
+        lines = []
+        for name, metric in self.metrics.items():
+            reference = self.baseline.get(name)
+            base = f"{reference['value']:>10.4g}" if reference else f"{'-':>10}"
+            lines.append(f"{name:<34} {metric['value']:>10.4g} {base}  {metric['unit']} ({metric['better']} is better)")
+        return lines
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: 실행 계층 마이크로벤치마크")
+    config._bench = BenchRecorder(config)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    result = yield
+    bench = item.config._bench
+    regressions, bench.regressions = bench.regressions, []
+    if regressions:
+        pytest.fail("\n".join(regressions), pytrace=False)
+    return result
+
+
+def pytest_sessionfinish(session, exitstatus):
+    session.config._bench.save()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    bench = config._bench
+    if not bench.metrics:
+        return
+    terminalreporter.section("jupyter_llm benchmarks")
+    terminalreporter.write_line(f"{'metric':<34} {'value':>10} {'baseline':>10}  ({bench.baseline_path})")
+    for line in bench.summary_lines():
+        terminalreporter.write_line(line)
+    if bench.update:
+        terminalreporter.write_line(f"기준값 저장: {bench.baseline_path}")
+
+
+@pytest.fixture(scope="session")
+def bench(pytestconfig):
+    return pytestconfig._bench
+
+
+@pytest.fixture(scope="session")
+def executor():
+    """로컬 ipykernel을 쓰는 JupyterExecutor 하나를 세션 동안 공유합니다."""
+    pytest.importorskip("jupyter_client")
+    pytest.importorskip("ipykernel")
+    from src.tools.backends import LocalBackend
+    from src.tools.jupyter_executor import JupyterExecutor
+
+    instance = JupyterExecutor(timeout=60, backend=LocalBackend())
+    yield instance
+    instance.shutdown()
+
+
+def timed(fn, repeat: int = 1) -> float:
+    """fn을 repeat번 실행한 시간의 중앙값 (초)."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
@@ -0,0 +1,118 @@
+import os
+import statistics
+import tempfile
+import time
+
+import pytest
+
+from conftest import timed
+
+pytestmark = pytest.mark.benchmark
+
+# 크기는 환경 변수로 줄이거나 늘릴 수 있습니다. (CI에서는 작게)
+# 크기가 다르면 다른 측정값이므로 지표 이름에 크기를 넣어, 다른 크기의 기준값과 비교하지 않습니다.
+STDOUT_MB = int(os.getenv("JUPYTER_LLM_BENCH_STDOUT_MB", "100"))
+SMALL_CELLS = int(os.getenv("JUPYTER_LLM_BENCH_SMALL_CELLS", "200"))
+IMAGES = int(os.getenv("JUPYTER_LLM_BENCH_IMAGES", "200"))
+
+
+def test_kernel_start(bench):
+    """커널 시작부터 준비(도우미 주입 포함)까지의 시간."""
+    pytest.importorskip("jupyter_client")
+    pytest.importorskip("ipykernel")
+    from src.tools.backends import LocalBackend
+    from src.tools.jupyter_executor import JupyterExecutor
+
+    def start_and_stop():
+        JupyterExecutor(timeout=60, backend=LocalBackend()).shutdown()
+
+    bench.record("kernel_start_s", timed(start_and_stop, repeat=3), "s")
+
+
+def test_trivial_cell_roundtrip(executor, bench):
+    """아무 일도 하지 않는 셀의 왕복 지연 (자원 측정과 메모리 감시 포함)."""
+    executor.execute("pass")  # 예열
+    samples = []
+    for _ in range(50):
+        started = time.perf_counter()
+        result = executor.execute("pass")
+        samples.append(time.perf_counter() - started)
+        assert result["error"] is None
+    bench.record("trivial_roundtrip_ms_p50", statistics.median(samples) * 1000, "ms", noise=2.0)
+    bench.record("trivial_roundtrip_ms_p95", sorted(samples)[int(len(samples) * 0.95) - 1] * 1000, "ms", noise=5.0)
+
+
+def test_small_cell_throughput(executor, bench):
+    """작은 셀을 연속으로 실행할 때 초당 셀 수."""
+    executor.execute("counter = 0")
+    started = time.perf_counter()
+    for _ in range(SMALL_CELLS):
+        executor.execute("counter += 1")
+    elapsed = time.perf_counter() - started
+    assert executor.execute("print(counter)")["stdout"] == str(SMALL_CELLS)
+    bench.record(f"small_cells_per_s_{SMALL_CELLS}_cells", SMALL_CELLS / elapsed, "cells/s", better="higher")
+
+
+def test_large_stdout(executor, bench):
+    """STDOUT_MB MB의 print 출력을 모두 받아 모으는 시간과 처리량."""
+    lines = STDOUT_MB * 10_000  # 100바이트짜리 줄
+    chunks = []
+    started = time.perf_counter()
+    result = executor.execute(f"line = 'x' * 99\nfor _ in range({lines}): print(line)",
+                              timeout=120, on_output=lambda stream, text: chunks.append(len(text)))
+    elapsed = time.perf_counter() - started
+    assert len(result["stdout"]) == lines * 100 - 1  # 마지막 줄바꿈은 strip됨
+    assert sum(chunks) == lines * 100
+    bench.record(f"large_stdout_s_{STDOUT_MB}_mb", elapsed, "s")
+    bench.record(f"large_stdout_mb_per_s_{STDOUT_MB}_mb", STDOUT_MB / elapsed, "MB/s", better="higher")
+
+
+def test_image_display_data(executor, bench):
+    """PNG 이미지 IMAGES개를 display_data로 내보내는 셀."""
+    executor.execute(
+        "import base64, os\n"
+        "from IPython.display import Image, display\n"
+        "png = base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==')\n"
+        "payload = png + os.urandom(200_000)  # 200 KB짜리 이미지 (내용은 렌더링하지 않음)"
+    )
+    started = time.perf_counter()
+    result = executor.execute(f"for _ in range({IMAGES}): display(Image(data=payload, format='png'))", timeout=120)
+    elapsed = time.perf_counter() - started
+    images = [output for output in result["outputs"] if "image/png" in output.get("data", {})]
+    assert len(images) == IMAGES
+    bench.record(f"image_display_s_{IMAGES}_images", elapsed, "s", noise=0.1)
+    bench.record(f"image_display_per_s_{IMAGES}_images", IMAGES / elapsed, "images/s", better="higher", noise=100)
+
+
+@pytest.mark.parametrize("cells", [10, 100, 1000])
+def test_notebook_save(bench, cells):
+    """노트북에 이미 cells개의 셀이 있을 때 셀 하나를 저장(append)하고 다시 여는 시간."""
+    nbformat = pytest.importorskip("nbformat")
+    from nbformat.v4 import new_code_cell, new_notebook, new_output
+    from src.tools.lazy_notebook import LazyNotebook, load_notebook_view
+
+    path = os.path.join(tempfile.mkdtemp(), f"bench_{cells}.ipynb")
+    notebook = new_notebook()
+    for i in range(cells):
+        cell = new_code_cell(f"df_{i} = df.groupby('k').sum()\nprint(df_{i}.shape)")
+        cell.outputs.append(new_output("stream", name="stdout", text="(10, 3)\n" * 50))
+        notebook.cells.append(cell)
+    with open(path, "w", encoding="utf-8") as f:
+        nbformat.write(notebook, f)
+
+    lazy = LazyNotebook.open(path)
+    appended = iter(range(10_000))
+
+    def append():
+        cell = new_code_cell(f"step_{next(appended)} = 1")
+        cell.outputs.append(new_output("stream", name="stdout", text="ok\n"))
+        lazy.append_cell(cell)
+
+    append_s = timed(append, repeat=50)
+    # 새 세션이 노트북을 여는 경우 (경로별 캐시를 거치지 않고 색인 파일부터 읽음)
+    open_s = timed(lambda: LazyNotebook(path).tail_view(), repeat=5)
+    view, created = load_notebook_view(path)
+    assert not created and len(LazyNotebook.open(path)) == cells + 50
+    # 밀리초 단위라 디스크 캐시 상태에 따른 흔들림이 커서, 수 ms 이내의 차이는 회귀로 보지 않습니다.
+    bench.record(f"notebook_append_ms_{cells}_cells", append_s * 1000, "ms", noise=5.0)
+    bench.record(f"notebook_open_ms_{cells}_cells", open_s * 1000, "ms", noise=5.0)
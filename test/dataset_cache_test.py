@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+
+# 캐시 디렉터리는 모듈을 불러오기 전에 임시 디렉터리로 바꿉니다.
+tmp_dir = tempfile.mkdtemp()
+os.environ["JUPYTER_LLM_DATASET_CACHE"] = os.path.join(tmp_dir, "cache")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import numpy as np
+import pandas as pd
+from src.tools import dataset_cache
+from src.tools.dataset_cache import load_dataset, CACHE_DIR
+
+rows = 50_000
+frame = pd.DataFrame({"a": np.arange(rows), "b": np.random.default_rng(0).normal(size=rows),
+                      "c": np.where(np.arange(rows) % 2, "x", "y")})
+parquet_path = os.path.join(tmp_dir, "data.parquet")
+csv_path = os.path.join(tmp_dir, "data.csv")
+frame.to_parquet(parquet_path, row_group_size=10_000)
+frame.to_csv(csv_path, index=False)
+
+# 테스트 1: 전체 컬럼을 캐시를 통해 읽습니다.
+print("\n[Test 1: full load]")
+for path in (parquet_path, csv_path):
+    loaded = load_dataset(path, zero_copy=False)
+    assert list(loaded.columns) == ["a", "b", "c"] and len(loaded) == rows, loaded.columns
+print("✅ parquet and csv")
+
+# 테스트 2: columns=로 일부 컬럼만 (요청한 순서대로) 읽습니다.
+print("\n[Test 2: columns= projection]")
+for path in (parquet_path, csv_path):
+    loaded = load_dataset(path, columns=["c", "a"], zero_copy=False)
+    assert sorted(loaded.columns) == ["a", "c"] and len(loaded) == rows, loaded.columns
+    assert loaded["a"].sum() == frame["a"].sum()
+assert list(load_dataset(parquet_path, columns=["c", "a"]).columns) == ["c", "a"]
+print("✅ projected columns")
+
+# 테스트 3: 변환에 실패하면 임시 파일을 남기지 않습니다.
+print("\n[Test 3: no temp file left on failure]")
+# 첫 블록은 정상이고 끝부분에 필드 수가 다른 줄이 있는 CSV -> 배치를 쓰는 도중 실패
+bad_path = os.path.join(tmp_dir, "bad.csv")
+with open(csv_path) as src, open(bad_path, "w") as dst:
+    dst.write(src.read() + "1,2.0,x,extra\n")
+try:
+    load_dataset(bad_path)
+except Exception as e:
+    print(f"  expected failure: {type(e).__name__}")
+else:
+    raise AssertionError("malformed CSV should fail")
+leftovers = [name for name in os.listdir(CACHE_DIR) if name.endswith(".tmp")]
+assert not leftovers, leftovers
+print("✅ cache directory is clean")
+
+# 테스트 4: 같은 파일의 다른 컬럼 선택은 서로의 캐시를 지우지 않고, 원본이 바뀌면 예전 버전만 지웁니다.
+print("\n[Test 4: projections share the cache, stale versions are removed]")
+conversions = []
+convert = dataset_cache._convert
+dataset_cache._convert = lambda *args: (conversions.append(args[0]), convert(*args))
+source_id = dataset_cache._source_id(parquet_path)
+cached = lambda: sorted(name for name in os.listdir(CACHE_DIR) if name.startswith(source_id) and name.endswith(".arrow"))
+for _ in range(3):
+    load_dataset(parquet_path, columns=["c", "a"])
+    load_dataset(parquet_path)
+assert not conversions and len(cached()) == 2, (conversions, cached())
+frame.iloc[:100].to_parquet(parquet_path)
+assert len(load_dataset(parquet_path)) == 100 and len(conversions) == 1
+assert len(cached()) == 1, cached()
+dataset_cache._convert = convert
+print("✅ alternating projections reuse their files")
+
+print("\n🎉 모든 데이터셋 캐시 테스트 통과")
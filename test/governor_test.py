@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.agent.governor import LLMGovernor, priority_scope, INTERACTIVE, BATCH
+
+# 1. 한도 초과(429)를 일부러 섞어 보내는 로컬 스텁 서버
+# - RATE_LIMIT_EVERY번째 요청마다 429와 Retry-After 헤더를 돌려줍니다.
+# - 요청 경로의 delay=초 만큼 응답을 늦춥니다.
+server_log = []
+server_lock = threading.Lock()
+RATE_LIMIT_EVERY = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with server_lock:
+            server_log.append((time.monotonic(), self.path))
+            count = len(server_log)
+        if RATE_LIMIT_EVERY and count % RATE_LIMIT_EVERY == 0:
+            self.send_response(429)
+            self.send_header("Retry-After", "0.2")
+            self.end_headers()
+            return
+        delay = float(self.path.split("delay=")[1]) if "delay=" in self.path else 0.0
+        time.sleep(delay)
+        body = json.dumps({"path": self.path, "usage": {"total_tokens": 10}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base_url = f"http://127.0.0.1:{server.server_address[1]}"
+print("스텁 서버 시작:", base_url)
+
+
+def fetch(path):
+    with urllib.request.urlopen(base_url + path, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def reset(rate_limit_every=0):
+    global RATE_LIMIT_EVERY
+    RATE_LIMIT_EVERY = rate_limit_every
+    with server_lock:
+        server_log.clear()
+
+
+try:
+    # 테스트 1: 429는 Retry-After만큼 기다렸다가 재시도되어 결국 모두 성공해야 합니다.
+    print("\n[Test 1: 429 retry]")
+    reset(rate_limit_every=3)
+    governor = LLMGovernor(requests_per_minute=6000, max_concurrency=4, retry_base=0.05)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda i: governor.call(lambda: fetch(f"/req{i}"), tokens=10), range(20)))
+    assert [r["path"] for r in results] == [f"/req{i}" for i in range(20)]
+    assert governor.stats["rate_limited"] > 0 and governor.stats["retries"] == governor.stats["rate_limited"]
+    print("✅", governor.report())
+
+    # 테스트 2: 분당 요청 수 제한 (600 rpm = 초당 10개, burst 1) -> 11개 요청은 최소 1초
+    print("\n[Test 2: requests-per-minute bucket]")
+    reset()
+    governor = LLMGovernor(requests_per_minute=600, request_burst=1, max_concurrency=8)
+    started = time.monotonic()
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: governor.call(lambda: fetch(f"/rpm{i}"), tokens=10), range(11)))
+    elapsed = time.monotonic() - started
+    gaps = [b[0] - a[0] for a, b in zip(server_log, server_log[1:])]
+    assert elapsed >= 0.95, elapsed
+    assert min(gaps) >= 0.08, gaps
+    print(f"✅ 11 requests in {elapsed:.2f}s, min gap {min(gaps) * 1000:.0f} ms")
+
+    # 테스트 3: 우선순위 - 슬롯이 하나뿐일 때, 나중에 온 interactive 요청이 대기 중인 batch 요청보다 먼저 나가야 합니다.
+    print("\n[Test 3: priority classes]")
+    reset()
+    governor = LLMGovernor(requests_per_minute=6000, max_concurrency=1)
+
+    def submit(name, priority, delay=0.0):
+        with priority_scope(priority):
+            return governor.call(lambda: fetch(f"/{name}?delay={delay}"), tokens=10)
+
+    with ThreadPoolExecutor(8) as pool:
+        blocker = pool.submit(submit, "blocker", BATCH, 0.5)  # 슬롯을 잡고 있는 요청
+        time.sleep(0.1)
+        batch = [pool.submit(submit, f"batch{i}", BATCH) for i in range(4)]
+        time.sleep(0.1)
+        interactive = pool.submit(submit, "interactive", INTERACTIVE)
+        for future in [blocker, interactive, *batch]:
+            future.result()
+    order = [path.split("?")[0].strip("/") for _, path in server_log]
+    assert order[:2] == ["blocker", "interactive"], order
+    print("✅ order:", order, "wait:", governor.report()["wait_s"])
+
+    # 테스트 4: 진행 중인 같은 요청은 한 번만 보내고 결과를 공유해야 합니다.
+    print("\n[Test 4: coalescing identical in-flight requests]")
+    reset()
+    governor = LLMGovernor(requests_per_minute=6000)
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(lambda _: governor.call(lambda: fetch("/same?delay=0.3"), key="same", tokens=10), range(5)))
+    assert len(server_log) == 1, server_log
+    assert all(result == results[0] for result in results)
+    assert governor.stats["coalesced"] == 4
+    print("✅", governor.report())
+
+    print("\n🎉 모든 governor 테스트 통과")
+finally:
+    server.shutdown()
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+
+# 작은 파일로도 대용량 모드가 동작하도록 임계값과 표본 크기를 낮춥니다. (모듈을 불러오기 전에 설정)
+os.environ["JUPYTER_LLM_LARGE_DATA_MB"] = "1"
+os.environ["JUPYTER_LLM_SAMPLE_ROWS"] = "2000"
+os.environ["JUPYTER_LLM_SKILLS"] = "0"
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import nbformat
+import numpy as np
+import pandas as pd
+from src.tools.jupyter_executor import JupyterExecutor
+from src.tools.lazy_notebook import LazyNotebook
+from src.agent.nodes import code_executor_node
+
+tmp_dir = tempfile.mkdtemp()
+csv_path = os.path.join(tmp_dir, "sales.csv")
+rows = 200_000
+rng = np.random.default_rng(0)
+pd.DataFrame({"id": np.arange(rows), "amount": rng.integers(1, 100, rows),
+              "city": rng.choice(["Seoul", "Busan"], rows)}).to_csv(csv_path, index=False)
+print(f"CSV: {os.path.getsize(csv_path) / 1e6:.1f} MB, {rows:,} rows")
+
+executor = JupyterExecutor(timeout=60)
+
+
+def state_for(plan, cursor=0, fix_attempts=0):
+    return {"plan": plan, "plan_cursor": cursor, "fix_attempts": fix_attempts, "task": "large data test",
+            "notebook": nbformat.v4.new_notebook(), "notebook_path": os.path.join(tmp_dir, "nb.ipynb")}
+
+
+try:
+    # 테스트 1: 큰 파일은 표본으로 실행되고, 표본 캐시는 다시 읽지 않습니다.
+    print("\n[Test 1: sample mode]")
+    result = executor.execute(f"df = load_dataset({csv_path!r})\nprint(len(df))")
+    assert result["stdout"].splitlines()[-1] == "2000", result["stdout"]
+    assert "random sample of 2,000 of 200,000 rows" in result["stdout"], result["stdout"]
+    sampled = executor.sampled_sources(clear=True)
+    assert sampled and sampled[0]["source_rows"] == rows, sampled
+    assert executor.sampled_sources() == []
+    print("✅ 2,000-row random sample, recorded as pending")
+
+    # 테스트 2: 표본으로 성공한 plan은 처음부터 전체 데이터로 다시 실행되고, 노트북에 기록됩니다.
+    print("\n[Test 2: full re-run after success]")
+    plan = [f"df = load_dataset({csv_path!r})",
+            f"total = sum(int(chunk['amount'].sum()) for chunk in read_chunks({csv_path!r}, chunk_rows=50_000))\n"
+            "print(len(df), total)"]
+    update = code_executor_node(state_for(plan), executor=executor)
+    expected_total = int(pd.read_csv(csv_path)["amount"].sum())
+    assert update["stdout"].splitlines()[-1] == f"{rows} {expected_total}", update["stdout"]
+    assert update["plan_cursor"] == 2 and update["loop_stats"]["full_runs"] == 1, update
+    assert len(update["history"]) == 4  # 표본 실행 2셀 + 전체 실행 2셀
+    last_cell = LazyNotebook.open(os.path.join(tmp_dir, "nb.ipynb")).cell(-1)
+    assert last_cell["metadata"]["jupyter_llm"]["full_data"][0]["rows"] == 2000, last_cell["metadata"]
+    assert executor.sampled_sources() == []
+    print("✅ re-ran 2 cells on the full file")
+
+    # 테스트 3: 전체 데이터에서만 나는 오류는 그 셀에 커서를 두고, 표본 모드로 돌아옵니다.
+    print("\n[Test 3: failure on full data only]")
+    plan = [f"df = load_dataset({csv_path!r})", "assert len(df) <= 2000, 'too many rows'"]
+    update = code_executor_node(state_for(plan), executor=executor)
+    assert update["last_error"]["ename"] == "AssertionError", update["last_error"]
+    assert update["plan_cursor"] == 1 and "FULL dataset" in update["stderr"], update
+    result = executor.execute(f"print(len(load_dataset({csv_path!r})))")
+    assert result["stdout"].splitlines()[-1] == "2000", result["stdout"]
+    print("✅ cursor on the failing cell, back in sample mode")
+finally:
+    executor.shutdown()
+
+print("\n🎉 모든 대용량 모드 테스트 통과")
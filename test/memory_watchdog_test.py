@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+import types
+
+# 내보낸 파일은 임시 디렉터리에 둡니다. (모듈을 불러오기 전에 설정)
+os.environ["JUPYTER_LLM_SPILL_DIR"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from IPython.testing.globalipapp import start_ipython
+from src.tools.memory_watchdog import format_memory_report
+
+# 1. 프로세스 안의 IPython 셸에 커널 쪽 도우미를 JupyterExecutor와 같은 방식으로 주입합니다.
+shell = start_ipython()
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "tools", "kernel_memory.py")
+helper = types.ModuleType("jupyter_llm_memory")
+with open(path, encoding="utf-8") as f:
+    exec(compile(f.read(), path, "exec"), helper.__dict__)
+shell.user_ns["_jupyter_llm_memory"] = helper
+helper.install()
+
+
+def run(code):
+    result = shell.run_cell(code, store_history=True)
+    result.raise_error()
+    return result.result
+
+
+run("import threading\nimport numpy as np\nbig = np.ones((2000, 2000))\nalias = big\nraw = np.zeros((1500, 1500))")
+run("lock_holder = [threading.Lock()] + [np.ones(10)] * 200_000")  # pickle할 수 없는 큰 객체
+# 클로저가 같은 배열을 붙잡고 있는 큰 객체 (내보내도 메모리가 줄지 않음)
+run("def make():\n    data = np.ones((1200, 1200))\n    return data, lambda: data.sum()\nheld, getter = make()")
+run("recent = raw * 2")
+
+# 테스트 1: 큰 객체 목록 - 같은 객체를 가리키는 이름은 묶입니다.
+print("\n[Test 1: largest objects]")
+objects = helper.largest_objects(min_mb=1)
+assert objects[0]["names"] == ["big", "alias"] and objects[0]["mb"] > 30, objects
+print("✅", objects)
+
+# 테스트 2: 최근 셀에서 쓴 이름(raw, recent)과 다른 곳에서도 참조되는 객체(held)는 남기고, 나머지를 내보냅니다.
+print("\n[Test 2: reclaim]")
+report = helper.reclaim(need_mb=1000, protect_cells=1)
+spilled = [name for item in report["evicted"] for name in item["names"]]
+assert spilled == ["big", "alias"], report
+assert "raw" not in spilled and "recent" not in spilled
+assert any("not picklable" in item["reason"] for item in report["kept"]), report["kept"]
+assert {"names": ["held"], "reason": "referenced elsewhere"}.items() <= next(
+    item for item in report["kept"] if item["names"] == ["held"]).items(), report["kept"]
+assert type(shell.user_ns["held"]).__name__ == "ndarray"
+assert type(shell.user_ns["big"]).__name__ == "SpilledObject"
+summary = format_memory_report({**report, "budget_mb": 1024})
+assert "Kept (referenced elsewhere): held" in summary, summary
+print("✅", summary)
+
+# 테스트 3: 셀에서 이름을 쓰면 실행 전에 다시 불러오고, 두 이름은 같은 객체를 가리킵니다.
+print("\n[Test 3: transparent reload]")
+assert run("float(np.asarray(big).sum()), big is alias") == (4_000_000.0, True)
+assert not os.listdir(os.environ["JUPYTER_LLM_SPILL_DIR"])  # 불러온 파일은 지워집니다.
+print("✅ reloaded on next use")
+
+# 테스트 4: 셀 밖(함수 안의 전역 참조 등)에서도 속성에 접근하면 불러옵니다.
+print("\n[Test 4: reload through the placeholder]")
+run("def total():\n    return raw.sum()")
+run("x = 1")
+helper.reclaim(need_mb=1000, protect_cells=1)
+assert type(shell.user_ns["raw"]).__name__ == "SpilledObject"
+assert shell.user_ns["total"]() == 0.0
+assert type(shell.user_ns["raw"]).__name__ == "ndarray"
+print("✅ reloaded on attribute access")
+
+print("\n🎉 모든 메모리 감시자 테스트 통과")
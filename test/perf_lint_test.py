@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import numpy as np
+import pandas as pd
+from src.agent.perf_lint import lint_cell
+
+df = pd.DataFrame({"price": [1.5, 2.0, 3.25], "qty": [1, 2, 3]})
+
+
+def run(code):
+    env = {"pd": pd, "np": np, "df": df.copy()}
+    exec(code, env)
+    return env
+
+
+# 테스트 1: 자동으로 바꾸는 경우 - 결과가 원래 코드와 같아야 합니다.
+print("\n[Test 1: rewrites]")
+rewrites = {
+    "df['total'] = df['price'].apply(lambda p: p * 1.1 + 2)": "df['total'] = (df['price'] * 1.1 + 2)",
+    "df['big'] = df['qty'].map(lambda q: q > 1)": "df['big'] = (df['qty'] > 1)",
+    "df['total'] = df.apply(lambda r: r['price'] * r['qty'] - 1, axis=1)":
+        "df['total'] = (df['price'] * df['qty'] - 1)",
+    "df['root'] = df['qty'].apply(lambda q: q ** 0.5)": "df['root'] = (df['qty'] ** 0.5)",
+}
+for code, expected in rewrites.items():
+    fixed, findings = lint_cell(code)
+    assert fixed == expected, (code, fixed)
+    assert findings and all(f.fixed for f in findings), findings
+    pd.testing.assert_frame_equal(run(code)["df"], run(fixed)["df"], check_dtype=False)
+print(f"✅ {len(rewrites)} rewrites keep the same result")
+
+# 테스트 2: 바꾸면 안 되는 경우 - 코드는 그대로입니다.
+print("\n[Test 2: no rewrite]")
+unchanged = [
+    "total = df['qty'].map(lambda x: 0).sum()",          # 상수 람다 -> (0).sum()이 되면 안 됨
+    "y = df.apply(lambda r: 1, axis=1)",                  # 상수 람다 -> 스칼라가 되면 안 됨
+    "big = df['qty'].apply(lambda x: x ** 70)",           # 정수 거듭제곱 (int64에서 넘침)
+    "inv = df['qty'].apply(lambda x: x ** -1)",           # 음수 지수
+    "out = items.map(lambda x: x * 2)",                   # pandas 열인지 알 수 없는 수신 객체
+    "out = pool.apply(lambda x: x + 1)",
+    "m = df.groupby('qty')['price'].apply(lambda s: s * 2)",  # 그룹 단위 apply
+    "n = df['qty'].apply(lambda x: x * 2, convert_dtype=False)",  # 추가 인자
+]
+for code in unchanged:
+    fixed, findings = lint_cell(code)
+    assert fixed == code, (code, fixed)
+    assert not any(f.fixed for f in findings), (code, findings)
+assert run("big = df['qty'].apply(lambda x: x ** 70)")["big"][2] == 3 ** 70
+print(f"✅ {len(unchanged)} cells left as written")
+
+# 테스트 3: 느린 패턴은 심각한 항목으로 보고합니다.
+print("\n[Test 3: severe findings]")
+severe = {
+    "for _, row in df.iterrows():\n    print(row['price'])": "iterrows",
+    "out = pd.DataFrame()\nfor i in range(3):\n    out = pd.concat([out, df])": "concat-in-loop",
+    "acc = np.array([])\nfor v in range(3):\n    acc = np.append(acc, v)": "np-append-in-loop",
+    "for i in range(3):\n    df.loc[i, 'x'] = i": "cell-write-in-loop",
+    "df['s'] = df.apply(lambda r: str(r['price']), axis=1)": "apply-axis1",
+}
+for code, rule in severe.items():
+    fixed, findings = lint_cell(code)
+    assert fixed == code and any(f.rule == rule and f.severe for f in findings), (code, findings)
+print(f"✅ {len(severe)} patterns reported")
+
+# 테스트 4: 매직/셸 명령이 있어도 검사하고, 그 줄은 그대로 둡니다.
+print("\n[Test 4: magics]")
+code = "%matplotlib inline\n!pip install -q pandas\ndf['t'] = df['price'].apply(lambda p: p * 2)\n%time x = 1"
+fixed, findings = lint_cell(code)
+assert fixed == "%matplotlib inline\n!pip install -q pandas\ndf['t'] = (df['price'] * 2)\n%time x = 1", fixed
+assert findings[0].line == 3, findings
+assert lint_cell("%%bash\necho hi") == ("%%bash\necho hi", [])
+assert lint_cell("def broken(:\n    pass") == ("def broken(:\n    pass", [])
+print("✅ magics masked, positions kept")
+
+print("\n🎉 모든 성능 린트 테스트 통과")
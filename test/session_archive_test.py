@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+
+os.environ["JUPYTER_LLM_SKILLS"] = "0"
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import base64
+import nbformat
+from src.tools.jupyter_executor import JupyterExecutor
+from src.tools.lazy_notebook import load_notebook_view
+from src.tools.session_archive import SessionArchive
+from src.agent.nodes import code_executor_node
+from src.agent.history import append_history
+
+tmp_dir = tempfile.mkdtemp()
+notebook_path = os.path.join(tmp_dir, "nb.ipynb")
+notebook, _ = load_notebook_view(notebook_path)
+archive = SessionArchive.for_notebook(notebook_path)
+archive.start_session(notebook_path)
+
+# 큰 PNG 출력을 OutputStore가 파일로 분리하도록 만드는 셀
+warning_cell = "import warnings\nwarnings.warn('deprecated option')\nmodel = 42"
+png_cell = ("from IPython.display import Image, display\n"
+            "display(Image(data=bytes(range(256)) * 400, format='png'))")
+
+
+def run_turn(executor, task, plan, history, snapshot=False):
+    state = {"plan": plan, "plan_cursor": 0, "fix_attempts": 0, "task": task, "history": history,
+             "notebook": notebook, "notebook_path": notebook_path}
+    update = code_executor_node(state, executor=executor)
+    state.update(update, history=append_history(history, update.get("history")))
+    archive.record_turn(task, state, routing=[{"node": "router", "destination": "simple_task"}],
+                        executor=executor, snapshot=snapshot)
+    return state
+
+
+executor = JupyterExecutor(timeout=60)
+try:
+    # 테스트 1: 턴마다 기록, 셀 저널, 분리된 바이너리가 쌓이고, 항목 하나만 읽을 수 있습니다.
+    print("\n[Test 1: record turns]")
+    state = run_turn(executor, "load", ["import math\nrows = list(range(1000))",
+                                        "def double(x):\n    return x * 2"], [])
+    state = run_turn(executor, "plot", [png_cell], state["history"], snapshot=True)
+    state = run_turn(executor, "total", ["total = sum(double(r) for r in rows)\nprint(total)"], state["history"])
+    # 경고만 낸 셀은 stderr가 있어도 성공이므로 재개 시 다시 실행되어야 합니다.
+    state = run_turn(executor, "warn", [warning_cell], state["history"])
+    state = run_turn(executor, "broken", ["undefined_name + 1"], state["history"])
+    summary = archive.summary()
+    assert summary["turn"] == 5 and summary["history"] == 6 and summary["cell"] == 6 and summary["blob"] == 1, summary
+    assert summary["snapshot"] >= 1, summary
+    turn = archive.turn(2)
+    assert turn["task"] == "total" and turn["routing"][0]["destination"] == "simple_task", turn
+    cell = archive.cell(turn["cells"][0])
+    assert cell["outputs"][0]["text"].strip() == "999000", cell
+    image_cell = archive.cell(archive.turn(1)["cells"][0])
+    image = next(output for output in image_cell["outputs"] if "image/png" in output.get("data", {}))
+    assert base64.b64decode(image["data"]["image/png"]) == bytes(range(256)) * 400
+    print(f"✅ {summary}")
+
+    # 테스트 2: 다시 열면 (새 프로세스처럼) 상태와 기록을 그대로 읽습니다.
+    print("\n[Test 2: reopen and resume state]")
+    reopened = SessionArchive(archive.path)
+    resumed = reopened.resume_state()
+    assert resumed["task"] == "broken" and len(resumed["history"]) == 6, resumed
+    assert resumed["history"][-1]["status"] == "error" and "key" not in resumed["history"][0]
+    assert resumed["history"][-2]["status"] == "ok" and "UserWarning" in resumed["history"][-2]["stderr"]
+    exported = nbformat.read(reopened.export_notebook(os.path.join(tmp_dir, "export.ipynb")), as_version=4)
+    assert len(exported.cells) == 6
+    print("✅ state, history and exported notebook match")
+
+    # 테스트 3: 색인이 잘린 아카이브도 프레임을 다시 훑어 복구합니다.
+    print("\n[Test 3: recover from a truncated index]")
+    broken_path = os.path.join(tmp_dir, "broken.session")
+    with open(archive.path, "rb") as src, open(broken_path, "wb") as dst:
+        dst.write(src.read()[:-5])
+    recovered = SessionArchive(broken_path)
+    assert recovered.recovered and recovered.summary()["turn"] == 5, recovered.summary()
+    print("✅ rebuilt index from frames")
+finally:
+    executor.shutdown()
+
+# 테스트 4: 새 커널에서 스냅샷 + 그 뒤에 성공한 셀(경고만 낸 셀 포함)만 다시 실행해 상태를 되살립니다.
+print("\n[Test 4: restore kernel]")
+executor = JupyterExecutor(timeout=60)
+try:
+    report = SessionArchive(archive.path).restore_kernel(executor)
+    assert report["mode"] == "snapshot" and report["replayed"] == 2 and not report["failed"], report
+    result = executor.execute("print(total, double(4), math.pi > 3, model)")
+    assert result["stdout"].strip() == "999000 8 True 42", result
+    print(f"✅ {report}")
+
+    # 테스트 5: 경고만 낸 턴 뒤에도 스냅샷을 남깁니다.
+    print("\n[Test 5: snapshot after a warning-only turn]")
+    state = run_turn(executor, "warn again", [warning_cell], [], snapshot=True)
+    assert archive.last_turn().get("snapshot"), archive.last_turn()
+    print("✅ snapshot recorded")
+finally:
+    executor.shutdown()
+
+print("\n🎉 모든 세션 아카이브 테스트 통과")
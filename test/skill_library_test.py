@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.tools.skill_library import SkillLibrary, extract_slots, substitute
+
+library = SkillLibrary(os.path.join(tempfile.mkdtemp(), "skills.jsonl"))
+
+# 테스트 1: 문자열 리터럴 전체만 바꾸고, 식별자나 다른 문자열 안의 부분 문자열은 그대로 둡니다.
+print("\n[Test 1: whole literals only]")
+library.add("load titanic.csv and plot a histogram of 'age'", "visualization",
+            "df = pd.read_csv('data/titanic.csv')\nage_mean = df['age'].mean()\n"
+            "df['age'].plot.hist(title=\"average age\")\nprint(f'{age_mean} from titanic.csv')")
+match = library.lookup("load iris.csv and plot a histogram of 'petal'")
+assert match.substituted and library.is_confident(match), match
+assert match.code == ("df = pd.read_csv('data/iris.csv')\nage_mean = df['petal'].mean()\n"
+                      "df['petal'].plot.hist(title=\"average age\")\nprint(f'{age_mean} from titanic.csv')"), match.code
+compile(match.code, "<skill>", "exec")
+print("✅", match.code.splitlines()[0])
+
+# 테스트 2: 기록된 매개변수가 코드에 그대로 나오지 않으면 치환하지 않고 참고 코드로만 씁니다.
+print("\n[Test 2: slot missing from the code]")
+library.add("histogram of 'age'", "visualization", "df['Age'].plot.hist(title='average')")
+match = library.lookup("histogram of 'fare'")
+assert match.code == "df['Age'].plot.hist(title='average')", match.code
+assert not match.substituted and not library.is_confident(match), match
+print("✅ 'averfare' avoided, offered as a hint only")
+
+# 테스트 3: 값을 서로 맞바꾸는 치환과, 따옴표가 들어간 새 값, 매직 명령이 있는 코드
+print("\n[Test 3: swaps, quotes and magics]")
+skill = {"code": "%matplotlib inline\ndf.plot.scatter(x='a', y='b')", "slots": extract_slots("scatter of 'a' vs 'b'")}
+assert substitute(skill, extract_slots("scatter of 'b' vs 'a'")) == (
+    "%matplotlib inline\ndf.plot.scatter(x='b', y='a')", True)
+skill = {"code": "df['name']", "slots": {"file": [], "quoted": ["name"]}}
+assert substitute(skill, {"file": [], "quoted": ["it's"]}) == ('df["it\'s"]', True)
+assert substitute({"code": "x = 'a", "slots": {"quoted": ["a"]}}, {"quoted": ["b"]}) == ("x = 'a", False)
+print("✅ swaps, quoting and untokenizable code")
+
+print("\n🎉 모든 스킬 라이브러리 테스트 통과")
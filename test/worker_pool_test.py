@@ -0,0 +1,49 @@
+import os
+import sys
+
+# 보조 커널은 2개만 띄웁니다. (주 커널을 시작하기 전에 설정해 커널 환경에 전달)
+os.environ["JUPYTER_LLM_WORKERS"] = "2"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.tools.jupyter_executor import JupyterExecutor
+
+executor = JupyterExecutor(timeout=60)
+
+
+def run(code):
+    result = executor.execute(code, timeout=120)
+    print(result["stdout"])
+    return result
+
+
+try:
+    # 테스트 1: 셀에서 정의한 함수와 그 함수가 쓰는 전역 값(data, helper)이 보조 커널로 전달되고, 순서대로 모입니다.
+    print("\n[Test 1: scatter a cell-defined function]")
+    run("import math, os\ndata = {'scale': 3}\ndef helper(x):\n    return math.sqrt(x) * data['scale']\n"
+        "def work(x):\n    return helper(x), os.getpid()")
+    result = run("out = scatter(work, range(20))\nmain_pid = os.getpid()")
+    assert result["error"] is None, result["error"]
+    result = run("print([round(v, 3) for v, _ in out] == [round(math.sqrt(x) * 3, 3) for x in range(20)], "
+                 "len({p for _, p in out}), main_pid in {p for _, p in out})")
+    assert result["stdout"].splitlines()[-1] == "True 2 False", result["stdout"]
+    print("✅ gathered in order from 2 worker kernels")
+
+    # 테스트 2: cloudpickle 없이 소스로 보내는 경로 (share=로 넘긴 값 포함)
+    print("\n[Test 2: ship by source]")
+    run("import sys\n_saved_cloudpickle = sys.modules.get('cloudpickle')\nsys.modules['cloudpickle'] = None")
+    result = run("def scaled(x):\n    return x * factor\n"
+                 "print(scatter(scaled, [1, 2, 3], share={'factor': 10}, quiet=True))")
+    run("sys.modules['cloudpickle'] = _saved_cloudpickle")
+    assert result["stdout"].splitlines()[-1] == "[10, 20, 30]", result
+    print("✅ shipped by source")
+
+    # 테스트 3: 보조 커널의 예외는 원래 traceback과 함께 주 커널의 ScatterError가 됩니다.
+    print("\n[Test 3: worker errors]")
+    result = run("def fragile(x):\n    return 1 / (x - 5)\nscatter(fragile, range(10))")
+    assert result["error"]["ename"] == "ScatterError", result["error"]
+    assert "ZeroDivisionError" in result["error"]["evalue"], result["error"]["evalue"]
+    assert run("print(scatter(abs, [-1, -2], quiet=True))")["stdout"] == "[1, 2]"  # 풀은 계속 쓸 수 있음
+    print("✅ ZeroDivisionError surfaced, pool still usable")
+finally:
+    executor.shutdown()
+
+print("\n🎉 모든 scatter 테스트 통과")